@@ -0,0 +1,230 @@
+"""
+Simulated Annealing for the Dwarf Bridge Crossing Problem.
+
+The greedy algorithm builds a scheme from reasoning that only holds for the problem as it is originally stated,
+and the random approach just keeps trying new schemes. Neither of them can take a scheme and make it better.
+This program does that. It starts from any scheme that can be made, and keeps swapping dwarfs between moves of
+the same kind, i.e. two dwarfs trade places between two crossings or between two walks back with the lantern.
+A swap that makes the scheme faster is always made, and a swap that makes it slower is made with a probability
+that shrinks as the scheme cools down, so that the search can get out of a dead end early on but settles in the
+end.
+
+A swap of dwarf a in move i with dwarf b in move j can be made as long as a isn't part of any other move
+between i and j, and neither is b. Since every dwarf walks back and forth, that is the same as j lying between
+the moves just before and just after i that a is part of, and i lying between the ones around j for b.
+The swap only changes the time of move i and of move j, so both the check and the change in total time are
+found by looking at the two moves and the two dwarfs, never at the rest of the scheme. Two dwarfs swapping walks
+back with the lantern doesn't change the total time at all, but it moves the dwarfs around, and with that which
+swaps of crossings can be made. Two dwarfs can also swap everything they do, which is how a slow dwarf that walks
+back and forth can hand that over to a fast one. That only touches the few moves the two dwarfs are part of.
+
+Nothing in this depends on the crossing times being 1, 2, 3, ... or on at most two dwarfs crossing together.
+"""
+import dwarf
+from dwarf_errors import DwarfSchemeError
+import greedy_min_dwarf
+import math
+import random
+
+
+NUMBER_OF_DWARFS = 300
+MAX_CROSSINGS = 3
+MAX_TOGETHER = 3
+STEPS = 200000
+FINAL_TEMPERATURE = 0.001  # The temperature at the last step, as a fraction of the starting temperature
+SAMPLES = 100  # Number of swaps looked at to find the starting temperature
+
+
+class AnnealingScheme:
+    """A scheme kept the way the annealing needs it. Every move knows its dwarfs and every dwarf knows, in order,
+       the moves it is part of, so a swap can be checked, scored and made by looking only at the few moves it
+       changes."""
+
+    def __init__(self, scheme, crossing_times=None, max_crossings=MAX_CROSSINGS,
+                 max_together=MAX_TOGETHER):
+        """Sets up the scheme from a list of moves in the same format as the other approaches, [nr, nr, "cross"]
+           and [nr, "go back"]. The crossing time of dwarf number nr is crossing_times[nr - 1], and 1, 2, 3, ...
+           when no crossing times are given. Raises DwarfSchemeError if the scheme can't be made."""
+        if crossing_times is None:
+            crossing_times = [t for t in range(1, max(dwarf_nr for move in scheme for dwarf_nr in move[:-1]) + 1)]
+        self.times = [0] + list(crossing_times)
+        self.moves = []
+        self.occurrences = {dwarf_nr: [] for dwarf_nr in range(1, len(self.times))}
+        self.position = {}
+        for move_nr, move in enumerate(scheme):
+            direction = "cross" if move_nr % 2 == 0 else "go back"
+            dwarfs = list(move[:-1])
+            if move[-1] != direction:
+                raise DwarfSchemeError(move_nr, f"the lantern is not where the dwarfs are when told to {move[-1]}")
+            if not 0 < len(dwarfs) <= (max_together if direction == "cross" else 1):
+                raise DwarfSchemeError(move_nr, f"{len(dwarfs)} dwarfs are told to {direction} together")
+            if len(set(dwarfs)) != len(dwarfs):
+                raise DwarfSchemeError(move_nr, "the same dwarf is told to walk twice in the same move")
+            for dwarf_nr in dwarfs:
+                if dwarf_nr not in self.occurrences:
+                    raise DwarfSchemeError(move_nr, f"there is no dwarf number {dwarf_nr}")
+                occurrences = self.occurrences[dwarf_nr]
+                if len(occurrences) % 2 != move_nr % 2:
+                    raise DwarfSchemeError(move_nr, f"dwarf number {dwarf_nr} is on the other side of the bridge")
+                if len(occurrences) == max_crossings:
+                    raise DwarfSchemeError(move_nr, f"dwarf number {dwarf_nr} has no crossings left")
+                self.position[move_nr, dwarf_nr] = len(occurrences)
+                occurrences.append(move_nr)
+            self.moves.append(dwarfs)
+        for dwarf_nr, occurrences in self.occurrences.items():
+            if len(occurrences) % 2 == 0:
+                raise DwarfSchemeError(len(scheme), f"dwarf number {dwarf_nr} is not at {dwarf.FINISH}")
+        self.total = sum(self.duration(move_nr) for move_nr in range(len(self.moves)))
+
+    def duration(self, move_nr, leaving=None, joining=None):
+        """Returns the time move_nr takes, or would take if the leaving dwarf was replaced by the joining dwarf."""
+        times = self.times
+        slowest = max((times[dwarf_nr] for dwarf_nr in self.moves[move_nr] if dwarf_nr != leaving), default=0)
+        return slowest if joining is None else max(slowest, times[joining])
+
+    def window(self, move_nr, dwarf_nr):
+        """Returns the moves just before and just after move_nr that the dwarf is part of. -1 if there is none
+           before and the number of moves if there is none after."""
+        occurrences = self.occurrences[dwarf_nr]
+        index = self.position[move_nr, dwarf_nr]
+        before = occurrences[index - 1] if index > 0 else -1
+        after = occurrences[index + 1] if index + 1 < len(occurrences) else len(self.moves)
+        return before, after
+
+    def propose(self, randrange):
+        """Returns a random swap that can be made, with the change in total time it gives as its last item.
+           Returns None if the swap picked can't be made."""
+        if randrange(2):
+            return self.propose_dwarfs(randrange)
+        return self.propose_partners(randrange)
+
+    def propose_partners(self, randrange):
+        """Returns a random swap of two dwarfs between two moves of the same kind, as
+           ("partners", move_nr, slot, other_move_nr, other_slot, delta), or None if it can't be made."""
+        move_nr = randrange(len(self.moves))
+        slot = randrange(len(self.moves[move_nr]))
+        leaving = self.moves[move_nr][slot]
+        before, after = self.window(move_nr, leaving)
+        # The moves of the same kind in between alternate with the moves of the other kind
+        other_move_nr = before + 1 + 2 * randrange((after - before) // 2)
+        if other_move_nr == move_nr:
+            return None
+        other_slot = randrange(len(self.moves[other_move_nr]))
+        joining = self.moves[other_move_nr][other_slot]
+        other_before, other_after = self.window(other_move_nr, joining)
+        if not other_before < move_nr < other_after:
+            return None
+        delta = self.duration(move_nr, leaving, joining) + self.duration(other_move_nr, joining, leaving) \
+            - self.duration(move_nr) - self.duration(other_move_nr)
+        return "partners", move_nr, slot, other_move_nr, other_slot, delta
+
+    def propose_dwarfs(self, randrange):
+        """Returns a random swap of everything two dwarfs do, as ("dwarfs", dwarf_nr, other_dwarf_nr, delta), or
+           None if the same dwarf was picked twice. This is how a dwarf that walks back with the lantern can trade
+           places with one that only crosses once. Such a swap can always be made, and only touches the at most
+           2 * max_crossings moves the two dwarfs are part of."""
+        dwarf_nr = randrange(1, len(self.times))
+        other_dwarf_nr = randrange(1, len(self.times))
+        if dwarf_nr == other_dwarf_nr:
+            return None
+        delta = 0
+        for move_nr, leaving, joining in self.exchanged_moves(dwarf_nr, other_dwarf_nr):
+            delta += self.duration(move_nr, leaving, joining) - self.duration(move_nr)
+        return "dwarfs", dwarf_nr, other_dwarf_nr, delta
+
+    def exchanged_moves(self, dwarf_nr, other_dwarf_nr):
+        """Returns the moves that change when the two dwarfs swap everything they do, as
+           (move_nr, leaving dwarf, joining dwarf). Moves the two dwarfs make together don't change."""
+        occurrences = self.occurrences[dwarf_nr]
+        other_occurrences = self.occurrences[other_dwarf_nr]
+        return [(move_nr, dwarf_nr, other_dwarf_nr) for move_nr in occurrences
+                if (move_nr, other_dwarf_nr) not in self.position] + \
+               [(move_nr, other_dwarf_nr, dwarf_nr) for move_nr in other_occurrences
+                if (move_nr, dwarf_nr) not in self.position]
+
+    def swap(self, proposal):
+        """Makes a swap returned by propose."""
+        if proposal[0] == "partners":
+            self.swap_partners(*proposal[1:-1])
+        else:
+            self.swap_dwarfs(*proposal[1:-1])
+        self.total += proposal[-1]
+
+    def swap_partners(self, move_nr, slot, other_move_nr, other_slot):
+        """Swaps the dwarf in the slot of move_nr with the dwarf in the other slot of other_move_nr."""
+        leaving = self.moves[move_nr][slot]
+        joining = self.moves[other_move_nr][other_slot]
+        index = self.position.pop((move_nr, leaving))
+        other_index = self.position.pop((other_move_nr, joining))
+        self.occurrences[leaving][index] = other_move_nr
+        self.occurrences[joining][other_index] = move_nr
+        self.position[other_move_nr, leaving] = index
+        self.position[move_nr, joining] = other_index
+        self.moves[move_nr][slot] = joining
+        self.moves[other_move_nr][other_slot] = leaving
+
+    def swap_dwarfs(self, dwarf_nr, other_dwarf_nr):
+        """Swaps everything the two dwarfs do."""
+        for move_nr, leaving, joining in self.exchanged_moves(dwarf_nr, other_dwarf_nr):
+            dwarfs = self.moves[move_nr]
+            dwarfs[dwarfs.index(leaving)] = joining
+        for nr in (dwarf_nr, other_dwarf_nr):
+            for move_nr in self.occurrences[nr]:
+                del self.position[move_nr, nr]
+        occurrences = self.occurrences[other_dwarf_nr]
+        self.occurrences[other_dwarf_nr] = self.occurrences[dwarf_nr]
+        self.occurrences[dwarf_nr] = occurrences
+        for nr in (dwarf_nr, other_dwarf_nr):
+            for index, move_nr in enumerate(self.occurrences[nr]):
+                self.position[move_nr, nr] = index
+
+    def typical_delta(self, randrange, samples=SAMPLES):
+        """Returns the average increase in total time over a number of random swaps that would make the scheme
+           slower, or 1 if none of them would."""
+        increases = [proposal[-1] for proposal in (self.propose(randrange) for _ in range(samples))
+                     if proposal is not None and proposal[-1] > 0]
+        return sum(increases) / len(increases) if increases else 1
+
+    def to_scheme(self):
+        """Returns the scheme as a list of moves in the same format as the other approaches."""
+        return [dwarfs + ["cross"] if move_nr % 2 == 0 else dwarfs + ["go back"]
+                for move_nr, dwarfs in enumerate(self.moves)]
+
+
+def anneal(scheme, crossing_times=None, max_crossings=MAX_CROSSINGS, max_together=MAX_TOGETHER, steps=STEPS,
+           start_temperature=None, seed=None):
+    """Returns the total time and the scheme of the fastest scheme found by simulated annealing, starting from
+       the scheme given. A start_temperature of 0 only ever makes swaps that don't make the scheme slower. The
+       same seed gives the same result."""
+    rng = random.Random(seed)
+    state = AnnealingScheme(scheme, crossing_times, max_crossings, max_together)
+    best_time, best_scheme = state.total, state.to_scheme()
+    if start_temperature is None:
+        start_temperature = state.typical_delta(rng.randrange)
+    cooling = FINAL_TEMPERATURE ** (1 / steps) if steps else 1
+    temperature = start_temperature
+    for _ in range(steps):
+        proposal = state.propose(rng.randrange)
+        if proposal is not None:
+            delta = proposal[-1]
+            if delta <= 0 or (temperature > 0 and rng.random() < math.exp(-delta / temperature)):
+                state.swap(proposal)
+                if state.total < best_time:
+                    best_time, best_scheme = state.total, state.to_scheme()
+        temperature *= cooling
+    return best_time, best_scheme
+
+
+def main():
+    """Starts the execution and presents the result when done. With three dwarfs allowed on the bridge, the
+       reasoning behind the greedy algorithm no longer holds, so its scheme is used as a starting point."""
+    greedy_time, scheme = greedy_min_dwarf.greedy_min_crossing(NUMBER_OF_DWARFS, MAX_CROSSINGS, dwarf.START,
+                                                               MAX_TOGETHER)
+    time_for_crossing, scheme = anneal(scheme, None, MAX_CROSSINGS, MAX_TOGETHER)
+    print(f"Total time for all dwarfs crossing the bridge, greedy: {greedy_time}")
+    print(f"Total time for all dwarfs crossing the bridge, annealed: {time_for_crossing}")
+    print(scheme)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+import unittest
+import dwarf
+from dwarf_errors import DwarfSchemeError
+import greedy_min_dwarf
+import random
+from annealing_dwarf import AnnealingScheme, anneal
+from verify_dwarf import verify_scheme
+
+
+NUMBER_OF_DWARFS = 30
+MAX_CROSSINGS = 3
+STEPS = 20000
+
+
+def greedy_scheme(max_together):
+    """Returns the scheme the greedy algorithm finds for the dwarfs."""
+    return greedy_min_dwarf.greedy_min_crossing(NUMBER_OF_DWARFS, MAX_CROSSINGS, dwarf.START, max_together)[1]
+
+
+class AnnealingSchemeTests(unittest.TestCase):
+
+    def test_total(self):
+        scheme = greedy_scheme(2)
+        state = AnnealingScheme(scheme, None, MAX_CROSSINGS, 2)
+        times = list(range(1, NUMBER_OF_DWARFS + 1))
+        self.assertEqual((state.total, []), verify_scheme(scheme, NUMBER_OF_DWARFS, MAX_CROSSINGS, 2, times))
+        self.assertEqual(scheme, state.to_scheme())
+
+    def test_swaps(self):
+        times = [random.Random(nr).randint(1, 100) for nr in range(NUMBER_OF_DWARFS)]
+        state = AnnealingScheme(greedy_scheme(3), times, MAX_CROSSINGS, 3)
+        randrange = random.Random(7).randrange
+        swaps = 0
+        for _ in range(2000):
+            proposal = state.propose(randrange)
+            if proposal is not None:
+                state.swap(proposal)
+                swaps += 1
+                self.assertEqual((state.total, []),
+                                 verify_scheme(state.to_scheme(), NUMBER_OF_DWARFS, MAX_CROSSINGS, 3, times))
+        self.assertGreater(swaps, 0)
+
+    def test_bad_schemes(self):
+        scheme = greedy_scheme(2)
+        with self.assertRaises(DwarfSchemeError):
+            AnnealingScheme(scheme[:-1], None, MAX_CROSSINGS, 2)
+        with self.assertRaises(DwarfSchemeError):
+            AnnealingScheme([scheme[0]] + scheme[2:], None, MAX_CROSSINGS, 2)
+        with self.assertRaises(DwarfSchemeError):
+            AnnealingScheme(scheme, None, MAX_CROSSINGS, 1)
+        with self.assertRaises(DwarfSchemeError):
+            AnnealingScheme(scheme, None, 1, 2)
+
+
+class AnnealTests(unittest.TestCase):
+
+    def test_no_worse(self):
+        scheme = greedy_scheme(2)
+        times = list(range(1, NUMBER_OF_DWARFS + 1))
+        total_time, annealed = anneal(scheme, None, MAX_CROSSINGS, 2, STEPS, seed=1)
+        self.assertLessEqual(total_time, verify_scheme(scheme, NUMBER_OF_DWARFS, MAX_CROSSINGS, 2, times)[0])
+        self.assertEqual((total_time, []), verify_scheme(annealed, NUMBER_OF_DWARFS, MAX_CROSSINGS, 2, times))
+
+    def test_improves(self):
+        scheme = greedy_scheme(3)
+        times = [NUMBER_OF_DWARFS + 1 - t for t in range(1, NUMBER_OF_DWARFS + 1)]
+        total_time, annealed = anneal(scheme, times, MAX_CROSSINGS, 3, STEPS, seed=1)
+        self.assertLess(total_time, verify_scheme(scheme, NUMBER_OF_DWARFS, MAX_CROSSINGS, 3, times)[0])
+        self.assertEqual((total_time, []), verify_scheme(annealed, NUMBER_OF_DWARFS, MAX_CROSSINGS, 3, times))
+
+    def test_descent(self):
+        scheme = greedy_scheme(2)
+        times = [random.Random(nr).randint(1, 100) for nr in range(NUMBER_OF_DWARFS)]
+        total_time, annealed = anneal(scheme, times, MAX_CROSSINGS, 2, STEPS, start_temperature=0, seed=1)
+        self.assertLess(total_time, verify_scheme(scheme, NUMBER_OF_DWARFS, MAX_CROSSINGS, 2, times)[0])
+        self.assertEqual((total_time, []), verify_scheme(annealed, NUMBER_OF_DWARFS, MAX_CROSSINGS, 2, times))
+
+    def test_same_seed(self):
+        scheme = greedy_scheme(3)
+        times = [random.Random(nr).randint(1, 100) for nr in range(NUMBER_OF_DWARFS)]
+        self.assertEqual(anneal(scheme, times, MAX_CROSSINGS, 3, 2000, seed=3),
+                         anneal(scheme, times, MAX_CROSSINGS, 3, 2000, seed=3))
+
+
+if __name__ == '__main__':
+    unittest.main()
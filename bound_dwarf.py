@@ -0,0 +1,96 @@
+"""
+Lower Bound for the Dwarf Bridge Crossing Problem.
+
+The greedy algorithm shows that its scheme is the best one by the average cross loss and return time, which only
+holds for the problem as it is originally stated. This program gives a total time that no scheme can beat, for any
+crossing times, crossing limits and number of dwarfs on the bridge, without searching for a scheme. How far the
+time of a scheme is from the bound tells how much there can at most be left to gain.
+
+With n dwarfs and at most k on the bridge, a scheme with F crossings has F - 1 walks back with the lantern. Every
+walk back needs a dwarf that walks back, and that dwarf has to cross once more. The crossings then hold every dwarf
+once and those F - 1 extra crossings, at most k at a time, so F is at least (n - 1) / (k - 1).
+
+  * A dwarf with the crossing limit m can walk back (m - 1) / 2 times, rounded down. The walks back take at least
+    the sum of the F - 1 shortest walks the dwarfs can make.
+  * Sort the crossings by the crossing time, the slowest first. The crossing with the j-th slowest pace, counted
+    from 0, is not faster than crossing number j * k in that order, since the crossings before it don't fit in the
+    j crossings that are slower. The extra crossings are at least as fast as the walks back.
+
+Both sums only grow with F, so the bound is given by the smallest F. It takes a sort of the crossing times, and
+is found in O(n log n).
+"""
+from exact_dwarf import scheme_time
+import dwarf
+import greedy_min_dwarf
+import random_dwarf
+
+
+NUMBER_OF_DWARFS = 300
+MAX_CROSSINGS = 3
+MAX_TOGETHER = 2
+NUMBER_OF_TRIES = 100
+
+
+def lower_bound(crossing_times, max_crossings=MAX_CROSSINGS, max_together=MAX_TOGETHER):
+    """Returns a total time that no scheme can beat for the dwarfs to cross the bridge, all starting at start.
+       crossing_times[nr - 1] is the crossing time of dwarf number nr, and max_crossings is either the same for
+       all dwarfs or a list with the limit of each dwarf. Returns None if the dwarfs can't all get across."""
+    num_of_dwarfs = len(crossing_times)
+    if isinstance(max_crossings, int):
+        max_crossings = [max_crossings] * num_of_dwarfs
+    if num_of_dwarfs == 0:
+        return 0
+    if min(max_crossings) < 1:
+        return None
+    if num_of_dwarfs == 1:
+        return crossing_times[0]
+    if max_together < 2:
+        return None
+    crossings_needed = -(-(num_of_dwarfs - 1) // (max_together - 1))
+    walks_needed = crossings_needed - 1
+    by_time = sorted(zip(crossing_times, max_crossings))
+    walks = []  # Number of walks back of each dwarf, in the order of by_time
+    walks_left = walks_needed
+    walk_time = 0
+    for crossing_time, crossing_limit in by_time:
+        walk_count = min((crossing_limit - 1) // 2, walks_left)
+        walks.append(walk_count)
+        walks_left -= walk_count
+        walk_time += walk_count * crossing_time
+    if walks_left:
+        return None
+    cross_time = 0
+    position = 0
+    for (crossing_time, _), walk_count in zip(reversed(by_time), reversed(walks)):
+        # Crossings position to position + walk_count in the order, of which every max_together:th sets a pace
+        first = -(-position // max_together)
+        last = min((position + walk_count) // max_together, crossings_needed - 1)
+        cross_time += crossing_time * max(last - first + 1, 0)
+        position += walk_count + 1
+    return cross_time + walk_time
+
+
+def optimality_gap(scheme, crossing_times, max_crossings=MAX_CROSSINGS, max_together=MAX_TOGETHER):
+    """Returns the total time of the scheme, the lower bound, and how much slower the scheme is than the bound, as
+       a fraction of the bound. The scheme can come from greedy_min_crossing, random_crossing or any other
+       solver."""
+    total_time = scheme_time(scheme, crossing_times)
+    bound = lower_bound(crossing_times, max_crossings, max_together)
+    gap = (total_time - bound) / bound if bound else 0.0
+    return total_time, bound, gap
+
+
+def main():
+    """Starts the execution and presents how far the greedy scheme and the best random scheme are from the bound."""
+    crossing_times = [t for t in range(1, NUMBER_OF_DWARFS + 1)]
+    _, greedy_scheme = greedy_min_dwarf.greedy_min_crossing(NUMBER_OF_DWARFS, MAX_CROSSINGS, dwarf.START,
+                                                             MAX_TOGETHER)
+    _, random_scheme = random_dwarf.random_crossing(NUMBER_OF_TRIES, NUMBER_OF_DWARFS, MAX_CROSSINGS, dwarf.START,
+                                                    MAX_TOGETHER, seed=0)
+    for name, scheme in (("Greedy", greedy_scheme), ("Random", random_scheme)):
+        total_time, bound, gap = optimality_gap(scheme, crossing_times, MAX_CROSSINGS, MAX_TOGETHER)
+        print(f"{name}: total time {total_time}, lower bound {bound}, gap {gap:.2%}")
+
+
+if __name__ == '__main__':
+    main()
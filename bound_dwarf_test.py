@@ -0,0 +1,61 @@
+import unittest
+import dwarf
+from greedy_min_dwarf import GreedySolver
+import random
+from bound_dwarf import lower_bound, optimality_gap
+from exact_dwarf import brute_force_min_crossing, exact_min_crossing
+from genetic_dwarf import genetic_crossing
+
+
+class LowerBoundTests(unittest.TestCase):
+
+    def test_search(self):
+        rng = random.Random(3)
+        for _ in range(40):
+            num_of_dwarfs = rng.randint(1, 5)
+            crossing_times = [rng.randint(1, 20) for _ in range(num_of_dwarfs)]
+            max_crossings = rng.choice([1, 3, 5])
+            max_together = rng.choice([2, 3])
+            best_time = brute_force_min_crossing(crossing_times, max_crossings, max_together)
+            bound = lower_bound(crossing_times, max_crossings, max_together)
+            if best_time is None:
+                self.assertIsNone(bound)
+            else:
+                self.assertLessEqual(bound, best_time)
+
+    def test_exact(self):
+        rng = random.Random(4)
+        for _ in range(40):
+            num_of_dwarfs = rng.randint(2, 100)
+            crossing_times = [rng.randint(1, rng.choice([3, 1000])) for _ in range(num_of_dwarfs)]
+            max_crossings = [rng.choice([3, 3, 5, 9]) for _ in range(num_of_dwarfs)]
+            total_time, _ = exact_min_crossing(crossing_times, max_crossings)
+            self.assertLessEqual(lower_bound(crossing_times, max_crossings, 2), total_time)
+
+    def test_original_problem(self):
+        crossing_times = list(range(1, 301))
+        _, scheme = GreedySolver(300, 3, dwarf.START, 2).solve()
+        total_time, bound, gap = optimality_gap(scheme, crossing_times, 3, 2)
+        self.assertEqual(89551, total_time)
+        self.assertEqual(89402, bound)
+        self.assertAlmostEqual((89551 - 89402) / 89402, gap)
+
+    def test_more_on_the_bridge(self):
+        crossing_times = [t for t in range(1, 61)]
+        for max_together in [3, 4]:
+            _, scheme = GreedySolver(60, 3, dwarf.START, max_together).solve()
+            total_time, bound, _ = optimality_gap(scheme, crossing_times, 3, max_together)
+            self.assertLessEqual(bound, total_time)
+            best_times, scheme = genetic_crossing(60, 3, dwarf.START, max_together, generations=5, seed=0)
+            self.assertLessEqual(bound, best_times[-1][1])
+
+    def test_no_scheme(self):
+        self.assertIsNone(lower_bound([1, 2, 3], 1))
+        self.assertIsNone(lower_bound([1, 2, 3], 3, 1))
+        self.assertIsNone(lower_bound([1, 2, 3, 4], [3, 1, 1, 1]))
+        self.assertEqual(0, lower_bound([]))
+        self.assertEqual(7, lower_bound([7], 3, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -22,3 +22,12 @@ class DwarfStartingPositionError(DwarfErrors):
         self.reason = reason
         message = f"\nDwarf number {dwarf_nr} cannot start at {pos}, since {reason}"
         super().__init__(message)
+
+
+class DwarfSchemeError(DwarfErrors):
+
+    def __init__(self, move_nr, reason):
+        self.move_nr = move_nr
+        self.reason = reason
+        message = f"\nMove number {move_nr} of the scheme can't be made, since {reason}"
+        super().__init__(message)
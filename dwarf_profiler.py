@@ -0,0 +1,195 @@
+"""
+Profiling of the Solvers for the Dwarf Bridge Crossing Problem.
+
+The solvers only measure how long a whole solution takes. This program splits that time into the phases of the
+work, to show where the time goes before anything is tuned:
+  * sort: putting the dwarfs in order after their crossing times with time_order, when a solver is set up.
+  * selection: choosing the dwarfs that cross next, e.g. faster_dwarf_at_start and most_similar_dwarfs in the
+    greedy algorithm, the lookups of the dwarfs at start in the array greedy, and drawing the dwarfs in a
+    random try.
+  * moves: making the crossings and the walks back, e.g. cross and return_with_lantern.
+  * bookkeeping: the rest of each crossing, such as the time lost and the statistics, and setting up the
+    dwarfs of a random try.
+Every call is timed with time.perf_counter_ns, and a phase only counts its own time, not the time of the phases
+called from it. What is left of the wall time, e.g. the loop around the crossings, is reported as other.
+
+The solvers are not changed for this. The methods of a solver, or the dwarfs and the random numbers of a random
+try, are wrapped with timers only when they are profiled, so there is no cost at all when no profiling is done.
+"""
+from array import array
+from contextlib import contextmanager
+from dwarf import Dwarf
+from greedy_min_dwarf import ArrayGreedySolver, GreedySolver
+import dwarf
+import greedy_min_dwarf
+import random
+import random_dwarf
+import sys
+import time
+
+
+NUMBER_OF_DWARFS = 1000000
+RANDOM_DWARFS = 10000  # Dwarfs in the profiled random tries, which take time quadratic in the number of dwarfs
+NUMBER_OF_TRIES = 10
+MAX_CROSSINGS = 3
+MAX_TOGETHER = 2
+PHASES = ("sort", "selection", "moves", "bookkeeping")
+PERCENTILES = (50, 90, 99)
+GREEDY_PHASES = {"selection": ("faster_dwarf_at_start", "most_similar_dwarfs"),
+                 "moves": ("get_fast_dwarf_to_finish", "get_similar_dwarfs_to_finish", "cross",
+                           "return_with_lantern"),
+                 "bookkeeping": ("cross_the_bridge",)}  # Methods of a greedy solver timed for each phase
+ARRAY_SELECTION = ("first", "group")  # Methods of the dwarfs at start in the array greedy timed as selection
+
+
+class PhaseProfiler:
+    """Collects the time of every call in each phase, in nanoseconds, and the wall time of what is profiled."""
+
+    def __init__(self):
+        """Sets up a profiler with nothing timed yet."""
+        self.samples = {phase: array("q") for phase in PHASES}
+        self.nested = []  # Time spent in the phases called from each call in progress
+        self.wall_time = 0
+
+    def add(self, phase, elapsed):
+        """Adds a call in the phase that took elapsed nanoseconds, of which the phases called from it took the
+           time in the innermost place of nested."""
+        self.samples[phase].append(elapsed - self.nested.pop())
+        if self.nested:
+            self.nested[-1] += elapsed
+
+    def timed(self, phase, function):
+        """Returns the function wrapped so that every call of it is added to the phase."""
+        nested, add, clock = self.nested, self.add, time.perf_counter_ns
+
+        def timed_function(*args, **kwargs):
+            nested.append(0)
+            start = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                add(phase, clock() - start)
+        return timed_function
+
+    def wrap(self, target, names, phase):
+        """Replaces the methods with the names on the target object with timed ones, for the target only. Names
+           the target doesn't have are skipped."""
+        for name in names:
+            if hasattr(target, name):
+                setattr(target, name, self.timed(phase, getattr(target, name)))
+
+    @contextmanager
+    def patched(self, module, name, phase):
+        """Replaces the function with the name in the module with a timed one in a with statement, and puts the
+           function back after it."""
+        function = getattr(module, name)
+        setattr(module, name, self.timed(phase, function))
+        try:
+            yield
+        finally:
+            setattr(module, name, function)
+
+    @contextmanager
+    def phase(self, phase):
+        """Adds the time of the block in a with statement to the phase, as one call."""
+        self.nested.append(0)
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.add(phase, time.perf_counter_ns() - start)
+
+    @contextmanager
+    def wall(self):
+        """Adds the time of the block in a with statement to the wall time."""
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.wall_time += time.perf_counter_ns() - start
+
+    def report(self):
+        """Returns a dict with, for every phase and for other, the number of calls, the total time in nanoseconds
+           and its share of the wall time, and for the phases the percentiles of the time of a call."""
+        result = {}
+        for phase in PHASES:
+            samples = sorted(self.samples[phase])
+            result[phase] = {"count": len(samples), "total": sum(samples),
+                             "share": sum(samples) / self.wall_time if self.wall_time else 0.0}
+            for percentile in PERCENTILES:
+                # The nearest rank, the smallest time that at least the percentile of the calls don't exceed
+                rank = max(-(-percentile * len(samples) // 100), 1)
+                result[phase][f"p{percentile}"] = samples[rank - 1] if samples else 0
+            result[phase]["max"] = samples[-1] if samples else 0
+        other = self.wall_time - sum(result[phase]["total"] for phase in PHASES)
+        result["other"] = {"count": 0, "total": other, "share": other / self.wall_time if self.wall_time else 0.0}
+        return result
+
+    def print_report(self, title):
+        """Prints the report as a table, with the times of a call in microseconds."""
+        print(f"\n{title}: wall time {self.wall_time / 1e9:.3f} s")
+        print(f"{'Phase':<12}{'Calls':>10}{'Total s':>10}{'Share':>8}" +
+              "".join(f"{'p' + str(percentile) + ' us':>12}" for percentile in PERCENTILES) + f"{'max us':>12}")
+        for phase, row in self.report().items():
+            line = f"{phase:<12}{row['count']:>10}{row['total'] / 1e9:>10.3f}{row['share']:>8.1%}"
+            if phase != "other":
+                line += "".join(f"{row['p' + str(percentile)] / 1e3:>12.2f}" for percentile in PERCENTILES)
+                line += f"{row['max'] / 1e3:>12.2f}"
+            print(line)
+
+
+def profile_greedy(num_of_dwarfs, max_crossings, start_pos, max_together, crossing_times=None, arrays=False,
+                   profiler=None):
+    """Solves the problem with GreedySolver, or ArrayGreedySolver with arrays set, while profiling it. Returns
+       the total time, the scheme and the profiler. The calls of time_order while the solver is set up are the
+       sort phase, and the rest of the setup is other."""
+    profiler = PhaseProfiler() if profiler is None else profiler
+    with profiler.wall():
+        with profiler.patched(greedy_min_dwarf, "time_order", "sort"):
+            solver = (ArrayGreedySolver if arrays else GreedySolver)(num_of_dwarfs, max_crossings, start_pos,
+                                                                     max_together, crossing_times)
+        for phase, names in GREEDY_PHASES.items():
+            profiler.wrap(solver, names, phase)
+        if arrays:
+            profiler.wrap(solver.at_start, ARRAY_SELECTION, "selection")
+        total_time, scheme = solver.solve()
+    return total_time, scheme, profiler
+
+
+def profile_random(tries, num_of_dwarfs, max_crossings, start_pos, max_together, seed=None, profiler=None):
+    """Makes the tries of random_crossing with the seed while profiling them, and returns the improvements as
+       random_crossing does, and the profiler. Drawing the dwarfs is the selection, the crossings and walks back
+       of the dwarfs are the moves, and setting up the dwarfs for a try and the rest of random_try are the
+       bookkeeping. A random try sorts nothing."""
+    profiler = PhaseProfiler() if profiler is None else profiler
+    root = random_dwarf.root_seed(seed)
+    best_times = []
+    try_dwarfs = profiler.timed("bookkeeping", random_dwarf.random_try)
+    for try_nr in range(1, tries + 1):
+        try_seed = random_dwarf.child_seed(root, try_nr)
+        with profiler.wall(), profiler.phase("bookkeeping"):
+            dwarfs = [Dwarf(dwarf_nr, dwarf_nr, 0, max_crossings, start_pos)
+                      for dwarf_nr in range(1, num_of_dwarfs + 1)]
+        for d in dwarfs:  # Outside of the wall time, since the timers are not part of a try
+            profiler.wrap(d, ("cross", "go_back"), "moves")
+        randint = profiler.timed("selection", random.Random(try_seed).randint)
+        with profiler.wall():
+            total_time, _ = try_dwarfs(dwarfs, max_together, randint)
+        if not best_times or total_time < best_times[-1][1]:
+            best_times.append([try_nr, total_time, try_seed])
+    return best_times, profiler
+
+
+def main(num_of_dwarfs=NUMBER_OF_DWARFS):
+    """Profiles the greedy algorithm with the dwarfs in arrays, and a few random tries, and presents where the
+       time goes."""
+    total_time, _, profiler = profile_greedy(num_of_dwarfs, MAX_CROSSINGS, dwarf.START, MAX_TOGETHER, arrays=True)
+    profiler.print_report(f"Greedy, {num_of_dwarfs} dwarfs, total time {total_time}")
+    random_dwarfs = min(num_of_dwarfs, RANDOM_DWARFS)
+    best_times, profiler = profile_random(NUMBER_OF_TRIES, random_dwarfs, MAX_CROSSINGS, dwarf.START, MAX_TOGETHER,
+                                          seed=0)
+    profiler.print_report(f"Random, {random_dwarfs} dwarfs, {NUMBER_OF_TRIES} tries, best time {best_times[-1][1]}")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else NUMBER_OF_DWARFS)
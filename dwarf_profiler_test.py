@@ -0,0 +1,74 @@
+import unittest
+import dwarf
+from dwarf_profiler import PHASES, PhaseProfiler, profile_greedy, profile_random
+from greedy_min_dwarf import ArrayGreedySolver, GreedySolver, time_order
+import greedy_min_dwarf
+import random_dwarf
+import time
+
+
+class PhaseProfilerTests(unittest.TestCase):
+
+    def test_nested_phases(self):
+        profiler = PhaseProfiler()
+        inner = profiler.timed("selection", lambda: time.sleep(0.02))
+
+        def outer():
+            inner()
+            inner()
+        with profiler.wall():
+            profiler.timed("moves", outer)()
+        report = profiler.report()
+        self.assertEqual(2, report["selection"]["count"])
+        self.assertGreaterEqual(report["selection"]["total"], 40_000_000)
+        self.assertLess(report["moves"]["total"], 10_000_000)  # Only its own time, not the time of the calls
+        self.assertGreaterEqual(report["other"]["total"], 0)
+        self.assertEqual(0, report["sort"]["count"])
+
+    def test_percentiles(self):
+        profiler = PhaseProfiler()
+        for elapsed in range(1, 101):
+            profiler.nested.append(0)
+            profiler.add("bookkeeping", elapsed)
+        report = profiler.report()["bookkeeping"]
+        self.assertEqual((100, 5050), (report["count"], report["total"]))
+        self.assertEqual((50, 90, 99, 100), (report["p50"], report["p90"], report["p99"], report["max"]))
+
+
+class ProfileGreedyTests(unittest.TestCase):
+
+    def test_same_result(self):
+        for arrays in [False, True]:
+            total_time, scheme, profiler = profile_greedy(300, 3, dwarf.START, 2, [t % 7 + 1 for t in range(300)],
+                                                          arrays=arrays)
+            solver = (ArrayGreedySolver if arrays else GreedySolver)(300, 3, dwarf.START, 2,
+                                                                     [t % 7 + 1 for t in range(300)])
+            self.assertEqual(solver.solve(), (total_time, scheme))
+            report = profiler.report()
+            self.assertEqual(1 if arrays else 2, report["sort"]["count"])  # Once for each container of dwarfs
+            self.assertEqual(len(scheme) // 2 + 1, report["bookkeeping"]["count"])
+            self.assertGreaterEqual(report["selection"]["count"], len(scheme) // 2 + 1)
+            self.assertEqual(len(scheme) + 1, report["moves"]["count"])  # Also called after the last crossing
+            self.assertAlmostEqual(1.0, sum(report[phase]["share"] for phase in PHASES + ("other",)))
+        self.assertIs(greedy_min_dwarf.__dict__["time_order"], time_order)
+
+    def test_solvers_unchanged(self):
+        profile_greedy(50, 3, dwarf.START, 2)
+        solver = GreedySolver(50, 3, dwarf.START, 2)
+        self.assertNotIn("cross_the_bridge", vars(solver))
+        self.assertIs(GreedySolver.__dict__["cross_the_bridge"], type(solver).cross_the_bridge)
+
+
+class ProfileRandomTests(unittest.TestCase):
+
+    def test_same_result(self):
+        best_times, profiler = profile_random(20, 30, 3, dwarf.START, 2, seed=4)
+        self.assertEqual(random_dwarf.random_crossing(20, 30, 3, dwarf.START, 2, seed=4)[0], best_times)
+        report = profiler.report()
+        self.assertEqual(0, report["sort"]["count"])
+        self.assertEqual(40, report["bookkeeping"]["count"])  # Setting up the dwarfs and the rest of each try
+        self.assertEqual(report["selection"]["count"], report["moves"]["count"])
+
+
+if __name__ == '__main__':
+    unittest.main()
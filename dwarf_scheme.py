@@ -0,0 +1,324 @@
+"""
+Compact Schemes for the Dwarf Bridge Crossing Problem.
+
+A scheme is normally a list of moves, where every move is a list of the dwarf numbers followed by "cross" or
+"go back". That is easy to read, but every move is a list of its own, with a string, and costs around a hundred
+bytes. A compact scheme keeps the same moves in three typed arrays instead: the kind of every move, the dwarf
+numbers of every move with room for max_together dwarfs, where 0 is an empty place, and the time every move
+takes. That is less than twenty bytes for a move with two dwarfs, and two schemes are compared array by array.
+The times are kept as 64-bit integers, or as floats once a move takes a time that is not an integer.
+
+A compact scheme can be given to the solvers in place of a list, since moves in the list form are appended to it
+the same way, and it can always be turned back into a list.
+
+For schemes too long to keep in memory at all, the solvers can instead write the moves to a file as they make
+them, through a writer that is given in place of the list. A writer keeps a buffer of moves and writes it when it
+is full, so it needs the same memory no matter how long the scheme is. JsonLinesWriter writes one move in the
+list form on every line, and BinaryWriter writes the arrays of a compact scheme for every buffer, after a header
+with the number of dwarfs in a move, and a version that tells if the times are integers or floats. read_scheme
+reads both kinds of files back, a buffer at a time.
+"""
+from array import array
+import json
+import numbers
+import struct
+import sys
+
+
+KINDS = ("cross", "go back")  # The kinds of moves, by their code in a compact scheme
+CROSS = 0
+GO_BACK = 1
+BUFFER_MOVES = 65536  # Number of moves a writer keeps before writing them, and read_scheme reads at a time
+MAGIC = b"DWSC"  # First bytes of a binary scheme file
+HEADER = struct.Struct("<4sHH")  # Magic bytes, version and the number of dwarfs in a move
+CHUNK = struct.Struct("<I")  # Number of moves in a chunk of a binary scheme file
+VERSION = 1
+FLOAT_VERSION = 2  # Version of a binary scheme file with the times as floats instead of integers
+
+
+class CompactScheme:
+    """Keeps the moves of a scheme in typed arrays. Indexing gives a move in the list form, slicing gives a new
+       compact scheme, and a compact scheme is equal to another one, or to a list, with the same moves."""
+
+    def __init__(self, max_together, crossing_times=None):
+        """Sets up an empty scheme with room for max_together dwarfs in a move. The time of a move is the crossing
+           time of its slowest dwarf, where dwarf number nr has the crossing time crossing_times[nr - 1], and nr
+           when no crossing times are given, the same as for generate_dwarfs."""
+        self.max_together = max_together
+        self.crossing_times = crossing_times
+        self.kinds = array("b")
+        self.dwarf_nrs = array("i")
+        self.durations = array("q")
+
+    @classmethod
+    def from_list(cls, scheme, max_together, crossing_times=None):
+        """Returns a compact scheme with the moves of the scheme in the list form."""
+        compact = cls(max_together, crossing_times)
+        compact.extend(scheme)
+        return compact
+
+    def append(self, move):
+        """Adds a move given in the list form, e.g. [1, 2, "cross"] or [1, "go back"]."""
+        *dwarf_nrs, kind = move
+        if len(dwarf_nrs) > self.max_together:
+            raise ValueError(f"the move {move} has more than {self.max_together} dwarfs")
+        if self.crossing_times is None:
+            duration = max(dwarf_nrs)
+        else:
+            duration = max(self.crossing_times[dwarf_nr - 1] for dwarf_nr in dwarf_nrs)
+        if self.durations.typecode == "q" and not isinstance(duration, numbers.Integral):
+            self.durations = array("d", self.durations)  # A time like 2.5 needs floats from now on
+        elif isinstance(duration, numbers.Integral) and not -2 ** 63 <= duration < 2 ** 63:
+            raise ValueError(f"the move {move} takes {duration} minutes, which doesn't fit in 64 bits")
+        self.kinds.append(KINDS.index(kind))
+        self.dwarf_nrs.extend(dwarf_nrs)
+        self.dwarf_nrs.extend([0] * (self.max_together - len(dwarf_nrs)))
+        self.durations.append(duration)
+
+    def extend(self, moves):
+        """Adds the moves given in the list form."""
+        for move in moves:
+            self.append(move)
+
+    def move(self, index):
+        """Returns the kind, the dwarf numbers and the time of the move."""
+        first = index * self.max_together
+        dwarf_nrs = [dwarf_nr for dwarf_nr in self.dwarf_nrs[first:first + self.max_together] if dwarf_nr]
+        return self.kinds[index], dwarf_nrs, self.durations[index]
+
+    def total_time(self):
+        """Returns the time all the moves take together."""
+        return sum(self.durations)
+
+    def nbytes(self):
+        """Returns the number of bytes the moves take up in the arrays."""
+        return sum(len(a) * a.itemsize for a in (self.kinds, self.dwarf_nrs, self.durations))
+
+    def to_list(self):
+        """Returns the scheme in the list form."""
+        return [self[index] for index in range(len(self))]
+
+    def __len__(self):
+        """Returns the number of moves."""
+        return len(self.kinds)
+
+    def __iter__(self):
+        """Iterates over the moves in the list form."""
+        return (self[index] for index in range(len(self)))
+
+    def __getitem__(self, index):
+        """Returns the move at the index in the list form, or a compact scheme with the moves of a slice."""
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            part = CompactScheme(self.max_together, self.crossing_times)
+            if step == 1:
+                part.kinds = self.kinds[start:stop]
+                part.dwarf_nrs = self.dwarf_nrs[start * self.max_together:max(stop, start) * self.max_together]
+                part.durations = self.durations[start:stop]
+            else:
+                part.durations = array(self.durations.typecode)
+                for move_nr in range(start, stop, step):
+                    part.kinds.append(self.kinds[move_nr])
+                    part.dwarf_nrs.extend(self.dwarf_nrs[move_nr * self.max_together:
+                                                         (move_nr + 1) * self.max_together])
+                    part.durations.append(self.durations[move_nr])
+            return part
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("move index out of range")
+        kind, dwarf_nrs, _ = self.move(index)
+        return dwarf_nrs + [KINDS[kind]]
+
+    def __eq__(self, other):
+        """Returns True if the other scheme, compact or a list, has the same moves."""
+        if isinstance(other, CompactScheme):
+            if self.max_together == other.max_together:
+                return self.kinds == other.kinds and self.dwarf_nrs == other.dwarf_nrs and \
+                    self.durations == other.durations
+            return self.to_list() == other.to_list()
+        if isinstance(other, list):
+            return self.to_list() == other
+        return NotImplemented
+
+    def __repr__(self):
+        """Returns the scheme in the list form, with the kind of scheme around it."""
+        return f"CompactScheme({self.to_list()})"
+
+
+class JsonLinesWriter:
+    """Writes the moves of a scheme to a file as they are made, one move in the list form as JSON on every line."""
+
+    def __init__(self, file, buffer_moves=BUFFER_MOVES):
+        """Sets up a writer to the file, given as a path or as a text file that is open for writing."""
+        self.own_file = isinstance(file, str)
+        self.file = open(file, "w") if self.own_file else file
+        self.buffer_moves = buffer_moves
+        self.lines = []
+        self.count = 0
+
+    def append(self, move):
+        """Adds a move given in the list form."""
+        self.lines.append(json.dumps(move))
+        self.count += 1
+        if len(self.lines) >= self.buffer_moves:
+            self.flush()
+
+    def extend(self, moves):
+        """Adds the moves given in the list form."""
+        for move in moves:
+            self.append(move)
+
+    def flush(self):
+        """Writes the moves in the buffer to the file."""
+        if self.lines:
+            self.file.write("\n".join(self.lines) + "\n")
+            self.lines = []
+        self.file.flush()
+
+    def close(self):
+        """Writes what is left in the buffer, and closes the file if the writer opened it."""
+        self.flush()
+        if self.own_file:
+            self.file.close()
+
+    def __len__(self):
+        """Returns the number of moves written so far."""
+        return self.count
+
+    def __enter__(self):
+        """Returns the writer, for use in a with statement."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Closes the writer at the end of a with statement."""
+        self.close()
+
+
+class BinaryWriter:
+    """Writes the moves of a scheme to a binary file as they are made. Every buffer of moves is written as a
+       chunk with the number of moves, followed by the kinds, the dwarf numbers and the times of the moves as
+       little-endian arrays, the same arrays as in a compact scheme. The times are written as floats when any of
+       the crossing times is not an integer, see time_typecode, and as 64-bit integers otherwise."""
+
+    def __init__(self, file, max_together, crossing_times=None, buffer_moves=BUFFER_MOVES):
+        """Sets up a writer to the file, given as a path or as a binary file that is open for writing. The times
+           of the moves are given by the crossing times, as for a compact scheme."""
+        self.own_file = isinstance(file, str)
+        self.file = open(file, "wb") if self.own_file else file
+        self.buffer_moves = buffer_moves
+        self.typecode = "q" if crossing_times is None else time_typecode(crossing_times)
+        self.buffer = self.new_buffer(max_together, crossing_times)
+        self.count = 0
+        self.file.write(HEADER.pack(MAGIC, VERSION if self.typecode == "q" else FLOAT_VERSION, max_together))
+
+    def new_buffer(self, max_together, crossing_times):
+        """Returns an empty compact scheme for the moves to write, with the times in the typecode of the file."""
+        buffer = CompactScheme(max_together, crossing_times)
+        buffer.durations = array(self.typecode)
+        return buffer
+
+    def append(self, move):
+        """Adds a move given in the list form."""
+        self.buffer.append(move)
+        self.count += 1
+        if len(self.buffer) >= self.buffer_moves:
+            self.flush()
+
+    def extend(self, moves):
+        """Adds the moves given in the list form."""
+        for move in moves:
+            self.append(move)
+
+    def flush(self):
+        """Writes the moves in the buffer to the file as a chunk."""
+        buffer = self.buffer
+        if len(buffer):
+            self.file.write(CHUNK.pack(len(buffer)))
+            for values in (buffer.kinds, buffer.dwarf_nrs, buffer.durations):
+                if sys.byteorder == "big":
+                    values = array(values.typecode, values)
+                    values.byteswap()
+                self.file.write(values.tobytes())
+            self.buffer = self.new_buffer(buffer.max_together, buffer.crossing_times)
+        self.file.flush()
+
+    def close(self):
+        """Writes what is left in the buffer, and closes the file if the writer opened it."""
+        self.flush()
+        if self.own_file:
+            self.file.close()
+
+    def __len__(self):
+        """Returns the number of moves written so far."""
+        return self.count
+
+    def __enter__(self):
+        """Returns the writer, for use in a with statement."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Closes the writer at the end of a with statement."""
+        self.close()
+
+
+def time_typecode(crossing_times):
+    """Returns the typecode of the arrays that keep the crossing times, and the times of the moves made with them:
+       "q" when all the times are integers, and "d" when any of them is not, e.g. 2.5. Integer times have to fit
+       in 64 bits, since a "d" array would round them, and a ValueError is raised for a time that doesn't."""
+    if isinstance(crossing_times, array):
+        return "d" if crossing_times.typecode in "fd" else "q"
+    if not all(isinstance(t, numbers.Integral) for t in crossing_times):
+        return "d"
+    too_long = [t for t in crossing_times if not -2 ** 63 <= t < 2 ** 63]
+    if too_long:
+        raise ValueError(f"the crossing time {too_long[0]} doesn't fit in 64 bits")
+    return "q"
+
+
+def scheme_writer(path, max_together, crossing_times=None, buffer_moves=BUFFER_MOVES):
+    """Returns a JsonLinesWriter for a path ending with .jsonl, and a BinaryWriter for any other path."""
+    if path.endswith(".jsonl"):
+        return JsonLinesWriter(path, buffer_moves)
+    return BinaryWriter(path, max_together, crossing_times, buffer_moves)
+
+
+def read_scheme(path, crossing_times=None, chunk_moves=BUFFER_MOVES):
+    """Reads a scheme written by either writer, and yields its moves as compact schemes of at most chunk_moves
+       moves, or the chunks the binary file was written in. The times of the moves in a JSON Lines file are
+       given by the crossing times, as for a compact scheme, and a binary file has the times it was written with,
+       as integers or floats depending on its version."""
+    with open(path, "rb") as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            file.seek(0)
+            yield from read_json_lines(file, crossing_times, chunk_moves)
+            return
+        _, version, max_together = HEADER.unpack(MAGIC + file.read(HEADER.size - len(MAGIC)))
+        if version not in (VERSION, FLOAT_VERSION):
+            raise ValueError(f"the scheme file {path} has version {version}, and only versions {VERSION} and "
+                             f"{FLOAT_VERSION} can be read")
+        while header := file.read(CHUNK.size):
+            count, = CHUNK.unpack(header)
+            chunk = CompactScheme(max_together, crossing_times)
+            if version == FLOAT_VERSION:
+                chunk.durations = array("d")
+            for values, length in ((chunk.kinds, count), (chunk.dwarf_nrs, count * max_together),
+                                   (chunk.durations, count)):
+                values.frombytes(file.read(length * values.itemsize))
+                if sys.byteorder == "big":
+                    values.byteswap()
+            yield chunk
+
+
+def read_json_lines(file, crossing_times, chunk_moves):
+    """Yields the moves on the lines of the file as compact schemes of at most chunk_moves moves, with room for as
+       many dwarfs as the largest move of each."""
+    moves = []
+    for line in file:
+        if line.strip():
+            moves.append(json.loads(line))
+            if len(moves) >= chunk_moves:
+                yield CompactScheme.from_list(moves, max(len(move) - 1 for move in moves), crossing_times)
+                moves = []
+    if moves:
+        yield CompactScheme.from_list(moves, max(len(move) - 1 for move in moves), crossing_times)
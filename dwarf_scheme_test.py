@@ -0,0 +1,138 @@
+import unittest
+import dwarf
+from dwarf_scheme import BinaryWriter, CompactScheme, JsonLinesWriter, read_scheme, scheme_writer, time_typecode
+from greedy_min_dwarf import ArrayGreedySolver, GreedySolver, greedy_min_crossing
+from random_dwarf import random_crossing
+import io
+import os
+import tempfile
+
+
+class CompactSchemeTests(unittest.TestCase):
+
+    def setUp(self):
+        self.scheme = [[1, 2, "cross"], [1, "go back"], [1, 3, "cross"], [2, "go back"], [2, 4, "cross"]]
+        self.crossing_times = [1, 2, 5, 10]
+        self.compact = CompactScheme.from_list(self.scheme, 2, self.crossing_times)
+
+    def test_to_list(self):
+        self.assertEqual(self.scheme, self.compact.to_list())
+        self.assertEqual(self.scheme, list(self.compact))
+        self.assertEqual(5, len(self.compact))
+        self.assertEqual([2, 4, "cross"], self.compact[-1])
+        self.assertEqual((1, [2], 2), self.compact.move(3))
+        self.assertEqual(20, self.compact.total_time())
+        with self.assertRaises(IndexError):
+            self.compact[5]
+
+    def test_slicing(self):
+        for index in [slice(1, 4), slice(None, None, 2), slice(None, None, -1), slice(3, 1), slice(-2, None)]:
+            part = self.compact[index]
+            self.assertIsInstance(part, CompactScheme)
+            self.assertEqual(self.scheme[index], part.to_list())
+            self.assertEqual(sum(max(self.crossing_times[nr - 1] for nr in move[:-1]) for move in self.scheme[index]),
+                             part.total_time())
+
+    def test_equality(self):
+        self.assertEqual(self.compact, CompactScheme.from_list(self.scheme, 2, self.crossing_times))
+        self.assertEqual(self.compact, self.scheme)
+        self.assertEqual(self.compact, CompactScheme.from_list(self.scheme, 3, self.crossing_times))
+        self.assertNotEqual(self.compact, self.compact[1:])
+        self.assertNotEqual(self.compact, CompactScheme.from_list(self.scheme, 2))
+        with self.assertRaises(TypeError):
+            hash(self.compact)
+
+    def test_float_times(self):
+        compact = CompactScheme.from_list(self.scheme, 2, [1, 2.5, 5, 10])
+        self.assertEqual("d", compact.durations.typecode)
+        self.assertEqual(21.0, compact.total_time())
+        self.assertEqual([1.0, 10.0], list(compact[1::3].durations))
+        self.assertEqual(self.compact[1:2], compact[1:2])
+        with self.assertRaises(ValueError):
+            CompactScheme.from_list(self.scheme, 2, [1, 2 ** 63, 5, 10])
+
+    def test_time_typecode(self):
+        self.assertEqual("q", time_typecode([1, 2, 2 ** 63 - 1]))
+        self.assertEqual("d", time_typecode([1, 2.5]))
+        with self.assertRaises(ValueError):
+            time_typecode([1, -2 ** 63 - 1])
+
+    def test_too_many_dwarfs(self):
+        with self.assertRaises(ValueError):
+            self.compact.append([1, 2, 3, "cross"])
+
+    def test_solvers(self):
+        total_time, scheme = GreedySolver(300, 3, dwarf.START, 2).solve()
+        for solver in [GreedySolver, ArrayGreedySolver]:
+            compact_time, compact = solver(300, 3, dwarf.START, 2, scheme=CompactScheme(2)).solve()
+            self.assertIsInstance(compact, CompactScheme)
+            self.assertEqual(scheme, compact)
+            self.assertEqual(total_time, compact.total_time())
+            self.assertLess(compact.nbytes() * 4, len(scheme) * 100)
+        best_times, random_scheme = random_crossing(20, 50, 3, dwarf.START, 3, seed=1)
+        compact_times, compact = random_crossing(20, 50, 3, dwarf.START, 3, seed=1, compact=True)
+        self.assertEqual(best_times, compact_times)
+        self.assertEqual(random_scheme, compact)
+        self.assertEqual(best_times[-1][1], compact.total_time())
+
+
+class SchemeWriterTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.total_time, self.scheme = GreedySolver(300, 3, dwarf.START, 2).solve()
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def test_round_trip(self):
+        for name in ["scheme.jsonl", "scheme.dws"]:
+            with scheme_writer(self.path(name), 2, buffer_moves=100) as writer:
+                writer.extend(self.scheme)
+                self.assertLessEqual(len(writer.lines if name.endswith(".jsonl") else writer.buffer), 100)
+            self.assertEqual(len(self.scheme), len(writer))
+            chunks = list(read_scheme(self.path(name), chunk_moves=100))
+            self.assertEqual(6, len(chunks))
+            self.assertEqual(self.scheme, [move for chunk in chunks for move in chunk])
+            self.assertEqual(self.total_time, sum(chunk.total_time() for chunk in chunks))
+
+    def test_crossing_times(self):
+        crossing_times = [1, 2, 5, 10]
+        scheme = [[1, 2, "cross"], [1, "go back"], [3, 4, "cross"], [2, "go back"], [1, 2, "cross"]]
+        with BinaryWriter(self.path("scheme.dws"), 2, crossing_times) as writer:
+            writer.extend(scheme)
+        with JsonLinesWriter(self.path("scheme.jsonl")) as writer:
+            writer.extend(scheme)
+        self.assertEqual([17], [chunk.total_time() for chunk in read_scheme(self.path("scheme.dws"))])
+        self.assertEqual([17], [chunk.total_time() for chunk in read_scheme(self.path("scheme.jsonl"),
+                                                                              crossing_times)])
+        with BinaryWriter(self.path("float.dws"), 2, [1, 2, 5, 10.5]) as writer:
+            writer.extend(scheme)
+        self.assertEqual([17.5], [chunk.total_time() for chunk in read_scheme(self.path("float.dws"))])
+
+    def test_open_files(self):
+        text = io.StringIO()
+        data = io.BytesIO()
+        with JsonLinesWriter(text) as text_writer, BinaryWriter(data, 2) as binary_writer:
+            text_writer.extend(self.scheme[:3])
+            binary_writer.extend(self.scheme[:3])
+        self.assertEqual('[1, 2, "cross"]\n[1, "go back"]\n[3, 4, "cross"]\n', text.getvalue())
+        self.assertEqual(8 + 4 + 3 * 17, len(data.getvalue()))
+
+    def test_solvers(self):
+        for arrays in [False, True]:
+            with scheme_writer(self.path("greedy.dws"), 2, buffer_moves=50) as writer:
+                total_time, sink = greedy_min_crossing(300, 3, dwarf.START, 2, arrays=arrays, sink=writer)
+            self.assertIs(writer, sink)
+            self.assertEqual(self.total_time, total_time)
+            self.assertEqual(self.scheme, [move for chunk in read_scheme(self.path("greedy.dws")) for move in chunk])
+        best_times, scheme = random_crossing(20, 50, 3, dwarf.START, 3, seed=1)
+        with scheme_writer(self.path("random.jsonl"), 3) as writer:
+            sink_times, sink = random_crossing(20, 50, 3, dwarf.START, 3, seed=1, sink=writer)
+        self.assertEqual(best_times, sink_times)
+        self.assertEqual(scheme, [move for chunk in read_scheme(self.path("random.jsonl")) for move in chunk])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,205 @@
+"""
+Exact Solution for the Dwarf Bridge Crossing Problem.
+
+The greedy algorithm is only known to be right for the problem as it is originally stated. This program finds the
+shortest total time for any crossing times, with at most two dwarfs on the bridge, and with a limit on the number of
+crossings that can be different for every dwarf.
+
+With n dwarfs, two crossing at a time and one walking back with the lantern, it takes n - 1 crossings and n - 2
+walks back. A dwarf that crosses d times walks back d - 1 times, which its crossing limit allows as long as
+2d - 1 is not more than the limit. The time of the walks back is then the sum of (d - 1) times the crossing time
+over the dwarfs, and the time of the crossings is the sum of the crossing times of the slower dwarf of every pair.
+So the total time only depends on how many times each dwarf crosses, and how many of those crossings it is the
+slower one of its pair, not on who it crosses with.
+
+The dwarfs are gone through from the slowest to the fastest. Every crossing a dwarf makes as the slower one is left
+open, waiting for a faster partner, and every other crossing takes an open crossing of a slower dwarf. The state
+is the number of open crossings and the number of walks back so far, and the total time is the smallest found for
+each state. In the end there must be no open crossings and n - 2 walks back.
+
+Two crossings left open by two different slow dwarfs x and y, y the faster of them, and taken by two different
+faster dwarfs, can always be swapped to x with y and the two faster dwarfs together, which is never slower. After
+such swaps, the crossings open at the same time are either all from the same dwarf, or all taken by the same
+dwarf, so there are never more open than one more than the most walks back a dwarf can make. That keeps the
+number of states linear in n.
+
+The pairs are finally put in an order where there always is a dwarf at finish that can walk back with the lantern,
+and the scheme is walked through to check the total time.
+"""
+from dwarf_errors import DwarfSchemeError
+import heapq
+import itertools
+
+
+NUMBER_OF_DWARFS = 300
+MAX_CROSSINGS = 3
+
+
+def optimal_crossings(crossing_times, walks_back):
+    """Returns the shortest total time, and for each dwarf how many times it crosses and how many of those it
+       takes an open crossing of a slower dwarf. The crossing times need to be sorted, and walks_back is how
+       many times each dwarf can walk back. Returns None and an empty list if the dwarfs can't all get across."""
+    num_of_dwarfs = len(crossing_times)
+    max_open = max(walks_back) + 1
+    walks_needed = num_of_dwarfs - 2
+    walks_left = sum(walks_back)  # Walks back the dwarfs not gone through yet can make
+    states = {(0, 0): 0}
+    choices = []
+    for index in range(num_of_dwarfs - 1, -1, -1):
+        crossing_time = crossing_times[index]
+        walks_left -= walks_back[index]
+        next_states = {}
+        choice = {}
+        for (open_crossings, walks), total_time in states.items():
+            for crossings in range(1, walks_back[index] + 2):
+                new_walks = walks + crossings - 1
+                if new_walks > walks_needed:
+                    break
+                if new_walks + walks_left < walks_needed:
+                    continue
+                for taken in range(min(crossings, open_crossings) + 1):
+                    left_open = open_crossings - taken + crossings - taken
+                    if left_open > max_open:
+                        continue
+                    state = (left_open, new_walks)
+                    new_time = total_time + crossing_time * (crossings - 1 + crossings - taken)
+                    if state not in next_states or new_time < next_states[state]:
+                        next_states[state] = new_time
+                        choice[state] = (open_crossings, walks, crossings, taken)
+        states = next_states
+        choices.append(choice)
+    if (0, walks_needed) not in states:
+        return None, []
+    result = []
+    state = (0, walks_needed)
+    for choice in reversed(choices):
+        open_crossings, walks, crossings, taken = choice[state]
+        result.append((crossings, taken))
+        state = (open_crossings, walks)
+    return states[(0, walks_needed)], result
+
+
+def pair_up(dwarf_nrs, crossings):
+    """Returns the pairs of dwarf numbers that cross together, given the dwarf numbers sorted after their crossing
+       times and the number of crossings and taken crossings for each, from optimal_crossings."""
+    pairs = []
+    open_crossings = []
+    for dwarf_nr, (crossing_count, taken) in zip(reversed(dwarf_nrs), reversed(crossings)):
+        for _ in range(taken):
+            pairs.append((dwarf_nr, open_crossings.pop()))
+        open_crossings += [dwarf_nr] * (crossing_count - taken)
+    return pairs
+
+
+def order_pairs(pairs, crossing_times):
+    """Returns a scheme where the pairs cross in an order that always leaves a dwarf at finish that has to cross
+       again, until the last pair has crossed, and where that dwarf walks back with the lantern. Every dwarf
+       crosses as many times as it is part of a pair. Raises DwarfSchemeError if no such order is found."""
+    crossings_left = {}
+    for pair in pairs:
+        for dwarf_nr in pair:
+            crossings_left[dwarf_nr] = crossings_left.get(dwarf_nr, 0) + 1
+    at_finish = set()
+    scheme = []
+    pairs = list(pairs)
+    while pairs:
+        # Walks back still owed by the dwarfs at finish. When there are none, the pair has to bring one along.
+        owed = sum(crossings_left[dwarf_nr] for dwarf_nr in at_finish)
+
+        def brings_back(pair):
+            return sum(crossings_left[dwarf_nr] >= 2 for dwarf_nr in pair)
+
+        ready = [index for index, pair in enumerate(pairs) if not at_finish.intersection(pair) and
+                 (owed or len(pairs) == 1 or brings_back(pair))]
+        if not ready:
+            raise DwarfSchemeError(len(scheme), "no pair at start can cross and leave a dwarf to walk back")
+        index = min(ready, key=lambda i: (brings_back(pairs[i]) != 1, brings_back(pairs[i]),
+                                          max(crossing_times[dwarf_nr - 1] for dwarf_nr in pairs[i])))
+        pair = pairs.pop(index)
+        for dwarf_nr in pair:
+            crossings_left[dwarf_nr] -= 1
+            at_finish.add(dwarf_nr)
+        scheme.append(sorted(pair) + ["cross"])
+        if pairs:
+            returning = [dwarf_nr for dwarf_nr in at_finish if crossings_left[dwarf_nr] > 0]
+            if not returning:
+                raise DwarfSchemeError(len(scheme), "no dwarf at finish has to cross again")
+            returning_dwarf = min(returning, key=lambda dwarf_nr: (crossing_times[dwarf_nr - 1], dwarf_nr))
+            at_finish.remove(returning_dwarf)
+            scheme.append([returning_dwarf, "go back"])
+    return scheme
+
+
+def scheme_time(scheme, crossing_times):
+    """Returns the total time of the scheme."""
+    return sum(max(crossing_times[dwarf_nr - 1] for dwarf_nr in move[:-1]) for move in scheme)
+
+
+def exact_min_crossing(crossing_times, max_crossings=MAX_CROSSINGS):
+    """Returns the shortest total time for all dwarfs to cross the bridge, two at a time, and a scheme that takes
+       that time. crossing_times[nr - 1] is the crossing time of dwarf number nr, and max_crossings is either the
+       same for all dwarfs or a list with the limit of each dwarf. Returns None and an empty scheme if the dwarfs
+       can't all get across."""
+    num_of_dwarfs = len(crossing_times)
+    if isinstance(max_crossings, int):
+        max_crossings = [max_crossings] * num_of_dwarfs
+    if num_of_dwarfs == 0:
+        return 0, []
+    if min(max_crossings) < 1:
+        return None, []
+    if num_of_dwarfs == 1:
+        return crossing_times[0], [[1, "cross"]]
+    dwarf_nrs = sorted(range(1, num_of_dwarfs + 1), key=lambda dwarf_nr: crossing_times[dwarf_nr - 1])
+    total_time, crossings = optimal_crossings([crossing_times[dwarf_nr - 1] for dwarf_nr in dwarf_nrs],
+                                              [(max_crossings[dwarf_nr - 1] - 1) // 2 for dwarf_nr in dwarf_nrs])
+    if total_time is None:
+        return None, []
+    scheme = order_pairs(pair_up(dwarf_nrs, crossings), crossing_times)
+    if scheme_time(scheme, crossing_times) != total_time:
+        raise DwarfSchemeError(len(scheme), f"the scheme doesn't take the shortest total time {total_time}")
+    return total_time, scheme
+
+
+def brute_force_min_crossing(crossing_times, max_crossings=MAX_CROSSINGS, max_together=2):
+    """Returns the shortest total time found by searching through every way the dwarfs can walk, up to max_together
+       at a time in either direction, or None if they can't all get across. max_crossings is either the same for
+       all dwarfs or a list with the limit of each dwarf. The search takes time exponential in the number of
+       dwarfs, so it is only for checking the other approaches on a handful of dwarfs."""
+    num_of_dwarfs = len(crossing_times)
+    if isinstance(max_crossings, int):
+        max_crossings = [max_crossings] * num_of_dwarfs
+    first = ((0,) * num_of_dwarfs, (0,) * num_of_dwarfs, 0)  # Sides, crossings and the side of the lantern
+    best = {first: 0}
+    queue = [(0, first)]
+    while queue:
+        total_time, state = heapq.heappop(queue)
+        sides, crossings, lantern = state
+        if total_time > best[state]:
+            continue
+        if all(sides):
+            return total_time
+        here = [d for d in range(num_of_dwarfs) if sides[d] == lantern and crossings[d] < max_crossings[d]]
+        for count in range(1, max_together + 1):
+            for group in itertools.combinations(here, count):
+                new_sides, new_crossings = list(sides), list(crossings)
+                for d in group:
+                    new_sides[d] = 1 - lantern
+                    new_crossings[d] += 1
+                new_state = (tuple(new_sides), tuple(new_crossings), 1 - lantern)
+                new_time = total_time + max(crossing_times[d] for d in group)
+                if new_time < best.get(new_state, new_time + 1):
+                    best[new_state] = new_time
+                    heapq.heappush(queue, (new_time, new_state))
+    return None
+
+
+def main():
+    """Starts the execution and presents the result when done."""
+    crossing_times = [t for t in range(1, NUMBER_OF_DWARFS + 1)]
+    total_time, scheme = exact_min_crossing(crossing_times, MAX_CROSSINGS)
+    print(f"Shortest total time for all dwarfs crossing the bridge: {total_time}")
+    print(scheme)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+import unittest
+import dwarf
+from greedy_min_dwarf import GreedySolver
+import random
+from exact_dwarf import brute_force_min_crossing, exact_min_crossing
+from verify_dwarf import verify_scheme
+
+
+class ExactMinCrossingTests(unittest.TestCase):
+
+    def test_search(self):
+        rng = random.Random(1)
+        for _ in range(60):
+            num_of_dwarfs = rng.randint(1, 5)
+            crossing_times = [rng.randint(1, 25) for _ in range(num_of_dwarfs)]
+            max_crossings = [rng.choice([1, 2, 3, 4, 5, 7]) for _ in range(num_of_dwarfs)]
+            total_time, scheme = exact_min_crossing(crossing_times, max_crossings)
+            self.assertEqual(brute_force_min_crossing(crossing_times, max_crossings), total_time)
+            if total_time is not None:
+                self.assertEqual((total_time, []), verify_scheme(scheme, num_of_dwarfs, max_crossings, 2,
+                                                                 crossing_times))
+
+    def test_same_as_greedy(self):
+        for num_of_dwarfs in range(0, 60):
+            greedy_time, _ = GreedySolver(num_of_dwarfs, 3, dwarf.START, 2).solve()
+            total_time, _ = exact_min_crossing(list(range(1, num_of_dwarfs + 1)), 3)
+            self.assertEqual(greedy_time, total_time)
+
+    def test_original_problem(self):
+        crossing_times = list(range(1, 301))
+        total_time, scheme = exact_min_crossing(crossing_times)
+        self.assertEqual(89551, total_time)
+        self.assertEqual((total_time, []), verify_scheme(scheme, 300, 3, 2, crossing_times))
+
+    def test_rosters(self):
+        rng = random.Random(2)
+        for _ in range(40):
+            num_of_dwarfs = rng.randint(2, 80)
+            crossing_times = [rng.randint(1, rng.choice([3, 100])) for _ in range(num_of_dwarfs)]
+            max_crossings = [rng.choice([3, 3, 5, 9]) for _ in range(num_of_dwarfs)]
+            total_time, scheme = exact_min_crossing(crossing_times, max_crossings)
+            self.assertEqual((total_time, []), verify_scheme(scheme, num_of_dwarfs, max_crossings, 2, crossing_times))
+
+    def test_no_scheme(self):
+        self.assertEqual((None, []), exact_min_crossing([1, 2, 3], 1))
+        self.assertEqual((None, []), exact_min_crossing([1, 2, 3, 4], [3, 1, 1, 1]))
+        self.assertEqual((0, []), exact_min_crossing([]))
+        self.assertEqual((7, [[1, "cross"]]), exact_min_crossing([7]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,185 @@
+"""
+Genetic Algorithm for the Dwarf Bridge Crossing Problem.
+
+A scheme is described by an order of the dwarfs, i.e. a permutation of the dwarf numbers. The order is turned
+into a scheme that can always be made, by letting the dwarfs at start cross the bridge in the order given, as many
+at a time as the bridge holds. The fastest dwarf at finish that can still walk back and cross again brings the
+lantern back, and waits at start. As soon as enough dwarfs are waiting to fill the bridge, or there are no more
+dwarfs left in the order, the waiting dwarfs cross before the next ones in the order. If no dwarf at finish can
+walk back when one has to, the order gives no scheme at all.
+
+A population of orders is then bred, generation after generation. The parents are picked by tournaments, the
+children get a part of the order from one parent and the rest in the order of the other parent, and now and then
+two dwarfs in a child switch places. The best orders are always kept for the next generation.
+
+The time of every order in a population is found all at once, with the orders as rows of NumPy arrays, instead
+of moving Dwarf objects around. Only the best order is turned into a scheme with Dwarf objects in the end.
+"""
+from dwarf import Lantern
+from dwarf_errors import DwarfStartingPositionError
+import dwarf
+import greedy_min_dwarf
+from collections import deque
+
+
+NUMBER_OF_DWARFS = 300
+MAX_CROSSINGS = 3
+MAX_TOGETHER = 3
+POPULATION_SIZE = 100
+GENERATIONS = 200
+ELITE = 2  # Number of the best orders kept as they are for the next generation
+TOURNAMENT = 3  # Number of orders competing to become a parent
+MUTATION_RATE = 0.3  # Probability that two dwarfs switch places in a child
+
+
+def decode(order, dwarfs, max_together, scheme=None):
+    """Lets the dwarfs, all at start, cross the bridge in the order given by the list of dwarf numbers, and returns
+       the total time. The moves are added to scheme, if a scheme is given. Returns None if no dwarf at finish
+       can walk back with the lantern when one has to."""
+    by_number = {d.dwarf_nr: d for d in dwarfs}
+    fresh = deque(by_number[dwarf_nr] for dwarf_nr in order)
+    waiting = deque()
+    lantern = Lantern(dwarf.START)
+    at_finish = []  # Dwarfs at finish that can still walk back and cross again
+    total_time = 0
+    while fresh or waiting:
+        first, second = (waiting, fresh) if len(waiting) >= max_together or not fresh else (fresh, waiting)
+        crossing_dwarfs = [first.popleft() for _ in range(min(max_together, len(first)))]
+        crossing_dwarfs += [second.popleft() for _ in range(min(max_together - len(crossing_dwarfs), len(second)))]
+        for crossing_dwarf in crossing_dwarfs:
+            crossing_dwarf.cross(lantern)
+            if crossing_dwarf.max_crossings - crossing_dwarf.crossings >= 2:
+                at_finish.append(crossing_dwarf)
+        total_time += max(d.crossing_time for d in crossing_dwarfs)
+        if scheme is not None:
+            scheme.append([d.dwarf_nr for d in crossing_dwarfs] + ["cross"])
+        if not fresh and not waiting:
+            break
+        if not at_finish:
+            return None
+        # Dwarfs are equal when their crossing times are, so the returning dwarf is taken out by its place
+        index = min(range(len(at_finish)), key=lambda i: (at_finish[i].crossing_time, at_finish[i].dwarf_nr))
+        returning_dwarf = at_finish.pop(index)
+        returning_dwarf.go_back(lantern)
+        waiting.append(returning_dwarf)
+        total_time += returning_dwarf.crossing_time
+        if scheme is not None:
+            scheme.append([returning_dwarf.dwarf_nr, "go back"])
+    return total_time
+
+
+def evaluate_population(population, crossing_times, max_crossings, max_together):
+    """Returns the total time of the scheme each row of dwarf numbers in population gives, the same as decode
+       would, but for all rows at once. crossing_times[nr] is the crossing time of dwarf number nr, and index 0
+       is the crossing time of an empty seat. Rows that give no scheme get an infinite time."""
+    import numpy as np
+    size, num_of_dwarfs = population.shape
+    rows = np.arange(size)
+    times = crossing_times.astype(float)
+    fresh = np.concatenate([population, np.zeros((size, max_together), dtype=population.dtype)], axis=1)
+    next_fresh = np.zeros(size, dtype=np.int64)
+    waiting = np.zeros((size, num_of_dwarfs * max_crossings + max_together), dtype=np.int64)  # One queue per row
+    head = np.zeros(size, dtype=np.int64)
+    tail = np.zeros(size, dtype=np.int64)
+    crossings = np.zeros((size, num_of_dwarfs + 1), dtype=np.int64)
+    at_finish = np.zeros((size, num_of_dwarfs + 1), dtype=bool)
+    totals = np.zeros(size)
+    active = rows
+    while len(active):
+        queued = tail[active] - head[active]
+        fresh_left = num_of_dwarfs - next_fresh[active]
+        waiting_first = (queued >= max_together) | (fresh_left == 0)
+        from_fresh = np.where(waiting_first, 0, np.minimum(fresh_left, max_together))
+        from_waiting = np.minimum(queued, max_together - from_fresh)
+        from_fresh = np.minimum(fresh_left, max_together - from_waiting)
+        trip = np.zeros(len(active))
+        for seat in range(max_together):
+            waiting_dwarf = waiting[active, head[active] + seat]
+            fresh_dwarf = fresh[active, next_fresh[active] + np.maximum(seat - from_waiting, 0)]
+            seated = np.where(seat < from_waiting, waiting_dwarf,
+                              np.where(seat < from_waiting + from_fresh, fresh_dwarf, 0))
+            trip = np.maximum(trip, times[seated])
+            crossings[active, seated] += 1
+            at_finish[active, seated] = True
+        totals[active] += trip
+        head[active] += from_waiting
+        next_fresh[active] += from_fresh
+        active = active[(next_fresh[active] < num_of_dwarfs) | (head[active] < tail[active])]
+        can_return = at_finish[active] & (crossings[active] <= max_crossings - 2)
+        can_return[:, 0] = False
+        stuck = ~can_return.any(axis=1)
+        totals[active[stuck]] = np.inf
+        active = active[~stuck]
+        returning = np.where(can_return[~stuck], times, np.inf).argmin(axis=1)
+        totals[active] += times[returning]
+        crossings[active, returning] += 1
+        at_finish[active, returning] = False
+        waiting[active, tail[active]] = returning
+        tail[active] += 1
+    return totals
+
+
+def order_crossover(mother, father, rng):
+    """Returns a child with a random part of the mother's order, and the rest of the dwarfs in the father's order."""
+    import numpy as np
+    start, end = sorted(rng.choice(len(mother) + 1, size=2, replace=False))
+    part = mother[start:end]
+    rest = father[~np.isin(father, part)]
+    return np.concatenate([rest[:start], part, rest[start:]])
+
+
+def genetic_crossing(num_of_dwarfs, max_crossings, start_pos, max_together, crossing_times=None,
+                     population_size=POPULATION_SIZE, generations=GENERATIONS, seed=None):
+    """Returns the improvements of the best time, as [generation, total_time], and the best scheme found by the
+       genetic algorithm. The crossing time of dwarf number nr is crossing_times[nr - 1], and 1, 2, 3, ... when
+       no crossing times are given, the same as for generate_dwarfs. The first population holds the dwarfs in
+       the order of their crossing times, next to random orders. The same seed gives the same result."""
+    import numpy as np
+    if start_pos != dwarf.START:
+        reason = f"the genetic algorithm only moves dwarfs that start at {dwarf.START}"
+        raise DwarfStartingPositionError(1, start_pos, reason)
+    rng = np.random.default_rng(seed)
+    dwarfs = greedy_min_dwarf.generate_dwarfs(num_of_dwarfs, max_crossings, start_pos, crossing_times)
+    times = np.array([0] + [d.crossing_time for d in dwarfs])
+    population = np.argsort(rng.random((population_size, num_of_dwarfs)), axis=1) + 1
+    population[0] = np.argsort(times[1:], kind="stable") + 1
+    fitness = evaluate_population(population, times, max_crossings, max_together)
+    best_times = []
+    best_order = None
+    for generation in range(generations + 1):
+        if generation:
+            ranked = np.argsort(fitness, kind="stable")
+            contestants = rng.integers(population_size, size=(population_size - ELITE, 2, TOURNAMENT))
+            parents = np.take_along_axis(contestants, fitness[contestants].argmin(axis=2)[..., None], axis=2)[..., 0]
+            children = np.array([order_crossover(population[mother], population[father], rng)
+                                 for mother, father in parents]).reshape(-1, num_of_dwarfs)
+            mutated = np.flatnonzero(rng.random(len(children)) < MUTATION_RATE)
+            first, second = rng.integers(num_of_dwarfs, size=(2, len(mutated)))
+            children[mutated, first], children[mutated, second] = children[mutated, second], children[mutated, first]
+            population = np.concatenate([population[ranked[:ELITE]], children])
+            fitness = np.concatenate([fitness[ranked[:ELITE]],
+                                      evaluate_population(children, times, max_crossings, max_together)])
+        best = int(fitness.argmin())
+        if np.isfinite(fitness[best]) and (not best_times or fitness[best] < best_times[-1][1]):
+            best_times.append([generation, fitness[best].astype(times.dtype).item()])
+            best_order = population[best].tolist()
+    best_scheme = []
+    if best_order is not None:
+        dwarfs = greedy_min_dwarf.generate_dwarfs(num_of_dwarfs, max_crossings, start_pos, crossing_times)
+        decode(best_order, dwarfs, max_together, best_scheme)
+    return best_times, best_scheme
+
+
+def main():
+    """Starts the execution and presents the result when done. The generalized instance has random crossing
+       times between 1 and 300 minutes, and three dwarfs on the bridge at a time."""
+    import numpy as np
+    crossing_times = np.random.default_rng(0).integers(1, NUMBER_OF_DWARFS + 1, NUMBER_OF_DWARFS).tolist()
+    best_times, scheme = genetic_crossing(NUMBER_OF_DWARFS, MAX_CROSSINGS, dwarf.START, MAX_TOGETHER, crossing_times)
+    print(f"Improvements of the best time: {best_times}")
+    print(f"Total time for all dwarfs crossing the bridge: {best_times[-1][1]}")
+    print(scheme)
+
+
+if __name__ == '__main__':
+    main()
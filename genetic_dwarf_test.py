@@ -0,0 +1,73 @@
+import unittest
+import dwarf
+from dwarf_errors import DwarfStartingPositionError
+import greedy_min_dwarf
+import numpy as np
+from genetic_dwarf import decode, evaluate_population, genetic_crossing, order_crossover
+from verify_dwarf import verify_scheme
+
+
+NUMBER_OF_DWARFS = 30
+MAX_CROSSINGS = 3
+GENERATIONS = 30
+
+
+class EvaluatePopulationTests(unittest.TestCase):
+
+    def test_same_as_decode(self):
+        for max_together, max_crossings in [(2, 3), (3, 3), (2, 5), (4, 3), (2, 1)]:
+            rng = np.random.default_rng(max_together * 10 + max_crossings)
+            crossing_times = rng.integers(1, 20, NUMBER_OF_DWARFS).tolist()
+            population = np.argsort(rng.random((40, NUMBER_OF_DWARFS)), axis=1) + 1
+            totals = evaluate_population(population, np.array([0] + crossing_times), max_crossings, max_together)
+            for order, total_time in zip(population, totals):
+                dwarfs = greedy_min_dwarf.generate_dwarfs(NUMBER_OF_DWARFS, max_crossings, dwarf.START,
+                                                          crossing_times)
+                expected = decode(order.tolist(), dwarfs, max_together)
+                self.assertEqual(np.inf if expected is None else expected, total_time)
+
+    def test_no_scheme(self):
+        population = np.array([list(range(1, NUMBER_OF_DWARFS + 1))])
+        totals = evaluate_population(population, np.arange(NUMBER_OF_DWARFS + 1), 1, 2)
+        self.assertEqual(np.inf, totals[0])
+
+    def test_order_crossover(self):
+        rng = np.random.default_rng(1)
+        for _ in range(100):
+            mother, father = np.argsort(rng.random((2, NUMBER_OF_DWARFS)), axis=1) + 1
+            child = order_crossover(mother, father, rng)
+            self.assertEqual(list(range(1, NUMBER_OF_DWARFS + 1)), sorted(child.tolist()))
+
+
+class GeneticCrossingTests(unittest.TestCase):
+
+    def test_scheme(self):
+        crossing_times = np.random.default_rng(2).integers(1, 100, NUMBER_OF_DWARFS).tolist()
+        best_times, scheme = genetic_crossing(NUMBER_OF_DWARFS, MAX_CROSSINGS, dwarf.START, 3, crossing_times,
+                                              generations=GENERATIONS, seed=1)
+        self.assertEqual((best_times[-1][1], []), verify_scheme(scheme, NUMBER_OF_DWARFS, MAX_CROSSINGS, 3,
+                                                                crossing_times))
+        self.assertEqual(sorted(best_times, key=lambda improvement: -improvement[1]), best_times)
+
+    def test_float_times(self):
+        crossing_times = [1.5, 2.25, 3.0, 7.75, 8.5, 2.5]
+        best_times, scheme = genetic_crossing(6, MAX_CROSSINGS, dwarf.START, 2, crossing_times, generations=5, seed=1)
+        self.assertEqual((best_times[-1][1], []), verify_scheme(scheme, 6, MAX_CROSSINGS, 2, crossing_times))
+        self.assertEqual(28.25, best_times[-1][1])
+
+    def test_ordered_by_crossing_time(self):
+        greedy_time, _ = greedy_min_dwarf.greedy_min_crossing(NUMBER_OF_DWARFS, MAX_CROSSINGS, dwarf.START, 2)
+        best_times, _ = genetic_crossing(NUMBER_OF_DWARFS, MAX_CROSSINGS, dwarf.START, 2, generations=0)
+        self.assertEqual(greedy_time, best_times[-1][1])
+
+    def test_same_seed(self):
+        self.assertEqual(genetic_crossing(NUMBER_OF_DWARFS, MAX_CROSSINGS, dwarf.START, 3, generations=5, seed=3),
+                         genetic_crossing(NUMBER_OF_DWARFS, MAX_CROSSINGS, dwarf.START, 3, generations=5, seed=3))
+
+    def test_start_pos(self):
+        with self.assertRaises(DwarfStartingPositionError):
+            genetic_crossing(NUMBER_OF_DWARFS, MAX_CROSSINGS, dwarf.FINISH, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
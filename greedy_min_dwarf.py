@@ -80,15 +80,24 @@ Note: Even though this problem is well structured and clearly defined I will cre
 """
 
 from dwarf import Dwarf, Lantern
+from dwarf_errors import DwarfStartingPositionError
+from dwarf_scheme import CompactScheme, scheme_writer, time_typecode
 import dwarf
+from array import array
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import heapq
+import os
+import sys
 import time
 
 NUMBER_OF_DWARFS = 300
 MAX_CROSSINGS = 3
 MAX_TOGETHER = 2
-
-cross_losses = []
-return_times = []
+CHUNK_DWARFS = 100000  # Number of dwarfs in the instances sent to a worker at a time in a batch
+CHUNKS_PER_WORKER = 2  # Number of chunks waiting for each worker in a batch
+MAX_LEFT = 127  # Crossings left kept for a dwarf in the array greedy, enough to tell if it can walk back
+NO_GROUP = 2 ** 63 - 1  # Time lost by a group of dwarfs in the array greedy that is not there
+RADIX_BITS = 16  # Bits of the integer crossing times ordered in each pass of the radix sort
 
 
 def generate_dwarfs(num_of_dwarfs, max_crossings, start_pos, crossing_times=None):
@@ -98,69 +107,30 @@ def generate_dwarfs(num_of_dwarfs, max_crossings, start_pos, crossing_times=None
     return [Dwarf(num + 1, crossing_times[num], 0, max_crossings, start_pos) for num in range(num_of_dwarfs)]
 
 
-def min_time(dwarfs, crossings_required):
-    """Returns the crossing time for the dwarf in the provided list that has the lowest crossing time,
-       among the dwarfs in the list that have at least the required crossings left."""
-    result = None
-    for d in dwarfs:
-        if d.max_crossings - d.times_crossed() >= crossings_required:
-            if result is None:
-                result = d.time_needed_for_crossing()
-            else:
-                result = min(result, d.time_needed_for_crossing())
-    return result
-
-
-def find_fastest_similar_dwarfs(dwarfs, max_together):
-    """Returns a list of the dwarfs that have the most similar crossing times from the provided list of dwarfs.
-       If there are more than one group of dwarfs that have the same similar times, then the fastest group is returned.
-       The length of the returned list is provided by max_together. However not longer than the provided list.
-       Note that the provided list of dwarfs needs to be sorted."""
-    if len(dwarfs) <= max_together:
-        return dwarfs
-    else:
-        min_index = 0
-        min_time_lost = time_lost(dwarfs[0:max_together])
-        for index in range(1, len(dwarfs) - max_together + 1):
-            if (lt := time_lost(dwarfs[index:index + max_together])) < min_time_lost:
-                min_time_lost = lt
-                min_index = index
-        return dwarfs[min_index:min_index + max_together]
-
-
-def min_waste(at_start, at_finish, max_together):
-    """Returns True if the fastest och the fastest similar dwarfs is faster than the fastest dwarf at finish.
-       Otherwise False is returned. This can be used for reducing the time wasted when a fast dwarf are walking
-       with a slow, if there may be a faster dwarf returning later with the lantern."""
-    return at_finish[0] > find_fastest_similar_dwarfs(at_start, max_together)[0]
-
-
-def faster_dwarf_at_start(at_start, at_finish, max_together):
-    """Returns True is there is a faster dwarf at start that should cross the bridge in order to carry the
-       lantern back."""
-    if min_time(at_start, 3) is None:
-        return False
-    elif not at_finish or min_time(at_finish, 2) is None:
-        return True
-    else:
-        return min_time(at_start, 3) < min_time(at_finish, 2) and min_waste(at_start, at_finish, max_together)
-
-
-def setup(num_of_dwarfs, max_crossings, start_pos):
+def time_order(crossing_times):
+    """Returns the places of the crossing times in the order of the times, with equal times in the order given.
+       Integer times are ordered with a radix sort, RADIX_BITS bits at a time from the lowest, where each pass is
+       a counting sort in NumPy, so a long list of times in a small range takes a single pass in linear time.
+       Times that are not integers are ordered with an ordinary sort."""
+    import numpy as np
+    times = np.asarray(memoryview(crossing_times) if isinstance(crossing_times, array) else crossing_times)
+    if times.dtype.kind not in "iu" or len(times) == 0:
+        return array("i", sorted(range(len(crossing_times)), key=crossing_times.__getitem__))
+    keys = times.astype(np.int64) - times.min()
+    span = int(keys.max())
+    digit = (1 << RADIX_BITS) - 1
+    order = np.argsort((keys & digit).astype(np.uint16), kind="stable")
+    shift = RADIX_BITS
+    while span >> shift:
+        order = order[np.argsort(((keys[order] >> shift) & digit).astype(np.uint16), kind="stable")]
+        shift += RADIX_BITS
+    return array("i", order.astype(np.int32).tobytes())
+
+
+def setup(num_of_dwarfs, max_crossings, start_pos, crossing_times=None):
     """Returns the setup of the problem with all dwarfs at the start and no one at finish or being done, and
        with a blank scheme."""
-    return generate_dwarfs(num_of_dwarfs, max_crossings, start_pos), [], [], []
-
-
-def get_fast_dwarf_to_finish(at_start, at_finish, done, lantern, max_together, scheme):
-    """Moves the fastest dwarfs across the bridge and returns the time that this takes."""
-    global cross_losses
-    slowest_index = min(max_together, len(at_start)) - 1
-    crossing_time = at_start[slowest_index].crossing_time
-    cross_losses.append(time_lost(at_start[0:slowest_index + 1]))
-    crossing_dwarfs = cross(at_start, at_finish, done, 0, min(max_together, len(at_start)), lantern)
-    scheme.append(crossing_dwarfs)
-    return crossing_time
+    return generate_dwarfs(num_of_dwarfs, max_crossings, start_pos, crossing_times), [], [], []
 
 
 def time_lost(dwarfs):
@@ -187,64 +157,6 @@ def cross(at_start, at_finish, done, index, count, lantern):
     return dwarfs_crossed
 
 
-def get_similar_dwarfs_to_finish(at_start, at_finish, done, lantern, max_together, scheme):
-    """Takes the fastest group of the most similar dwarfs across the bridge, and returns the time this takes."""
-    global cross_losses
-    if len(at_start) <= max_together:
-        crossing_time = at_start[-1].crossing_time
-        lost_time = time_lost(at_start)
-        crossing_dwarfs = cross(at_start, at_finish, done, 0, min(max_together, len(at_start)), lantern)
-    else:
-        min_index = 0
-        min_time_lost = time_lost(at_start[0:max_together])
-        for index in range(1, len(at_start) - max_together + 1):
-            if (lt := time_lost(at_start[index:index + max_together])) < min_time_lost:
-                min_time_lost = lt
-                min_index = index
-        crossing_time = at_start[min_index + max_together - 1].crossing_time
-        crossing_dwarfs = cross(at_start, at_finish, done, min_index, max_together, lantern)
-        lost_time = min_time_lost
-    scheme.append(crossing_dwarfs)
-    cross_losses.append(lost_time)
-    return crossing_time
-
-
-def cross_the_bridge(at_start, at_finish, done, lantern, max_together, scheme):
-    """Selects the most suitable group of dwarfs to cross the bridge, and return the time the crossing takes."""
-    at_start.sort()
-    at_finish.sort()
-    if faster_dwarf_at_start(at_start, at_finish, max_together):
-        return get_fast_dwarf_to_finish(at_start, at_finish, done, lantern, max_together, scheme)
-    else:
-        return get_similar_dwarfs_to_finish(at_start, at_finish, done, lantern, max_together, scheme)
-
-
-def fastest_available_to_return(at_finish):
-    """Returns the fastest dwarf at finish who has enough crossings left to go back with the lantern and then
-       be able to return across the bridge again to finish."""
-    for d in at_finish:
-        if d.max_crossings - d.times_crossed() >= 2:
-            return d
-    return False
-
-
-def return_with_lantern(at_start, at_finish, lantern, scheme):
-    """Facilitates the dwarf walking back over the bridge to return the lantern for others to cross the bridge.
-       Returns the time it takes for the dwarf to walk back with the lantern."""
-    at_finish.sort()
-    if at_finish and at_start and lantern.at_pos(dwarf.FINISH) and \
-            (returning_dwarf := fastest_available_to_return(at_finish)):
-        global return_times
-        at_finish.remove(returning_dwarf)
-        returning_dwarf.go_back(lantern)
-        at_start.append(returning_dwarf)
-        scheme.append([returning_dwarf.number(), "go back"])
-        return_times.append(returning_dwarf.time_needed_for_crossing())
-        return returning_dwarf.time_needed_for_crossing()
-    else:
-        return 0
-
-
 def print_dwarf_positions(dwarfs_at_start, dwarfs_at_finish, dwarfs_done):
     """Prints the number of dwarfs that are at different locations."""
     print(f"\nDwarf Positions:")
@@ -253,27 +165,672 @@ def print_dwarf_positions(dwarfs_at_start, dwarfs_at_finish, dwarfs_done):
     print(f"Dwarfs Done: {len(dwarfs_done)}\n")
 
 
-def greedy_min_crossing(num_of_dwarfs, max_crossings, start_pos, max_together):
-    """Sets up the problem and executes the algorithm to solve the problem."""
-    t_start = time.time()
-    dwarfs_at_start, dwarfs_at_finish, dwarfs_done, scheme = setup(num_of_dwarfs, max_crossings, start_pos)
-    lantern = Lantern(dwarf.START)
-    total_time = 0
-    while dwarfs_at_start:  # Keep going until there are no more dwarfs at start to cross the bridge
-        total_time += cross_the_bridge(dwarfs_at_start, dwarfs_at_finish, dwarfs_done, lantern, max_together, scheme)
-        total_time += return_with_lantern(dwarfs_at_start, dwarfs_at_finish, lantern, scheme)
-    execution_time = time.time() - t_start
-    print(f"\nExecution Time: {execution_time * 1000} ms")
-    print_dwarf_positions(dwarfs_at_start, dwarfs_at_finish, dwarfs_done)
+class SortedDwarfs:
+    """Keeps dwarfs ordered after their crossing time, and dwarfs with the same crossing time in the order they were
+       added, which is the order a list of dwarfs gets when dwarfs are appended to it and it is sorted again.
+       Every dwarf that can be added has its own slots set aside, among the slots of the dwarfs with the same
+       crossing time, and a dwarf that is added takes the next free slot for its crossing time. The slots are
+       ordered the same way as the dwarfs, so nothing ever has to be sorted, and a tree of the number of dwarfs
+       in the slots finds the dwarf at any place in the order, and the place of any dwarf, in O(log n)."""
+
+    def __init__(self, dwarfs):
+        """Sets up an empty container for the dwarfs provided. A dwarf can be added once for each time it can
+           cross the bridge towards the finish."""
+        capacity = {}
+        for d in dwarfs:
+            capacity[d.crossing_time] = capacity.get(d.crossing_time, 0) + (d.max_crossings + 1) // 2
+        self.next_slot = {}
+        self.end_slot = {}
+        size = 0
+        crossing_times = list(capacity)
+        for place in time_order(crossing_times):
+            crossing_time = crossing_times[place]
+            self.next_slot[crossing_time] = size
+            size += capacity[crossing_time]
+            self.end_slot[crossing_time] = size
+        self.slot_dwarfs = [None] * size
+        self.slot_of = {}  # Slot of each dwarf in the container, by dwarf number
+        self.tree = [0] * (size + 1)  # Fenwick tree of the number of dwarfs in the slots
+        self.count = 0
+        self.crossings_left = {}  # Heap of the slots of the dwarfs, by the number of crossings they have left
+
+    def __len__(self):
+        """Returns the number of dwarfs in the container."""
+        return self.count
+
+    def __iter__(self):
+        """Iterates over the dwarfs in order."""
+        return (d for d in self.slot_dwarfs if d is not None)
+
+    def __getitem__(self, index):
+        """Returns the dwarf at the place provided in the order, or a list of the dwarfs for a slice."""
+        if isinstance(index, slice):
+            return [self.slot_dwarfs[self.find_slot(i)] for i in range(*index.indices(self.count))]
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("dwarf index out of range")
+        return self.slot_dwarfs[self.find_slot(index)]
+
+    def append(self, d):
+        """Adds the dwarf, after the dwarfs with the same crossing time that are already in the container."""
+        slot = self.next_slot[d.crossing_time]
+        if slot == self.end_slot[d.crossing_time]:
+            raise IndexError(f"dwarf number {d.dwarf_nr} has been added more times than it can cross the bridge")
+        self.next_slot[d.crossing_time] += 1
+        self.slot_dwarfs[slot] = d
+        self.slot_of[d.dwarf_nr] = slot
+        self.update(slot, 1)
+        heapq.heappush(self.crossings_left.setdefault(d.max_crossings - d.crossings, []), slot)
+
+    def pop(self, index=-1):
+        """Removes and returns the dwarf at the place provided in the order."""
+        d = self[index]
+        self.remove(d)
+        return d
+
+    def remove(self, d):
+        """Removes the dwarf, which needs to be in the container."""
+        slot = self.slot_of.pop(d.dwarf_nr)
+        self.slot_dwarfs[slot] = None
+        self.update(slot, -1)
+
+    def fastest(self, crossings_required):
+        """Returns the first dwarf in the order that has at least the required crossings left, or None if there
+           is no such dwarf. A dwarf doesn't cross the bridge while it is in the container, so the slots of removed
+           dwarfs are simply left in the heaps until they come up first."""
+        result = None
+        for crossings_left, slots in self.crossings_left.items():
+            if crossings_left >= crossings_required:
+                while slots and self.slot_dwarfs[slots[0]] is None:
+                    heapq.heappop(slots)
+                if slots and (result is None or slots[0] < result):
+                    result = slots[0]
+        return None if result is None else self.slot_dwarfs[result]
+
+    def index(self, d):
+        """Returns the place of the dwarf in the order."""
+        return self.rank(self.slot_of[d.dwarf_nr])
+
+    def rank(self, slot):
+        """Returns the number of dwarfs in the slots before the slot provided."""
+        result = 0
+        while slot > 0:
+            result += self.tree[slot]
+            slot -= slot & -slot
+        return result
+
+    def update(self, slot, change):
+        """Changes the number of dwarfs in the slot."""
+        self.count += change
+        tree = self.tree
+        size = len(tree)
+        slot += 1
+        while slot < size:
+            tree[slot] += change
+            slot += slot & -slot
+
+    def find_slot(self, index):
+        """Returns the slot of the dwarf at the place provided in the order."""
+        tree = self.tree
+        size = len(tree)
+        slot = 0
+        step = 1 << (size - 1).bit_length()
+        while step:
+            if slot + step < size and tree[slot + step] <= index:
+                slot += step
+                index -= tree[slot]
+            step >>= 1
+        return slot
+
+
+class SimilarDwarfs(SortedDwarfs):
+    """Sorted dwarfs that also keep track of which max_together dwarfs next to each other in the order lose the
+       least time walking together. Every group is kept in a heap, with the time it loses, under the slot of its
+       first dwarf. When a dwarf is added or removed, only the groups that dwarf is part of change, and those
+       are put in the heap again with a new stamp, so the groups left behind in the heap are known to be old."""
+
+    def __init__(self, dwarfs, max_together):
+        """Sets up an empty container for the dwarfs provided, with groups of max_together dwarfs."""
+        super().__init__(dwarfs)
+        self.max_together = max_together
+        self.groups = []  # Heap of (time lost, slot of the first dwarf, stamp)
+        self.stamps = [0] * len(self.slot_dwarfs)
+
+    def append(self, d):
+        """Adds the dwarf, and updates the groups it is part of."""
+        super().append(d)
+        index = self.index(d)
+        self.refresh(index - self.max_together + 1, index + 1)
+
+    def remove(self, d):
+        """Removes the dwarf, and updates the groups it was part of."""
+        index = self.index(d)
+        super().remove(d)
+        self.refresh(index - self.max_together + 1, index)
+
+    def refresh(self, first, last):
+        """Puts the groups starting at the places from first up to last in the heap again. A group that no longer
+           has max_together dwarfs is left out, and its old entries are stamped as old."""
+        first = max(first, 0)
+        last = min(last, self.count)
+        slots = [self.find_slot(index) for index in range(first, min(last + self.max_together - 1, self.count))]
+        for offset in range(last - first):
+            slot = slots[offset]
+            self.stamps[slot] += 1
+            group = slots[offset:offset + self.max_together]
+            if len(group) == self.max_together:
+                lost = time_lost([self.slot_dwarfs[s] for s in group])
+                heapq.heappush(self.groups, (lost, slot, self.stamps[slot]))
+
+    def most_similar(self):
+        """Returns the place of the fastest group of the most similar dwarfs, and the time lost when they walk
+           together. Of groups that lose the same time, the fastest is taken. There have to be more dwarfs than
+           max_together."""
+        while True:
+            lost, slot, stamp = self.groups[0]
+            if self.slot_dwarfs[slot] is not None and self.stamps[slot] == stamp:
+                return self.rank(slot), lost
+            heapq.heappop(self.groups)
+
+
+class GreedySolver:
+    """Solves one instance of the problem with the greedy algorithm. A solver owns its dwarfs, its scheme and its
+       statistics, so any number of solvers can be used in the same program, also at the same time from several
+       threads, as long as each solver is only used by one thread."""
+
+    def __init__(self, num_of_dwarfs, max_crossings, start_pos, max_together, crossing_times=None, scheme=None):
+        """Sets up the problem with all dwarfs at the start and nothing solved yet. The crossing time of dwarf
+           number nr is crossing_times[nr - 1], and 1, 2, 3, ... when no crossing times are given. The moves are
+           added to scheme, if a scheme is given, e.g. a CompactScheme, and otherwise to a list."""
+        self.max_together = max_together
+        dwarfs, _, self.done, self.scheme = setup(num_of_dwarfs, max_crossings, start_pos, crossing_times)
+        if scheme is not None:
+            self.scheme = scheme
+        self.at_start = SimilarDwarfs(dwarfs, max_together)
+        self.at_finish = SortedDwarfs(dwarfs)
+        for d in dwarfs:
+            self.at_start.append(d)
+        self.lantern = Lantern(dwarf.START)
+        self.total_time = 0
+        self.cross_losses = []  # Time lost by the faster dwarfs in each crossing
+        self.return_times = []  # Time for each walk back with the lantern
+        self.execution_time = None
+
+    def solve(self):
+        """Executes the algorithm to solve the problem, and returns the total time and the scheme."""
+        t_start = time.time()
+        while self.at_start:  # Keep going until there are no more dwarfs at start to cross the bridge
+            self.total_time += self.cross_the_bridge()
+            self.total_time += self.return_with_lantern()
+        self.execution_time = time.time() - t_start
+        return self.total_time, self.scheme
+
+    def cross_the_bridge(self):
+        """Selects the most suitable group of dwarfs to cross the bridge, and return the time the crossing takes."""
+        if self.faster_dwarf_at_start():
+            return self.get_fast_dwarf_to_finish()
+        else:
+            return self.get_similar_dwarfs_to_finish()
+
+    def faster_dwarf_at_start(self):
+        """Returns True is there is a faster dwarf at start that should cross the bridge in order to carry the
+           lantern back. That is when the fastest dwarf at start that can cross three more times is faster than
+           the fastest dwarf at finish that can go back and cross again, and the fastest of the most similar dwarfs
+           at start is faster than every dwarf at finish."""
+        fastest_at_start = self.at_start.fastest(3)
+        if fastest_at_start is None:
+            return False
+        fastest_at_finish = self.at_finish.fastest(2)
+        if not self.at_finish or fastest_at_finish is None:
+            return True
+        else:
+            return fastest_at_start.crossing_time < fastest_at_finish.crossing_time and \
+                self.at_finish[0] > self.at_start[self.most_similar_dwarfs()[0]]
+
+    def most_similar_dwarfs(self):
+        """Returns the place of the fastest group of the most similar dwarfs at start, and the time lost when
+           they cross together. Of groups that lose the same time, the fastest is taken."""
+        if len(self.at_start) <= self.max_together:
+            return 0, time_lost(self.at_start[:])
+        return self.at_start.most_similar()
+
+    def get_fast_dwarf_to_finish(self):
+        """Moves the fastest dwarfs across the bridge and returns the time that this takes."""
+        at_start = self.at_start
+        count = min(self.max_together, len(at_start))
+        crossing_time = at_start[count - 1].crossing_time
+        self.cross_losses.append(time_lost(at_start[0:count]))
+        self.scheme.append(cross(at_start, self.at_finish, self.done, 0, count, self.lantern))
+        return crossing_time
+
+    def get_similar_dwarfs_to_finish(self):
+        """Takes the fastest group of the most similar dwarfs across the bridge, and returns the time this takes."""
+        count = min(self.max_together, len(self.at_start))
+        min_index, lost_time = self.most_similar_dwarfs()
+        crossing_time = self.at_start[min_index + count - 1].crossing_time
+        crossing_dwarfs = cross(self.at_start, self.at_finish, self.done, min_index, count, self.lantern)
+        self.scheme.append(crossing_dwarfs)
+        self.cross_losses.append(lost_time)
+        return crossing_time
+
+    def return_with_lantern(self):
+        """Facilitates the dwarf walking back over the bridge to return the lantern for others to cross the bridge.
+           Returns the time it takes for the dwarf to walk back with the lantern."""
+        if self.at_finish and self.at_start and self.lantern.at_pos(dwarf.FINISH) and \
+                (returning_dwarf := self.at_finish.fastest(2)):
+            self.at_finish.remove(returning_dwarf)
+            returning_dwarf.go_back(self.lantern)
+            self.at_start.append(returning_dwarf)
+            self.scheme.append([returning_dwarf.number(), "go back"])
+            self.return_times.append(returning_dwarf.time_needed_for_crossing())
+            return returning_dwarf.time_needed_for_crossing()
+        else:
+            return 0
+
+
+class ArrayDwarfs:
+    """Keeps dwarfs in the same order as SortedDwarfs and SimilarDwarfs, but as numbers into typed arrays instead
+       of Dwarf objects. The dwarfs with the same crossing time share their slots in the same way. A tree of the
+       crossings the dwarfs in the slots have left finds the fastest dwarf with enough crossings left, and the
+       dwarf before or after any slot, and with max_together given a tree of the time lost by the group starting
+       at each slot finds the fastest of the most similar groups. Both trees are kept in arrays, with the root at
+       place 1 and the slots as leaves, and take a few bytes for each slot."""
+
+    def __init__(self, times, groups, capacity, max_together=None):
+        """Sets up an empty container for dwarfs with the crossing times provided. groups holds the place in the
+           order of the crossing times of the first dwarf with the same crossing time as each dwarf, and capacity
+           is the number of times each dwarf can be added."""
+        self.times = times
+        self.groups = groups
+        size = capacity * len(times)
+        self.next_slot = array("i", range(0, size, capacity)) if capacity else array("i")  # By the first place
+        self.leaves = 1 << max(size - 1, 1).bit_length()
+        self.slot_dwarfs = array("i", [-1]) * size
+        self.left = array("b", bytes(2 * self.leaves))  # Tree of the most crossings left, 0 for empty slots
+        self.count = 0
+        self.max_together = max_together
+        if max_together is not None:
+            self.lost = array(times.typecode, [NO_GROUP]) * self.leaves  # Time lost by the group at each slot
+            self.best = array("i", [0]) * self.leaves  # Slot of the first group losing the least time, in the tree
+            level = 1
+            while level < self.leaves:
+                self.best[level:2 * level] = array("i", range(0, self.leaves, self.leaves // level))
+                level *= 2
+
+    def __len__(self):
+        """Returns the number of dwarfs in the container."""
+        return self.count
+
+    def fill(self, order, crossings_left):
+        """Adds all the dwarfs in the order of their crossing times, with the same number of crossings left, in
+           one go. The container needs to be empty."""
+        left, leaves, times, max_together = self.left, self.leaves, self.times, self.max_together
+        crossings_left = min(crossings_left, MAX_LEFT)
+        slots = array("i", [0]) * len(order)
+        for place, d in enumerate(order):
+            slot = self.next_slot[self.groups[d]]
+            self.next_slot[self.groups[d]] = slot + 1
+            self.slot_dwarfs[slot] = d
+            left[leaves + slot] = crossings_left
+            slots[place] = slot
+        for node in range(leaves - 1, 0, -1):
+            left[node] = max(left[2 * node], left[2 * node + 1])
+        self.count = len(order)
+        if max_together is not None and len(order) >= max_together:
+            lost = self.lost
+            window = sum(times[d] for d in order[:max_together - 1])
+            for place in range(len(order) - max_together + 1):
+                slowest = times[order[place + max_together - 1]]
+                window += slowest
+                lost[slots[place]] = max_together * slowest - window
+                window -= times[order[place]]
+            best = self.best
+            for node in range(leaves - 1, 0, -1):
+                first = best[2 * node] if 2 * node < leaves else 2 * node - leaves
+                second = best[2 * node + 1] if 2 * node + 1 < leaves else 2 * node + 1 - leaves
+                best[node] = first if lost[first] <= lost[second] else second
+
+    def append(self, d, crossings_left):
+        """Adds the dwarf, after the dwarfs with the same crossing time that are already in the container, and
+           returns its slot."""
+        slot = self.next_slot[self.groups[d]]
+        self.next_slot[self.groups[d]] = slot + 1
+        self.slot_dwarfs[slot] = d
+        self.set_left(slot, min(crossings_left, MAX_LEFT))
+        self.count += 1
+        if self.max_together is not None:
+            before = self.before(slot, self.max_together - 1)
+            self.refresh(before + [slot], self.after(slot, self.max_together - 1))
+        return slot
+
+    def remove(self, slot):
+        """Removes the dwarf in the slot, and returns it."""
+        d = self.slot_dwarfs[slot]
+        self.slot_dwarfs[slot] = -1
+        self.set_left(slot, 0)
+        self.count -= 1
+        if self.max_together is not None:
+            self.set_lost(slot, NO_GROUP)
+            before = self.before(slot, self.max_together - 1)
+            self.refresh(before, self.after(slot, self.max_together - 1))
+        return d
+
+    def first(self, crossings_required=1, slot=0):
+        """Returns the first slot from the slot provided with a dwarf that has at least the required crossings
+           left, or -1 if there is no such slot."""
+        left = self.left
+        node = slot + self.leaves
+        if node >= 2 * self.leaves:
+            return -1
+        while left[node] < crossings_required:
+            while node & 1:
+                node >>= 1
+            if node == 0:
+                return -1
+            node += 1
+        while node < self.leaves:
+            node = 2 * node if left[2 * node] >= crossings_required else 2 * node + 1
+        return node - self.leaves
+
+    def last(self, slot):
+        """Returns the last slot before the slot provided with a dwarf in it, or -1 if there is no such slot."""
+        if slot == 0:
+            return -1
+        left = self.left
+        node = slot - 1 + self.leaves
+        while not left[node]:
+            while not node & 1:
+                node >>= 1
+            if node == 1:
+                return -1
+            node -= 1
+        while node < self.leaves:
+            node = 2 * node + 1 if left[2 * node + 1] else 2 * node
+        return node - self.leaves
+
+    def before(self, slot, count):
+        """Returns the slots of at most count dwarfs right before the slot provided, in order."""
+        slots = []
+        while len(slots) < count and (slot := self.last(slot)) >= 0:
+            slots.append(slot)
+        return slots[::-1]
+
+    def after(self, slot, count):
+        """Returns the slots of at most count dwarfs right after the slot provided, in order."""
+        slots = []
+        while len(slots) < count and (slot := self.first(1, slot + 1)) >= 0:
+            slots.append(slot)
+        return slots
+
+    def set_left(self, slot, crossings_left):
+        """Sets the crossings left for the dwarf in the slot, and updates the tree."""
+        left = self.left
+        node = slot + self.leaves
+        left[node] = crossings_left
+        node >>= 1
+        while node:
+            most = max(left[2 * node], left[2 * node + 1])
+            if left[node] == most:
+                break
+            left[node] = most
+            node >>= 1
+
+    def set_lost(self, slot, lost_time):
+        """Sets the time lost by the group starting at the slot, and updates the tree."""
+        lost, best, leaves = self.lost, self.best, self.leaves
+        if lost[slot] == lost_time:
+            return
+        lost[slot] = lost_time
+        node = (slot + leaves) >> 1
+        while node:
+            first = best[2 * node] if 2 * node < leaves else 2 * node - leaves
+            second = best[2 * node + 1] if 2 * node + 1 < leaves else 2 * node + 1 - leaves
+            group = first if lost[first] <= lost[second] else second
+            if best[node] == group != slot:
+                break  # The groups compared further up are the same, and so is the time they lose
+            best[node] = group
+            node >>= 1
+
+    def refresh(self, starts, following):
+        """Updates the time lost by the groups starting at the slots in starts, where following are the slots of
+           the dwarfs after them. A group that has less than max_together dwarfs loses no time, and is left out."""
+        times, slot_dwarfs, max_together = self.times, self.slot_dwarfs, self.max_together
+        window = starts + following
+        for place, slot in enumerate(starts):
+            group = window[place:place + max_together]
+            if len(group) < max_together:
+                self.set_lost(slot, NO_GROUP)
+            else:
+                slowest = times[slot_dwarfs[group[-1]]]
+                self.set_lost(slot, sum(slowest - times[slot_dwarfs[s]] for s in group))
+
+    def group(self, slot, count):
+        """Returns the slots of count dwarfs, starting with the slot provided."""
+        return [slot] + self.after(slot, count - 1)
+
+    def most_similar(self):
+        """Returns the slot of the first dwarf in the fastest group of the most similar dwarfs, and the time lost
+           when they walk together. The same group as SimilarDwarfs.most_similar gives."""
+        slot = self.best[1]
+        return slot, self.lost[slot]
+
+
+class ArrayGreedySolver:
+    """Solves one instance of the problem with the same greedy algorithm as GreedySolver, and gives the same total
+       time and scheme, but keeps the dwarfs as typed arrays of crossing times and crossings instead of Dwarf
+       objects. The memory needed is a few tens of bytes for each dwarf, besides the scheme, which is only kept
+       with keep_scheme set."""
+
+    def __init__(self, num_of_dwarfs, max_crossings, start_pos, max_together, crossing_times=None,
+                 keep_scheme=True, scheme=None):
+        """Sets up the problem with all dwarfs at the start and nothing solved yet. The crossing time of dwarf
+           number nr is crossing_times[nr - 1], and 1, 2, 3, ... when no crossing times are given. The times are
+           kept as 64-bit integers, or as floats when any of them is not an integer, see time_typecode. The moves
+           are added to scheme, if a scheme is given, e.g. a CompactScheme, and otherwise to a list."""
+        if start_pos != dwarf.START:
+            reason = f"the array greedy only moves dwarfs that start at {dwarf.START}"
+            raise DwarfStartingPositionError(1, start_pos, reason)
+        self.max_crossings = max_crossings
+        self.max_together = max_together
+        if crossing_times is None:
+            self.times = array("q", range(1, num_of_dwarfs + 1))
+        else:
+            self.times = array(time_typecode(crossing_times[:num_of_dwarfs]), crossing_times[:num_of_dwarfs])
+        order = time_order(self.times)
+        groups = array("i", [0]) * num_of_dwarfs  # Place in the order of the first dwarf with the same time
+        group = 0
+        for place, d in enumerate(order):
+            if self.times[d] != self.times[order[group]]:
+                group = place
+            groups[d] = group
+        self.crossings = array("b" if max_crossings <= MAX_LEFT else "i", [0]) * num_of_dwarfs
+        self.at_start = ArrayDwarfs(self.times, groups, (max_crossings + 1) // 2, max_together)
+        self.at_finish = ArrayDwarfs(self.times, groups, max_crossings // 2)
+        self.at_start.fill(order, max_crossings)
+        self.done = array("i")
+        self.scheme = None if not keep_scheme else [] if scheme is None else scheme
+        self.lantern = Lantern(dwarf.START)
+        self.total_time = 0
+        self.cross_losses = array(self.times.typecode)  # Time lost by the faster dwarfs in each crossing
+        self.return_times = array(self.times.typecode)  # Time for each walk back with the lantern
+        self.execution_time = None
+
+    def solve(self):
+        """Executes the algorithm to solve the problem, and returns the total time and the scheme."""
+        t_start = time.time()
+        while self.at_start:  # Keep going until there are no more dwarfs at start to cross the bridge
+            self.total_time += self.cross_the_bridge()
+            self.total_time += self.return_with_lantern()
+        self.execution_time = time.time() - t_start
+        return self.total_time, self.scheme
+
+    def cross_the_bridge(self):
+        """Selects the most suitable group of dwarfs to cross the bridge, and return the time the crossing takes."""
+        count = min(self.max_together, len(self.at_start))
+        if self.faster_dwarf_at_start():
+            slots = self.at_start.group(self.at_start.first(), count)
+            lost_time = None
+        else:
+            first_slot, lost_time = self.most_similar_dwarfs()
+            slots = self.at_start.group(first_slot, count)
+        slot_dwarfs = self.at_start.slot_dwarfs
+        group_times = [self.times[slot_dwarfs[slot]] for slot in slots]
+        if lost_time is None:
+            lost_time = sum(group_times[-1] - t for t in group_times)
+        self.cross_losses.append(lost_time)
+        self.cross(slots)
+        return group_times[-1]
+
+    def faster_dwarf_at_start(self):
+        """Returns True is there is a faster dwarf at start that should cross the bridge in order to carry the
+           lantern back. The same as GreedySolver.faster_dwarf_at_start."""
+        at_start, at_finish, times = self.at_start, self.at_finish, self.times
+        fastest_at_start = at_start.first(3)
+        if fastest_at_start < 0:
+            return False
+        fastest_at_finish = at_finish.first(2)
+        if not at_finish or fastest_at_finish < 0:
+            return True
+        return times[at_start.slot_dwarfs[fastest_at_start]] < times[at_finish.slot_dwarfs[fastest_at_finish]] and \
+            times[at_finish.slot_dwarfs[at_finish.first()]] > \
+            times[at_start.slot_dwarfs[self.most_similar_dwarfs()[0]]]
+
+    def most_similar_dwarfs(self):
+        """Returns the slot of the first dwarf in the fastest group of the most similar dwarfs at start, and the
+           time lost when they cross together."""
+        if len(self.at_start) <= self.max_together:
+            slots = self.at_start.group(self.at_start.first(), len(self.at_start))
+            group_times = [self.times[self.at_start.slot_dwarfs[slot]] for slot in slots]
+            return slots[0], sum(group_times[-1] - t for t in group_times)
+        return self.at_start.most_similar()
+
+    def cross(self, slots):
+        """Moves the dwarfs in the slots at start across the bridge, and adds the crossing to the scheme."""
+        if not self.lantern.at_pos(dwarf.START):
+            return
+        crossing_dwarfs = [self.at_start.remove(slot) for slot in slots]
+        for d in crossing_dwarfs:
+            self.crossings[d] += 1
+            if self.crossings[d] >= self.max_crossings:
+                self.done.append(d)
+            else:
+                self.at_finish.append(d, self.max_crossings - self.crossings[d])
+        self.lantern.move_lantern(dwarf.FINISH)
+        if self.scheme is not None:
+            self.scheme.append([d + 1 for d in crossing_dwarfs] + ["cross"])
+
+    def return_with_lantern(self):
+        """Lets the fastest dwarf at finish with crossings left walk back with the lantern, and returns the time it
+           takes."""
+        if self.at_finish and self.at_start and self.lantern.at_pos(dwarf.FINISH) and \
+                (slot := self.at_finish.first(2)) >= 0:
+            d = self.at_finish.remove(slot)
+            self.crossings[d] += 1
+            self.lantern.move_lantern(dwarf.START)
+            self.at_start.append(d, self.max_crossings - self.crossings[d])
+            if self.scheme is not None:
+                self.scheme.append([d + 1, "go back"])
+            self.return_times.append(self.times[d])
+            return self.times[d]
+        else:
+            return 0
+
+
+def greedy_min_crossing(num_of_dwarfs, max_crossings, start_pos, max_together, crossing_times=None, arrays=False,
+                        compact=False, sink=None):
+    """Sets up the problem and executes the algorithm to solve the problem. The crossing time of dwarf number nr
+       is crossing_times[nr - 1], and 1, 2, 3, ... when no crossing times are given. With arrays set the dwarfs are
+       kept in typed arrays by ArrayGreedySolver, which gives the same result with a fraction of the memory. With
+       compact set the scheme is returned as a CompactScheme. With a sink, e.g. a scheme writer, the moves are
+       written to the sink as they are made, and the sink is returned in place of the scheme."""
+    scheme = sink if sink is not None else CompactScheme(max_together, crossing_times) if compact else None
+    solver = (ArrayGreedySolver if arrays else GreedySolver)(num_of_dwarfs, max_crossings, start_pos, max_together,
+                                                             crossing_times, scheme=scheme)
+    total_time, scheme = solver.solve()
+    print(f"\nExecution Time: {solver.execution_time * 1000} ms")
+    print_dwarf_positions(solver.at_start, solver.at_finish, solver.done)
     return total_time, scheme
 
 
-def main():
-    """Starts the execution and presents the result when done."""
-    global cross_losses, return_times
-    time_for_crossing, scheme = greedy_min_crossing(NUMBER_OF_DWARFS, MAX_CROSSINGS, dwarf.START, MAX_TOGETHER)
+def can_cross(num_of_dwarfs, max_crossings, max_together):
+    """Returns True if all the dwarfs can get across, either all at once or with dwarfs walking back with the
+       lantern. Otherwise there is no dwarf to walk back, and the greedy algorithm would keep waiting for one."""
+    if num_of_dwarfs <= max(1, max_together):
+        return num_of_dwarfs == 0 or max_crossings >= 1
+    return max_crossings >= 3 and max_together >= 2
+
+
+def solve_chunk(chunk, keep_schemes):
+    """Solves the instances of a chunk of a batch, and returns [index, total_time, scheme] for each of them."""
+    results = []
+    for index, (num_of_dwarfs, max_crossings, max_together, crossing_times) in chunk:
+        if not can_cross(num_of_dwarfs, max_crossings, max_together):
+            results.append([index, None, None])
+            continue
+        solver = GreedySolver(num_of_dwarfs, max_crossings, dwarf.START, max_together, crossing_times)
+        total_time, scheme = solver.solve()
+        results.append([index, total_time, scheme if keep_schemes else None])
+    return results
+
+
+def chunks_of(specs, chunk_dwarfs):
+    """Yields the instance specs numbered in the order given, in chunks of about chunk_dwarfs dwarfs in total.
+       A spec is (num_of_dwarfs, max_crossings, max_together) or (num_of_dwarfs, max_crossings, max_together,
+       crossing_times)."""
+    chunk = []
+    dwarfs_in_chunk = 0
+    for index, spec in enumerate(specs):
+        num_of_dwarfs, max_crossings, max_together, *crossing_times = spec
+        chunk.append((index, (num_of_dwarfs, max_crossings, max_together, *(crossing_times or [None]))))
+        dwarfs_in_chunk += num_of_dwarfs
+        if dwarfs_in_chunk >= chunk_dwarfs:
+            yield chunk
+            chunk = []
+            dwarfs_in_chunk = 0
+    if chunk:
+        yield chunk
+
+
+def batch_min_crossing(specs, workers=None, chunk_dwarfs=CHUNK_DWARFS, keep_schemes=False):
+    """Solves many instances with the greedy algorithm over a pool of processes, and yields [index, total_time,
+       scheme] for every instance as soon as it is solved, where index is the place of its spec in specs.
+       The specs can be any iterable, also a generator, and are only read as fast as the workers need them.
+       Small instances are sent to the workers together, in chunks of about chunk_dwarfs dwarfs.
+       The schemes are only sent back with keep_schemes set, otherwise the scheme is None. Instances where the
+       dwarfs can't all get across have None as total time."""
+    workers = workers or os.cpu_count()
+    chunks = chunks_of(specs, chunk_dwarfs)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        while True:
+            for chunk in chunks:
+                pending.add(executor.submit(solve_chunk, chunk, keep_schemes))
+                if len(pending) >= workers * CHUNKS_PER_WORKER:
+                    break
+            if not pending:
+                return
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                yield from future.result()
+
+
+def main(output=None):
+    """Starts the execution and presents the result when done. With an output file the scheme is written to the
+       file while it is made instead of being printed: a .jsonl file gets a move on every line, any other file
+       the binary format of BinaryWriter."""
+    sink = scheme_writer(output, MAX_TOGETHER) if output else None
+    solver = GreedySolver(NUMBER_OF_DWARFS, MAX_CROSSINGS, dwarf.START, MAX_TOGETHER, scheme=sink)
+    time_for_crossing, scheme = solver.solve()
+    cross_losses, return_times = solver.cross_losses, solver.return_times
+    print(f"\nExecution Time: {solver.execution_time * 1000} ms")
+    print_dwarf_positions(solver.at_start, solver.at_finish, solver.done)
     print(f"Total time for all dwarfs crossing the bridge: {time_for_crossing}")
-    print(scheme)
+    if sink is not None:
+        sink.close()
+        print(f"The scheme of {len(sink)} moves is written to {output}")
+    else:
+        print(scheme)
     print("=============================================\n")
     print(f"Crossing Losses:\n{cross_losses}")
     print(f"Average Loss: {sum(cross_losses) / len(cross_losses)}\n")
@@ -284,4 +841,4 @@ def main():
 
 
 if __name__ == '__main__':
-    main()
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,213 @@
+import unittest
+import dwarf
+import random
+import threading
+from dwarf_errors import DwarfStartingPositionError
+from greedy_min_dwarf import ArrayGreedySolver, GreedySolver, SimilarDwarfs, SortedDwarfs, batch_min_crossing, \
+    generate_dwarfs, greedy_min_crossing, time_lost, time_order
+
+
+NUMBER_OF_DWARFS = 300
+MAX_CROSSINGS = 3
+MAX_TOGETHER = 2
+
+
+class GreedySolverTests(unittest.TestCase):
+
+    def test_solve(self):
+        solver = GreedySolver(NUMBER_OF_DWARFS, MAX_CROSSINGS, dwarf.START, MAX_TOGETHER)
+        total_time, scheme = solver.solve()
+        self.assertEqual(89551, total_time)
+        self.assertEqual(len(scheme), len(solver.cross_losses) + len(solver.return_times))
+        self.assertEqual(1, sum(solver.cross_losses) / len(solver.cross_losses))
+        self.assertEqual((1 + len(solver.return_times)) / 2, sum(solver.return_times) / len(solver.return_times))
+        self.assertEqual(total_time, solver.total_time)
+
+    def test_separate_statistics(self):
+        first = GreedySolver(NUMBER_OF_DWARFS, MAX_CROSSINGS, dwarf.START, MAX_TOGETHER)
+        second = GreedySolver(NUMBER_OF_DWARFS, MAX_CROSSINGS, dwarf.START, MAX_TOGETHER)
+        first.solve()
+        second.solve()
+        self.assertEqual(first.cross_losses, second.cross_losses)
+        self.assertEqual(first.return_times, second.return_times)
+        self.assertEqual(len(first.return_times) + 1, len(first.cross_losses))
+
+    def test_threads(self):
+        expected = {}
+        for max_together in range(2, 6):
+            solver = GreedySolver(NUMBER_OF_DWARFS, MAX_CROSSINGS, dwarf.START, max_together)
+            expected[max_together] = solver.solve(), solver.cross_losses, solver.return_times
+        results = {}
+
+        def solve(max_together):
+            solver = GreedySolver(NUMBER_OF_DWARFS, MAX_CROSSINGS, dwarf.START, max_together)
+            results[max_together] = solver.solve(), solver.cross_losses, solver.return_times
+
+        threads = [threading.Thread(target=solve, args=(max_together,)) for max_together in range(2, 6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(expected, results)
+
+
+class SortedDwarfsTests(unittest.TestCase):
+
+    def test_same_order_as_sort(self):
+        rng = random.Random(1)
+        dwarfs = generate_dwarfs(50, 5, dwarf.START, [rng.randint(1, 8) for _ in range(50)])
+        container = SortedDwarfs(dwarfs)
+        in_list = []
+        added = {d.dwarf_nr: 0 for d in dwarfs}
+        for d in dwarfs:
+            container.append(d)
+            in_list.append(d)
+            added[d.dwarf_nr] += 1
+        for _ in range(200):
+            in_list.sort()
+            self.assertEqual([d.dwarf_nr for d in in_list], [d.dwarf_nr for d in container])
+            self.assertEqual(len(in_list), len(container))
+            if in_list:
+                index = rng.randrange(len(in_list))
+                self.assertIs(in_list[index], container[index])
+                self.assertEqual(index, container.index(in_list[index]))
+                self.assertEqual(in_list[index:index + 3], container[index:index + 3])
+                removed = container.pop(index)
+                self.assertIs(in_list.pop(index), removed)
+            again = [d for d in dwarfs if added[d.dwarf_nr] < 3 and all(d is not other for other in in_list)]
+            if again:
+                d = rng.choice(again)
+                container.append(d)
+                in_list.append(d)
+                added[d.dwarf_nr] += 1
+
+    def test_fastest(self):
+        rng = random.Random(4)
+        dwarfs = generate_dwarfs(40, 5, dwarf.START, [rng.randint(1, 10) for _ in range(40)])
+        for d in dwarfs:
+            d.crossings = rng.randint(0, 4)
+        container = SortedDwarfs(dwarfs)
+        for d in dwarfs:
+            container.append(d)
+        while container:
+            for crossings_required in range(1, 6):
+                with_crossings_left = [d for d in container if d.max_crossings - d.crossings >= crossings_required]
+                expected = with_crossings_left[0] if with_crossings_left else None
+                self.assertIs(expected, container.fastest(crossings_required))
+            container.pop(rng.randrange(len(container)))
+
+    def test_index_error(self):
+        container = SortedDwarfs(generate_dwarfs(3, 3, dwarf.START))
+        with self.assertRaises(IndexError):
+            container[0]
+
+
+class SimilarDwarfsTests(unittest.TestCase):
+
+    def test_most_similar(self):
+        rng = random.Random(3)
+        for max_together in range(2, 5):
+            dwarfs = generate_dwarfs(60, 3, dwarf.START, [rng.randint(1, 30) for _ in range(60)])
+            container = SimilarDwarfs(dwarfs, max_together)
+            for d in dwarfs:
+                container.append(d)
+            removed = []
+            added_again = set()  # With three crossings, a dwarf can only be added twice
+            while len(container) > max_together:
+                in_list = list(container)
+                groups = [in_list[index:index + max_together] for index in range(len(in_list) - max_together + 1)]
+                index = min(range(len(groups)), key=lambda index: time_lost(groups[index]))
+                self.assertEqual((index, time_lost(groups[index])), container.most_similar())
+                if removed and rng.random() < 0.3:
+                    container.append(removed.pop(rng.randrange(len(removed))))
+                else:
+                    d = container.pop(rng.randrange(len(container)))
+                    if d.dwarf_nr not in added_again:
+                        added_again.add(d.dwarf_nr)
+                        removed.append(d)
+
+
+class ArrayGreedySolverTests(unittest.TestCase):
+
+    def test_same_as_solver(self):
+        rng = random.Random(6)
+        instances = [(n, m, k, None) for n in range(0, 25) for m in [3, 4, 5] for k in [2, 3, 4]]
+        for _ in range(150):
+            num_of_dwarfs = rng.randint(1, 80)
+            instances.append((num_of_dwarfs, rng.choice([3, 5, 9]), rng.choice([2, 3]),
+                              [rng.randint(1, rng.choice([3, 1000])) for _ in range(num_of_dwarfs)]))
+        for num_of_dwarfs, max_crossings, max_together, crossing_times in instances:
+            solver = GreedySolver(num_of_dwarfs, max_crossings, dwarf.START, max_together, crossing_times)
+            array_solver = ArrayGreedySolver(num_of_dwarfs, max_crossings, dwarf.START, max_together, crossing_times)
+            self.assertEqual(solver.solve(), array_solver.solve())
+            self.assertEqual(solver.cross_losses, list(array_solver.cross_losses))
+            self.assertEqual(solver.return_times, list(array_solver.return_times))
+            self.assertEqual(len(solver.done), len(array_solver.done))
+
+    def test_no_scheme(self):
+        solver = ArrayGreedySolver(NUMBER_OF_DWARFS, MAX_CROSSINGS, dwarf.START, MAX_TOGETHER, keep_scheme=False)
+        self.assertEqual((89551, None), solver.solve())
+        self.assertEqual(0, len(solver.at_start))
+        self.assertEqual(NUMBER_OF_DWARFS, len(solver.at_finish) + len(solver.done))
+
+    def test_starting_position(self):
+        with self.assertRaises(DwarfStartingPositionError):
+            ArrayGreedySolver(NUMBER_OF_DWARFS, MAX_CROSSINGS, dwarf.FINISH, MAX_TOGETHER)
+
+
+class TimeOrderTests(unittest.TestCase):
+
+    def test_same_order_as_sort(self):
+        rng = random.Random(8)
+        rosters = [[], [5], [3, 1, 2], [-4, 7, -4, 0]]
+        for highest in [1, 9, 1 << 16, 1 << 40]:
+            rosters += [[rng.randint(-highest, highest) for _ in range(rng.randint(1, 300))] for _ in range(10)]
+        rosters += [[0.5, 0.25, 0.5], [2, 1.5, 1]]
+        for crossing_times in rosters:
+            expected = sorted(range(len(crossing_times)), key=crossing_times.__getitem__)
+            self.assertEqual(expected, list(time_order(crossing_times)))
+
+    def test_greedy_min_crossing(self):
+        rng = random.Random(9)
+        crossing_times = [rng.randint(1, 20) for _ in range(NUMBER_OF_DWARFS)]
+        expected = GreedySolver(NUMBER_OF_DWARFS, MAX_CROSSINGS, dwarf.START, MAX_TOGETHER, crossing_times).solve()
+        for arrays in [False, True]:
+            total_time, scheme = greedy_min_crossing(NUMBER_OF_DWARFS, MAX_CROSSINGS, dwarf.START, MAX_TOGETHER,
+                                                     crossing_times, arrays=arrays, compact=True)
+            self.assertEqual(expected, (total_time, scheme.to_list()))
+            self.assertEqual(total_time, scheme.total_time())
+
+    def test_float_times(self):
+        crossing_times = [2.5, 1.5, 3.0, 0.5]
+        expected = greedy_min_crossing(4, MAX_CROSSINGS, dwarf.START, MAX_TOGETHER, crossing_times)
+        self.assertEqual(8.0, expected[0])
+        for arrays, compact in [(True, False), (False, True), (True, True)]:
+            total_time, scheme = greedy_min_crossing(4, MAX_CROSSINGS, dwarf.START, MAX_TOGETHER, crossing_times,
+                                                     arrays=arrays, compact=compact)
+            self.assertEqual(expected, (total_time, scheme if arrays and not compact else scheme.to_list()))
+        with self.assertRaises(ValueError):
+            ArrayGreedySolver(4, MAX_CROSSINGS, dwarf.START, MAX_TOGETHER, [1, 2, 3, 2 ** 64])
+
+
+class BatchMinCrossingTests(unittest.TestCase):
+
+    def test_same_as_solver(self):
+        rng = random.Random(5)
+        specs = [(n, 3, k) for n in range(0, 40) for k in [2, 3]]
+        specs += [(n, 5, 2, [rng.randint(1, 9) for _ in range(n)]) for n in range(1, 30)]
+        results = list(batch_min_crossing(iter(specs), workers=2, chunk_dwarfs=50, keep_schemes=True))
+        self.assertEqual(list(range(len(specs))), sorted(index for index, _, _ in results))
+        for index, total_time, scheme in results:
+            num_of_dwarfs, max_crossings, max_together, *crossing_times = specs[index]
+            solver = GreedySolver(num_of_dwarfs, max_crossings, dwarf.START, max_together, *crossing_times)
+            self.assertEqual(solver.solve(), (total_time, scheme))
+
+    def test_no_schemes(self):
+        results = sorted(batch_min_crossing([(300, 3, 2), (1, 1, 1), (4, 1, 2), (4, 3, 1), (2, 1, 2), (3, 2, 3),
+                                             (1, 0, 2)], workers=1))
+        self.assertEqual([[0, 89551, None], [1, 1, None], [2, None, None], [3, None, None], [4, 2, None],
+                          [5, 3, None], [6, None, None]], results)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,350 @@
+"""
+Incremental Greedy Solutions for the Dwarf Bridge Crossing Problem.
+
+When a few crossing times change, or a few dwarfs join or leave, the greedy scheme is normally solved again from
+the start. The greedy algorithm makes its choices one crossing after the other, and a choice can only change if
+a dwarf that was changed could have been part of it. This program keeps the scheme together with what every
+crossing looked at: the fastest dwarf at start that could cross, the last dwarf of the fastest group sent over,
+and the time lost by the most similar group and its first and last dwarf. From those it finds the first crossing
+a batch of changes can affect, in NumPy passes over the records, rebuilds the dwarfs at start and at finish as they
+were at that crossing, and lets the greedy algorithm carry on from there. The moves before it are kept, and so is
+their time.
+
+A new dwarf, or a dwarf with a new crossing time, can only change a crossing if it is faster than the fastest
+dwarf the crossing looked at, or if it falls inside the most similar group, or if a group with it can lose at most
+as much time as the most similar group, which needs another dwarf within that much time of it. A dwarf that leaves,
+or gets a new crossing time, can only change a crossing before its first move if it was the fastest dwarf looked
+at, or in the most similar group, or if the dwarfs on both sides of it are close enough to make a more similar
+group without it. The checks can give a crossing that doesn't change, never one too late, so the repaired scheme
+is always the same as when the greedy algorithm solves the changed problem from the start.
+
+How much is solved again depends on where in the scheme the changed dwarfs are. The greedy algorithm sends the
+dwarfs over roughly from the fastest to the slowest, so a change among the slow dwarfs only takes the last part of
+the scheme, while a change of the fastest dwarfs takes almost all of it.
+"""
+from array import array
+from dwarf import Lantern
+from dwarf_errors import DwarfCrossingError
+from dwarf_scheme import CompactScheme, time_typecode
+from greedy_min_dwarf import ArrayDwarfs, ArrayGreedySolver, MAX_LEFT, can_cross
+import dwarf
+import time
+
+
+NUMBER_OF_DWARFS = 100000
+MAX_CROSSINGS = 3
+MAX_TOGETHER = 2
+NUMBER_OF_CHANGES = 10
+NOT_SEEN = -2 ** 63  # Recorded in place of a time that a crossing didn't look at
+FAR = 2 ** 63 - 1  # Time to the closest dwarf when there is no other dwarf
+RECORDS = ("fastest", "fast_last", "lost", "group_first", "group_last", "at_start")  # Recorded for every crossing
+
+
+def as_numpy(values):
+    """Returns a NumPy view of the typed array, which shares the memory with it."""
+    import numpy as np
+    return np.frombuffer(values, dtype={"b": np.int8, "i": np.int32, "q": np.int64, "d": np.float64}[values.typecode])
+
+
+def load_dwarfs(container, capacity, members, crossings_left):
+    """Puts the dwarfs in members, given in the order they have in the container, with the crossings they have
+       left, into an empty container set up with the capacity, in one go. The trees are built with NumPy, a level
+       at a time, instead of a dwarf at a time."""
+    import numpy as np
+    if not len(members):
+        return
+    leaves = container.leaves
+    groups = as_numpy(container.groups)[members].astype(np.int64)
+    starts = np.flatnonzero(np.concatenate([[True], groups[1:] != groups[:-1]]))
+    sizes = np.diff(np.append(starts, len(members)))
+    slots = groups * capacity + np.arange(len(members)) - np.repeat(starts, sizes)
+    as_numpy(container.next_slot)[groups[starts]] += sizes
+    as_numpy(container.slot_dwarfs)[slots] = members
+    left = as_numpy(container.left)
+    left[leaves + slots] = np.minimum(crossings_left, MAX_LEFT)
+    level = leaves // 2
+    while level:
+        left[level:2 * level] = np.maximum(left[2 * level:4 * level:2], left[2 * level + 1:4 * level:2])
+        level //= 2
+    container.count = len(members)
+    max_together = container.max_together
+    if max_together is None or len(members) < max_together:
+        return
+    times = as_numpy(container.times)[members]
+    sums = np.concatenate([[0], np.cumsum(times)])
+    places = np.arange(len(members) - max_together + 1)
+    lost = as_numpy(container.lost)
+    lost[slots[places]] = max_together * times[places + max_together - 1] - \
+        (sums[places + max_together] - sums[places])
+    best = as_numpy(container.best)
+    candidates = np.arange(leaves)  # Group in each node of the level below, to start with the slots themselves
+    level = leaves // 2
+    while level:
+        first, second = candidates[0::2], candidates[1::2]
+        candidates = np.where(lost[first] <= lost[second], first, second)
+        best[level:2 * level] = candidates
+        level //= 2
+
+
+class RepairSolver(ArrayGreedySolver):
+    """Carries on with the greedy algorithm of ArrayGreedySolver from the dwarfs where they are after the moves
+       already in the scheme, and records what every crossing looks at for IncrementalGreedySolver."""
+
+    def __init__(self, times, present, max_crossings, max_together, scheme, records, cross_losses, return_times):
+        """Sets up the dwarfs from the moves in the scheme, which end with the lantern back at start. times holds
+           the crossing time of dwarf number nr at nr - 1, where only the dwarfs set in present take part. The
+           records, cross losses and return times of the moves in the scheme are given, and added to."""
+        import numpy as np
+        self.max_crossings = max_crossings
+        self.max_together = max_together
+        self.times = times
+        num_of_dwarfs = len(times)
+        in_play = np.frombuffer(present, dtype=np.uint8).astype(bool)
+        time_of = as_numpy(times)
+        order = np.flatnonzero(in_play)
+        order = order[np.argsort(time_of[order], kind="stable")]
+        firsts = np.concatenate([[True], time_of[order][1:] != time_of[order][:-1]])
+        groups = np.zeros(num_of_dwarfs, dtype=np.int32)  # Place in the order of the first dwarf with the same time
+        groups[order] = np.flatnonzero(firsts)[np.cumsum(firsts) - 1]
+        groups = array("i", groups.tobytes())
+        # The crossings and the last move of every dwarf, from the moves in the scheme
+        moves = len(scheme)
+        dwarf_nrs = np.frombuffer(scheme.dwarf_nrs, dtype=np.int32).reshape(moves, max_together)
+        move_nrs, columns = np.nonzero(dwarf_nrs)
+        moved = dwarf_nrs[move_nrs, columns].astype(np.int64) - 1
+        crossings = np.bincount(moved, minlength=num_of_dwarfs)
+        last_move = np.full(num_of_dwarfs, -1, dtype=np.int64)
+        np.maximum.at(last_move, moved, move_nrs * max_together + columns)  # The place in the move breaks ties
+        dwarf_nr = np.arange(num_of_dwarfs)
+        at_start = in_play & (crossings % 2 == 0)
+        at_finish = in_play & (crossings % 2 == 1) & (crossings < max_crossings)
+        done = in_play & (crossings >= max_crossings)
+        self.crossings = array("b" if max_crossings <= MAX_LEFT else "i",
+                               crossings.astype(np.int8 if max_crossings <= MAX_LEFT else np.int32).tobytes())
+        start_capacity, finish_capacity = (max_crossings + 1) // 2, max_crossings // 2
+        self.at_start = ArrayDwarfs(times, groups, start_capacity, max_together)
+        self.at_finish = ArrayDwarfs(times, groups, finish_capacity)
+        for container, capacity, members in ((self.at_start, start_capacity, at_start),
+                                             (self.at_finish, finish_capacity, at_finish)):
+            members = np.flatnonzero(members)
+            # The same time in the order the dwarfs got there, after the dwarfs that haven't moved yet
+            members = members[np.lexsort((dwarf_nr[members], last_move[members], time_of[members]))]
+            load_dwarfs(container, capacity, members, max_crossings - crossings[members])
+        done = np.flatnonzero(done)
+        self.done = array("i", done[np.argsort(last_move[done], kind="stable")].astype(np.int32).tobytes())
+        self.scheme = scheme
+        self.lantern = Lantern(dwarf.START)
+        self.total_time = sum(scheme.durations)
+        self.cross_losses = cross_losses
+        self.return_times = return_times
+        self.records = records
+        self.execution_time = None
+
+    def cross_the_bridge(self):
+        """Selects the same group of dwarfs to cross the bridge as ArrayGreedySolver, records what the choice
+           looked at, and returns the time the crossing takes."""
+        at_start, at_finish, times = self.at_start, self.at_finish, self.times
+        slot_dwarfs = at_start.slot_dwarfs
+        count = min(self.max_together, len(at_start))
+        fastest = at_start.first(3)
+        group = None
+        group_lost = NOT_SEEN
+        if fastest < 0:
+            faster = False
+        elif not at_finish or (fastest_at_finish := at_finish.first(2)) < 0:
+            faster = True
+        elif times[slot_dwarfs[fastest]] < times[at_finish.slot_dwarfs[fastest_at_finish]]:
+            first_slot, group_lost = self.most_similar_dwarfs()
+            group = at_start.group(first_slot, count)
+            faster = times[at_finish.slot_dwarfs[at_finish.first()]] > times[slot_dwarfs[first_slot]]
+        else:
+            faster = False
+        if faster:
+            slots = at_start.group(at_start.first(), count)
+            lost_time = None
+        else:
+            if group is None:
+                first_slot, group_lost = self.most_similar_dwarfs()
+                group = at_start.group(first_slot, count)
+            slots = group
+            lost_time = group_lost
+        fastest_record, fast_last, lost, group_first, group_last, at_start_count = self.records
+        fastest_record.append(times[slot_dwarfs[fastest]] if fastest >= 0 else NOT_SEEN)
+        fast_last.append(times[slot_dwarfs[slots[-1]]] if faster else NOT_SEEN)
+        lost.append(group_lost)
+        group_first.append(NOT_SEEN if group is None else times[slot_dwarfs[group[0]]])
+        group_last.append(NOT_SEEN if group is None else times[slot_dwarfs[group[-1]]])
+        at_start_count.append(len(at_start))
+        group_times = [times[slot_dwarfs[slot]] for slot in slots]
+        if lost_time is None:
+            lost_time = sum(group_times[-1] - t for t in group_times)
+        self.cross_losses.append(lost_time)
+        self.cross(slots)
+        return group_times[-1]
+
+
+class IncrementalGreedySolver:
+    """Keeps the greedy scheme of a problem up to date while crossing times change and dwarfs join or leave. The
+       dwarfs keep their numbers, new dwarfs get the numbers after the last one, and the dwarfs that leave are
+       not in the scheme any more. The scheme is always the same as the one GreedySolver gives for the dwarfs
+       that are left, in the order of their numbers."""
+
+    def __init__(self, crossing_times, max_crossings=MAX_CROSSINGS, max_together=MAX_TOGETHER):
+        """Sets up the problem with dwarf number nr crossing in crossing_times[nr - 1], all starting at start. The
+           times are kept as 64-bit integers, or as floats when any of them is not an integer, see time_typecode."""
+        self.max_crossings = max_crossings
+        self.max_together = max_together
+        typecode = time_typecode(crossing_times)
+        self.times = array(typecode, crossing_times)
+        self.present = bytearray([1]) * len(self.times)
+        self.scheme = CompactScheme(max_together, self.times)
+        self.records = [array(typecode) for _ in RECORDS]
+        self.cross_losses = array(typecode)
+        self.return_times = array(typecode)
+        self.total_time = 0
+        self.solved = False
+        self.repaired_from = None  # Number of the first move that was solved again by the last update
+        self.execution_time = None
+
+    def dwarf_numbers(self):
+        """Returns the numbers of the dwarfs taking part, in order."""
+        return [nr for nr, taking_part in enumerate(self.present, 1) if taking_part]
+
+    def solve(self):
+        """Solves the problem from the start, and returns the total time and the scheme."""
+        self.repair(0)
+        self.solved = True
+        return self.total_time, self.scheme
+
+    def update(self, changes=None, added=(), removed=()):
+        """Changes the crossing times of the dwarfs given as {dwarf number: crossing time}, adds new dwarfs with
+           the crossing times in added, and takes out the dwarfs with the numbers in removed. Solves again from
+           the first crossing the changes can affect, and returns the total time and the scheme. Nothing is changed
+           if any of the changes is wrong. A time that is not an integer turns all the times into floats."""
+        changes = dict(changes or {})
+        removed = set(removed)
+        for nr in list(changes) + list(removed):
+            if not 0 < nr <= len(self.times) or not self.present[nr - 1]:
+                raise ValueError(f"there is no dwarf number {nr} to change")
+        if removed & set(changes):
+            raise ValueError(f"dwarf number {min(removed & set(changes))} is both changed and removed")
+        new_times = list(changes.values()) + list(added)
+        typecode = "d" if self.times.typecode == "d" else time_typecode(new_times)
+        new_times = array(typecode, new_times)  # A time that is not a number fails here, before anything changes
+        self.check_can_cross(sum(self.present) - len(removed) + len(added))
+        if typecode != self.times.typecode:
+            self.use_floats()
+        old_times = [self.times[nr - 1] for nr in list(changes) + sorted(removed)]
+        for nr, crossing_time in zip(changes, new_times):
+            self.times[nr - 1] = crossing_time
+        for nr in removed:
+            self.present[nr - 1] = 0
+        self.times.extend(new_times[len(changes):])
+        self.present.extend([1] * len(added))
+        if not self.solved:
+            return self.solve()
+        first_moves = [self.first_move(nr) for nr in list(changes) + sorted(removed)]
+        crossing_nr = self.first_affected(old_times, first_moves, new_times, len(removed))
+        self.repair(crossing_nr)
+        return self.total_time, self.scheme
+
+    def use_floats(self):
+        """Keeps the crossing times, and the times recorded for the moves, as floats from now on."""
+        self.times = array("d", self.times)
+        self.scheme.crossing_times = self.times
+        self.records = [array("d", values) for values in self.records]
+        self.cross_losses = array("d", self.cross_losses)
+        self.return_times = array("d", self.return_times)
+
+    def first_move(self, nr):
+        """Returns the number of the crossing where the dwarf first moves, or the number of crossings if it
+           doesn't move."""
+        import numpy as np
+        dwarf_nrs = np.frombuffer(self.scheme.dwarf_nrs, dtype=np.int32).reshape(len(self.scheme), self.max_together)
+        moves = np.flatnonzero((dwarf_nrs == nr).any(axis=1))
+        return int(moves[0]) // 2 if len(moves) else len(self.records[0])
+
+    def first_affected(self, old_times, first_moves, new_times, removed_count):
+        """Returns the number of the first crossing that the changes can affect, from the crossing times the dwarfs
+           had before and the crossing where each of them first moved, the crossing times of the dwarfs with new
+           times and the new dwarfs, and the number of dwarfs that left."""
+        import numpy as np
+        fastest, fast_last, lost, group_first, group_last, at_start = [as_numpy(values) for values in self.records]
+        in_play = np.frombuffer(self.present, dtype=np.uint8).astype(bool)
+        roster = np.sort(as_numpy(self.times)[in_play])
+        crossing_nr = len(at_start)
+        few = np.flatnonzero(at_start <= self.max_together + 1 + removed_count)
+        if len(few):
+            crossing_nr = int(few[0])  # The last groups at start depend on the number of dwarfs there
+
+        def first(affected):
+            found = np.flatnonzero(affected[:crossing_nr])
+            return int(found[0]) if len(found) else crossing_nr
+
+        inside = group_first != NOT_SEEN
+        for crossing_time in new_times:
+            low, high = np.searchsorted(roster, crossing_time, "left"), np.searchsorted(roster, crossing_time, "right")
+            closest = 0 if high - low > 1 else FAR  # Time to the closest other dwarf
+            if high - low == 1 and low > 0:
+                closest = crossing_time - roster[low - 1].item()
+            if high - low == 1 and high < len(roster):
+                closest = min(closest, roster[high].item() - crossing_time)
+            crossing_nr = first((crossing_time <= fastest) | (crossing_time <= fast_last) |
+                                (inside & (group_first <= crossing_time) & (crossing_time <= group_last)) |
+                                (inside & (closest < lost)) |
+                                (inside & (closest == lost) & (crossing_time - lost <= group_first)))
+        for crossing_time, first_move in zip(old_times, first_moves):
+            crossing_nr = min(crossing_nr, first_move)
+            below, above = np.searchsorted(roster, crossing_time, "right"), np.searchsorted(roster, crossing_time)
+            if below == 0 or above == len(roster):
+                gap, following = FAR, FAR
+            else:
+                gap, following = (roster[above] - roster[below - 1]).item(), roster[above].item()
+            crossing_nr = first((crossing_time <= fastest) |
+                                (inside & (group_first <= crossing_time) & (crossing_time <= group_last)) |
+                                (inside & (gap < lost)) |
+                                (inside & (gap == lost) & (following - lost <= group_first)))
+        return crossing_nr
+
+    def check_can_cross(self, num_of_dwarfs):
+        """Raises a DwarfCrossingError if the given number of dwarfs can't all get across."""
+        if not can_cross(num_of_dwarfs, self.max_crossings, self.max_together):
+            raise DwarfCrossingError(1, dwarf.FINISH, "there is no dwarf that can walk back with the lantern")
+
+    def repair(self, crossing_nr):
+        """Keeps the moves before the crossing, and solves the rest with the greedy algorithm."""
+        self.check_can_cross(sum(self.present))
+        t_start = time.time()
+        self.repaired_from = 2 * crossing_nr
+        self.scheme = self.scheme[:2 * crossing_nr]
+        self.records = [values[:crossing_nr] for values in self.records]
+        self.cross_losses = self.cross_losses[:crossing_nr]
+        self.return_times = self.return_times[:crossing_nr]
+        solver = RepairSolver(self.times, self.present, self.max_crossings, self.max_together, self.scheme,
+                              self.records, self.cross_losses, self.return_times)
+        self.total_time, _ = solver.solve()
+        self.execution_time = time.time() - t_start
+
+
+def main():
+    """Solves a problem, makes a few of the slowest dwarfs slower, and compares the time it takes to repair the
+       scheme with the time to solve the changed problem from the start."""
+    import random
+    crossing_times = list(range(1, NUMBER_OF_DWARFS + 1))
+    incremental = IncrementalGreedySolver(crossing_times, MAX_CROSSINGS, MAX_TOGETHER)
+    total_time, _ = incremental.solve()
+    print(f"Total time for all dwarfs crossing the bridge: {total_time}, solved in {incremental.execution_time:.2f} s")
+    slowest = random.Random(0).sample(range(NUMBER_OF_DWARFS * 99 // 100, NUMBER_OF_DWARFS + 1), NUMBER_OF_CHANGES)
+    changes = {nr: NUMBER_OF_DWARFS + place + 1 for place, nr in enumerate(slowest)}
+    total_time, scheme = incremental.update(changes)
+    print(f"Total time after {len(changes)} changes: {total_time}, repaired from move {incremental.repaired_from} "
+          f"of {len(scheme)} in {incremental.execution_time:.2f} s")
+    crossing_times = [incremental.times[nr - 1] for nr in incremental.dwarf_numbers()]
+    solver = ArrayGreedySolver(NUMBER_OF_DWARFS, MAX_CROSSINGS, dwarf.START, MAX_TOGETHER, crossing_times,
+                               scheme=CompactScheme(MAX_TOGETHER, crossing_times))
+    total_time, _ = solver.solve()
+    print(f"Total time solved from the start: {total_time}, in {solver.execution_time:.2f} s")
+
+
+if __name__ == '__main__':
+    main()
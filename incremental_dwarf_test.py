@@ -0,0 +1,95 @@
+import unittest
+import dwarf
+from dwarf_errors import DwarfCrossingError
+from greedy_min_dwarf import GreedySolver
+from incremental_dwarf import IncrementalGreedySolver
+import random
+
+
+def solve_again(solver):
+    """Returns the total time and the scheme from GreedySolver for the dwarfs taking part, with their numbers."""
+    numbers = solver.dwarf_numbers()
+    crossing_times = [solver.times[nr - 1] for nr in numbers]
+    total_time, scheme = GreedySolver(len(numbers), solver.max_crossings, dwarf.START, solver.max_together,
+                                      crossing_times).solve()
+    return total_time, [[numbers[nr - 1] for nr in move[:-1]] + [move[-1]] for move in scheme]
+
+
+class IncrementalGreedySolverTests(unittest.TestCase):
+
+    def test_solve(self):
+        solver = IncrementalGreedySolver(list(range(1, 301)))
+        total_time, scheme = solver.solve()
+        self.assertEqual(89551, total_time)
+        self.assertEqual(solve_again(solver), (total_time, scheme.to_list()))
+
+    def test_slow_changes(self):
+        solver = IncrementalGreedySolver(list(range(1, 301)))
+        _, scheme = solver.solve()
+        moves = len(scheme)
+        total_time, scheme = solver.update({295: 400, 298: 401})
+        self.assertEqual(solve_again(solver), (total_time, scheme.to_list()))
+        self.assertGreater(solver.repaired_from, moves * 9 // 10)
+
+    def test_added_and_removed(self):
+        solver = IncrementalGreedySolver([5, 1, 9, 9, 2, 7])
+        solver.solve()
+        total_time, scheme = solver.update({3: 4}, added=[3, 8], removed=[2])
+        self.assertEqual([1, 3, 4, 5, 6, 7, 8], solver.dwarf_numbers())
+        self.assertEqual(solve_again(solver), (total_time, scheme.to_list()))
+        self.assertNotIn(2, [nr for move in scheme for nr in move[:-1]])
+
+    def test_random_updates(self):
+        rng = random.Random(3)
+        for _ in range(150):
+            max_together, max_crossings = rng.choice([2, 2, 3, 4]), rng.choice([3, 3, 5, 7])
+            highest = rng.choice([5, 20, 100])
+            solver = IncrementalGreedySolver([rng.randint(1, highest) for _ in range(rng.randint(2, 60))],
+                                             max_crossings, max_together)
+            solver.solve()
+            for _ in range(4):
+                numbers = solver.dwarf_numbers()
+                changes = {nr: rng.randint(1, highest) for nr in rng.sample(numbers, rng.randint(0, 2))}
+                others = [nr for nr in numbers if nr not in changes]
+                removed = rng.sample(others, rng.randint(0, 1)) if len(others) > 3 else []
+                added = [rng.randint(1, highest) for _ in range(rng.randint(0, 2))]
+                total_time, scheme = solver.update(changes, added, removed)
+                self.assertEqual(solve_again(solver), (total_time, scheme.to_list()))
+
+    def test_float_times(self):
+        solver = IncrementalGreedySolver([5, 1, 9, 9, 2, 7, 3, 8])
+        solver.solve()
+        total_time, scheme = solver.update({7: 2.5}, added=[6.25])
+        self.assertEqual("d", solver.times.typecode)
+        self.assertEqual(solve_again(solver), (total_time, scheme.to_list()))
+        total_time, scheme = solver.update({2: 1.75, 4: 9})
+        self.assertEqual(solve_again(solver), (total_time, scheme.to_list()))
+        solver = IncrementalGreedySolver([1.5, 2.25, 3.0, 7.75, 8.5, 2.5])
+        total_time, scheme = solver.solve()
+        self.assertEqual(solve_again(solver), (total_time, scheme.to_list()))
+
+    def test_errors(self):
+        solver = IncrementalGreedySolver([1, 2, 3])
+        solver.solve()
+        self.assertRaises(ValueError, solver.update, {4: 1})
+        self.assertRaises(ValueError, solver.update, {1: 5}, removed=[1])
+        before = solver.total_time, solver.scheme.to_list()
+        self.assertRaises(TypeError, solver.update, {1: 5, 2: "x"})
+        self.assertRaises(TypeError, solver.update, {1: 2.5}, added=[None])
+        self.assertRaises(ValueError, solver.update, {1: 2 ** 70})
+        self.assertEqual(([1, 2, 3], "q"), (list(solver.times), solver.times.typecode))
+        total_time, scheme = solver.update({})
+        self.assertEqual(before, (total_time, scheme.to_list()))
+        self.assertRaises(DwarfCrossingError, IncrementalGreedySolver([1, 2, 3], 1).solve)
+
+    def test_all_at_once(self):
+        solver = IncrementalGreedySolver([1, 2], 1, 2)
+        self.assertEqual((2, [[1, 2, "cross"]]), (solver.solve()[0], solver.scheme.to_list()))
+        self.assertRaises(DwarfCrossingError, solver.update, {1: 4}, added=[3])
+        self.assertEqual(([1, 2], [1, 2]), (solver.dwarf_numbers(), list(solver.times)))
+        total_time, scheme = solver.update({1: 4})
+        self.assertEqual((4, [[2, 1, "cross"]]), (total_time, scheme.to_list()))
+
+
+if __name__ == '__main__':
+    unittest.main()
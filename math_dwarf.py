@@ -0,0 +1,37 @@
+"""
+The Math for the Dwarf Bridge Crossing Problem.
+
+For the problem as it is originally stated, with crossing times 1, 2, 3, ..., n minutes, at most two dwarfs on
+the bridge and at most three crossings per dwarf, the greedy algorithm follows a pattern that repeats itself,
+as shown in the README. The total time can therefore be found directly, without moving any dwarfs.
+
+For an even number of dwarfs:
+  * The return times are 1 + 2 + 3 + ... + (n - 2) = (n - 2) * (n - 1) / 2
+  * The crossing times are 2 + 2 + 4 + 4 + ... + (n - 2) + (n - 2) + n = (n - 2) * n / 2 + n
+
+Together that is (n - 2) * (2n - 1) / 2 + n. For an odd number of dwarfs the slowest dwarf has no one of its own
+speed to cross with, and the total is half a minute more than the same expression gives. Both cases are covered
+by rounding (n - 2) * (2n - 1) / 2 up, and adding n, which also holds for one dwarf alone.
+"""
+import sys
+
+
+NUMBER_OF_DWARFS = 300
+
+
+def math_min_crossing(num_of_dwarfs):
+    """Returns the total time for all dwarfs to cross the bridge, when the crossing times are 1, 2, 3, ... minutes,
+       at most two dwarfs can cross together, and no dwarf crosses more than three times. The same total as
+       greedy_min_crossing gives, for any number of dwarfs."""
+    if num_of_dwarfs == 0:
+        return 0
+    return -(-(num_of_dwarfs - 2) * (2 * num_of_dwarfs - 1) // 2) + num_of_dwarfs
+
+
+def main(num_of_dwarfs=NUMBER_OF_DWARFS):
+    """Starts the execution and presents the result."""
+    print(f"Total time for all dwarfs crossing the bridge: {math_min_crossing(num_of_dwarfs)}")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else NUMBER_OF_DWARFS)
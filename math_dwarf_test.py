@@ -0,0 +1,25 @@
+import unittest
+import dwarf
+from greedy_min_dwarf import GreedySolver
+from math_dwarf import math_min_crossing
+
+
+class MathMinCrossingTests(unittest.TestCase):
+
+    def test_same_as_greedy(self):
+        for num_of_dwarfs in range(0, 201):
+            total_time, _ = GreedySolver(num_of_dwarfs, 3, dwarf.START, 2).solve()
+            self.assertEqual(total_time, math_min_crossing(num_of_dwarfs), num_of_dwarfs)
+
+    def test_readme(self):
+        self.assertEqual(44551 + 45000, math_min_crossing(300))
+
+    def test_millions(self):
+        num_of_dwarfs = 10 ** 7
+        returns = (num_of_dwarfs - 2) * (num_of_dwarfs - 1) // 2
+        crossings = (num_of_dwarfs - 2) * num_of_dwarfs // 2 + num_of_dwarfs
+        self.assertEqual(returns + crossings, math_min_crossing(num_of_dwarfs))
+
+
+if __name__ == '__main__':
+    unittest.main()
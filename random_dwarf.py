@@ -1,9 +1,16 @@
 from dwarf import Dwarf
+from dwarf_errors import DwarfStartingPositionError
+from dwarf_scheme import CompactScheme
 import dwarf
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import hashlib
+import json
+import numbers
+import os
 import random
 import copy
-import matplotlib.pyplot as plt
-import numpy as np
+import threading
+import sys
 import time
 
 
@@ -11,62 +18,493 @@ NUMBER_OF_TRIES = 1000
 NUMBER_OF_DWARFS = 300
 MAX_CROSSINGS = 3
 MAX_TOGETHER = 2
+BATCH_SIZE = 1000
+REPETITIONS = 25
+CHECKPOINT_EVERY = 60  # Seconds between the checkpoints of a random search
+PRUNE_BUCKET = 100  # Moves in each bar of the histogram of how far the pruned tries got
 
 
-def random_crossing(tries, num_of_dwarfs, max_crossings, start_pos, max_together):
-    dwarfs = []
-    for dwarf_nr in range(1, num_of_dwarfs+1):
-        dwarfs.append(Dwarf(dwarf_nr, dwarf_nr, 0, max_crossings, start_pos))
+class RandomSearch:
+    """Keeps a random search going for as long as it is allowed to, and can be asked for its best try at any moment,
+       also from another thread while it is running. The tries are the same as in random_crossing, made from the
+       same seeds, so a search that has made a number of tries has the same result as random_crossing would have
+       with that number of tries."""
 
-    best_times = []
-    best_scheme = []
-    for try_nr in range(1, tries + 1):
-        scheme = []
-        total_time = 0
-        dwarfs_at_start = copy.deepcopy(dwarfs)  # List of dwarfs at start position
-        dwarfs_at_finish = []                    # List of dwarfs at finish with crossings left
-        dwarfs_done = []                         # List of dwarfs at finish with no crossings left
-        while len(dwarfs_at_start) > 0:        # Keep going until there are no more dwarfs at start to cross the bridge
-            crossing_time = 0
-            crossing_dwarfs = []
-            for _ in range(min(max_together, len(dwarfs_at_start))):
-                crossing_dwarf = dwarfs_at_start.pop(random.randint(0, len(dwarfs_at_start) - 1))
-                crossing_time = crossing_dwarf & crossing_time
-                crossing_dwarf.cross()
-                crossing_dwarfs.append(crossing_dwarf.dwarf_nr)
-                if crossing_dwarf.done():
-                    dwarfs_done.append(crossing_dwarf)
-                else:
-                    dwarfs_at_finish.append(crossing_dwarf)
-            total_time += crossing_time
-            if crossing_dwarfs:
+    def __init__(self, num_of_dwarfs, max_crossings, start_pos, max_together, prune=False, record_seeds=False,
+                 seed=None):
+        """Sets up a search that hasn't made any tries yet. See random_crossing for prune, record_seeds and seed."""
+        self.num_of_dwarfs = num_of_dwarfs
+        self.max_crossings = max_crossings
+        self.start_pos = start_pos
+        self.max_together = max_together
+        self.prune = prune
+        self.record_seeds = record_seeds
+        self.root = root_seed(seed)
+        self.dwarfs = [Dwarf(dwarf_nr, dwarf_nr, 0, max_crossings, start_pos)
+                       for dwarf_nr in range(1, num_of_dwarfs + 1)]
+        self.tries = 0
+        self.best_times = []
+        self.best_scheme = []
+        self.pruned = no_pruned()
+        self.stopped = False
+        self.lock = threading.Lock()
+
+    def step(self):
+        """Makes one more try, and returns its total time, or None if the try was given up."""
+        try_nr = self.tries + 1
+        best_time = self.best_times[-1][1] if self.prune and self.best_times else None
+        try_seed = child_seed(self.root, try_nr)
+        scheme = None if self.record_seeds else []
+        total_time, moves_made = random_try(copy.deepcopy(self.dwarfs), self.max_together,
+                                            random.Random(try_seed).randint, scheme, best_time)
+        with self.lock:
+            self.tries = try_nr
+            if total_time is None:
+                add_pruned(self.pruned, moves_made)
+            elif self.best_times == [] or total_time < self.best_times[-1][1]:
+                self.best_times.append([try_nr, total_time, try_seed])
+                self.best_scheme = scheme
+        return total_time
+
+    def run(self, tries=None, time_budget=None, target_time=None, checkpoint_path=None,
+            checkpoint_every=CHECKPOINT_EVERY, sink=None):
+        """Makes tries until the given number of tries are made, the time budget in seconds has run out, a try with
+           target_time or better is found, or stop is called, whichever comes first. Without any of them the search
+           keeps going until it is stopped. Returns the best result so far, as best does.
+           With a checkpoint path, the search is saved there every checkpoint_every seconds and when it stops."""
+        deadline = None if time_budget is None else time.monotonic() + time_budget
+        next_checkpoint = time.monotonic() + checkpoint_every
+        made = 0
+        self.stopped = False
+        while not self.stopped and (tries is None or made < tries) and \
+                (deadline is None or time.monotonic() < deadline) and \
+                (target_time is None or self.best_times == [] or self.best_times[-1][1] > target_time):
+            self.step()
+            made += 1
+            if checkpoint_path and time.monotonic() >= next_checkpoint:
+                self.checkpoint(checkpoint_path)
+                next_checkpoint = time.monotonic() + checkpoint_every
+        if checkpoint_path:
+            self.checkpoint(checkpoint_path)
+        return self.best(sink)
+
+    def checkpoint(self, path):
+        """Saves the search to a JSON file, so it can be resumed if the process dies. The random state of the search
+           is its root seed and the number of tries made, since every try has a seed derived from them, and the best
+           scheme is not saved since it can be rebuilt from the seed of the best try. The file is replaced in one
+           step, so a process that dies while saving leaves the previous checkpoint in place."""
+        with self.lock:
+            state = {"num_of_dwarfs": self.num_of_dwarfs, "max_crossings": self.max_crossings,
+                     "start_pos": self.start_pos, "max_together": self.max_together, "prune": self.prune,
+                     "record_seeds": self.record_seeds, "root": [self.root[0], list(self.root[1])],
+                     "tries": self.tries, "best_times": self.best_times, "pruned": self.pruned}
+        with open(f"{path}.tmp", "w") as file:
+            json.dump(state, file, separators=(",", ":"))
+        os.replace(f"{path}.tmp", path)
+
+    @classmethod
+    def resume(cls, path):
+        """Returns the search saved in the checkpoint file, ready to continue with the try after the last one made."""
+        with open(path) as file:
+            state = json.load(file)
+        entropy, spawn_key = state["root"]
+        search = cls(state["num_of_dwarfs"], state["max_crossings"], state["start_pos"], state["max_together"],
+                     state["prune"], state["record_seeds"])
+        search.root = (entropy, tuple(spawn_key))
+        search.tries = state["tries"]
+        search.best_times = state["best_times"]
+        search.best_scheme = None
+        search.pruned = state["pruned"]
+        return search
+
+    def stop(self):
+        """Makes a running search stop after the try it is making."""
+        self.stopped = True
+
+    def best(self, sink=None):
+        """Returns the improvements so far and the scheme of the best try so far. When only seeds are recorded, or
+           the search is resumed, the scheme is rebuilt from the seed of the best try, once for every new best try.
+           With a sink, e.g. a scheme writer, the best try is replayed into the sink, which is returned in place of
+           the scheme."""
+        with self.lock:
+            best_times = [list(improvement) for improvement in self.best_times]
+            best_scheme = self.best_scheme
+        if sink is not None:
+            if best_times:
+                replay_random_try(best_times[-1][2], self.num_of_dwarfs, self.max_crossings, self.start_pos,
+                                  self.max_together, sink)
+            return best_times, sink
+        if best_times and best_scheme is None:
+            best_scheme = replay_random_try(best_times[-1][2], self.num_of_dwarfs, self.max_crossings,
+                                            self.start_pos, self.max_together)[1]
+            with self.lock:
+                if self.best_times and self.best_times[-1][2] == best_times[-1][2]:
+                    self.best_scheme = best_scheme
+        return best_times, best_scheme
+
+
+def random_crossing(tries, num_of_dwarfs, max_crossings, start_pos, max_together, prune=False, record_seeds=False,
+                    seed=None, time_budget=None, target_time=None, checkpoint_path=None, compact=False, sink=None,
+                    pruned=None):
+    """Lets the dwarfs cross the bridge in random order the given number of tries, and returns every improvement
+       as [try_nr, total_time, seed] together with the scheme of the best try.
+       Every try is made from a seed of its own, derived from the root seed given as an integer or as a
+       numpy.random.SeedSequence. The same root seed always gives the same result, and replay_random_try makes
+       a try again from its seed.
+       With prune set a try is given up as soon as it can't beat the best try anymore. If a dict is given as
+       pruned, the number of tries given up and a histogram of the moves they made, as no_pruned describes, are
+       stored in it. With the 300 dwarfs of main the tries are given up late, when most of their moves are made,
+       so pruning doesn't make that search any faster.
+       With record_seeds set no scheme is kept for the tries, and only the scheme of the best try is rebuilt at
+       the end by replaying its seed.
+       The search stops early if the time budget in seconds runs out, or if a try with target_time or better is
+       found. Pass tries=None to only stop on those. Use RandomSearch to ask for the best try while searching.
+       With a checkpoint path the search is saved there now and then, and can be continued with
+       resume_random_crossing. With compact set the best scheme is returned as a CompactScheme.
+       With a sink, e.g. a scheme writer, no scheme is kept for the tries, as with record_seeds, and the best try
+       is replayed into the sink at the end, which is returned in place of the scheme."""
+    search = RandomSearch(num_of_dwarfs, max_crossings, start_pos, max_together, prune,
+                          record_seeds or sink is not None, seed)
+    best_times, best_scheme = search.run(tries, time_budget, target_time, checkpoint_path, sink=sink)
+    if compact and sink is None:
+        best_scheme = CompactScheme.from_list(best_scheme or [], max_together)
+    if pruned is not None:
+        pruned.update(search.pruned)
+    return best_times, best_scheme
+
+
+def resume_random_crossing(checkpoint_path, tries, time_budget=None, target_time=None, pruned=None):
+    """Continues the search saved in the checkpoint file until it has made the given number of tries in total, or
+       until the time budget or target time stops it, and keeps saving it to the same file. Returns the same result
+       as random_crossing, as if the search had never been stopped, and fills pruned the same way."""
+    search = RandomSearch.resume(checkpoint_path)
+    best_times, best_scheme = search.run(None if tries is None else max(0, tries - search.tries), time_budget,
+                                         target_time, checkpoint_path)
+    if pruned is not None:
+        pruned.update(search.pruned)
+    return best_times, best_scheme
+
+
+def root_seed(seed):
+    """Returns the entropy and the spawn key of a root seed given as None, an integer or a
+       numpy.random.SeedSequence. Without a seed, fresh entropy is drawn from the operating system."""
+    if seed is None:
+        return random.SystemRandom().getrandbits(128), ()
+    if isinstance(seed, numbers.Integral):
+        return int(seed), ()
+    return seed.entropy, tuple(seed.spawn_key)
+
+
+def child_seed(root, *key):
+    """Returns the integer seed of the stream with the given key under the root seed. The same root and key always
+       give the same seed, while different keys give independent streams."""
+    digest = hashlib.blake2b(repr((root, key)).encode(), digest_size=16).digest()
+    return int.from_bytes(digest, "little")
+
+
+def random_try(dwarfs_at_start, max_together, randint, scheme=None, best_time=None):
+    """Lets the dwarfs, all at start, cross the bridge in random order, picking the dwarfs with randint, and returns
+       the total time and the number of moves made. The moves are added to scheme, if a scheme is given.
+       If best_time is given the try is given up as soon as it can't beat it, and None is returned as total time."""
+    total_time = 0
+    moves_made = 0
+    time_at_start = sum(d.crossing_time for d in dwarfs_at_start)  # Sum of the crossing times of the dwarfs at start
+    dwarfs_at_finish = []                                          # List of dwarfs at finish with crossings left
+    while len(dwarfs_at_start) > 0:        # Keep going until there are no more dwarfs at start to cross the bridge
+        if best_time is not None and hopeless(total_time, time_at_start, best_time, max_together):
+            return None, moves_made
+        crossing_time = 0
+        crossing_dwarfs = []
+        for _ in range(min(max_together, len(dwarfs_at_start))):
+            crossing_dwarf = dwarfs_at_start.pop(randint(0, len(dwarfs_at_start) - 1))
+            crossing_time = crossing_dwarf & crossing_time
+            time_at_start -= crossing_dwarf.crossing_time
+            crossing_dwarf.cross()
+            crossing_dwarfs.append(crossing_dwarf.dwarf_nr)
+            if not crossing_dwarf.done():
+                dwarfs_at_finish.append(crossing_dwarf)
+        total_time += crossing_time
+        if crossing_dwarfs:
+            moves_made += 1
+            if scheme is not None:
                 crossing_dwarfs.append("cross")
                 scheme.append(crossing_dwarfs)
-            if dwarfs_at_finish and dwarfs_at_start:
-                returning_dwarf = dwarfs_at_finish.pop(random.randint(0, len(dwarfs_at_finish) - 1))
-                returning_dwarf.go_back()
-                dwarfs_at_start.append(returning_dwarf)
-                total_time += returning_dwarf.time_needed_for_crossing()
+        if dwarfs_at_finish and dwarfs_at_start:
+            returning_dwarf = dwarfs_at_finish.pop(randint(0, len(dwarfs_at_finish) - 1))
+            returning_dwarf.go_back()
+            dwarfs_at_start.append(returning_dwarf)
+            total_time += returning_dwarf.time_needed_for_crossing()
+            time_at_start += returning_dwarf.crossing_time
+            moves_made += 1
+            if scheme is not None:
                 scheme.append([returning_dwarf.dwarf_nr, "go back"])
-        if best_times == [] or total_time < best_times[-1][1]:
-            best_times.append([try_nr, total_time])
-            best_scheme = copy.deepcopy(scheme)
+    return total_time, moves_made
+
+
+def replay_random_try(seed, num_of_dwarfs, max_crossings, start_pos, max_together, scheme=None):
+    """Replays the try that was made with the seed, and returns its total time and scheme. The moves are added to
+       scheme, if a scheme is given, e.g. a scheme writer, and otherwise to a new list."""
+    dwarfs = [Dwarf(dwarf_nr, dwarf_nr, 0, max_crossings, start_pos) for dwarf_nr in range(1, num_of_dwarfs + 1)]
+    scheme = [] if scheme is None else scheme
+    total_time, _ = random_try(dwarfs, max_together, random.Random(seed).randint, scheme)
+    return total_time, scheme
+
+
+def hopeless(total_time, time_at_start, best_time, max_together):
+    """Returns True if a try that has used total_time so far can't beat best_time. Every dwarf at start has to
+       cross the bridge at least once more, and a crossing takes at least the average crossing time of the dwarfs
+       walking together, so the rest of the try takes at least time_at_start / max_together."""
+    return total_time * max_together + time_at_start >= best_time * max_together
+
+
+def no_pruned():
+    """Returns the summary of the pruned tries before any try is given up: the number of tries given up, and a
+       histogram of the moves they made before they were given up, where depths[i] counts the tries given up
+       after i * PRUNE_BUCKET up to (i + 1) * PRUNE_BUCKET - 1 moves. Its size doesn't grow with the tries."""
+    return {"count": 0, "depths": []}
+
+
+def add_pruned(pruned, moves_made, tries=1):
+    """Adds the given number of tries, given up after moves_made moves, to the summary of the pruned tries."""
+    bucket = moves_made // PRUNE_BUCKET
+    depths = pruned["depths"]
+    depths.extend([0] * (bucket + 1 - len(depths)))
+    depths[bucket] += tries
+    pruned["count"] += tries
+
+
+def improvements(totals, best_time):
+    """Returns a boolean array telling which of the totals, taken in order, beat every earlier total and the
+       best time found before them."""
+    import numpy as np
+    previous = np.empty_like(totals)
+    previous[0] = np.iinfo(totals.dtype).max if best_time is None else best_time
+    previous[1:] = np.minimum.accumulate(totals)[:-1]
+    return totals < np.minimum(previous, previous[0])
+
+
+def run_batch(rng, size, crossing_times, max_crossings, max_together, best_time=None, record_moves=True):
+    """Simulates a batch of random tries side by side, one try per row, and returns the total time of every try
+       together with the moves made in each step. The dwarfs at start and at finish are kept as id arrays where
+       a randomly picked dwarf is replaced by the last one in the row, so every pick costs the same.
+       If best_time is given, tries that can't beat it are given up. Their total time is returned as the largest
+       possible time, and the number of moves they made are returned in an array that is -1 for the other tries.
+       Without record_moves no moves are kept, and None is returned in their place."""
+    import numpy as np
+    num_of_dwarfs = len(crossing_times) - 1
+    rows = np.arange(size)
+    at_start = np.tile(np.arange(1, num_of_dwarfs + 1, dtype=np.int32), (size, 1))
+    start_count = np.full(size, num_of_dwarfs)
+    at_finish = np.zeros((size, num_of_dwarfs), dtype=np.int32)  # Dwarfs at finish with crossings left
+    finish_count = np.zeros(size, dtype=np.int64)
+    crossings = np.zeros((size, num_of_dwarfs + 1), dtype=np.int32)
+    totals = np.zeros(size, dtype=np.int64)
+    time_at_start = np.full(size, crossing_times.sum())
+    moves_made = np.zeros(size, dtype=np.int64)
+    depths = np.full(size, -1)
+    moves = [] if record_moves else None
+    while start_count.any():  # Keep going until no try has any dwarfs left at start
+        if best_time is not None:
+            given_up = (start_count > 0) & hopeless(totals, time_at_start, best_time, max_together)
+            depths[given_up] = moves_made[given_up]
+            start_count[given_up] = 0
+        crossing_dwarfs = np.zeros((size, max_together), dtype=np.int32)
+        for seat in range(max_together):
+            picking = rows[start_count > 0]
+            index = (rng.random(len(picking)) * start_count[picking]).astype(np.int64)
+            crossing_dwarf = at_start[picking, index]
+            start_count[picking] -= 1
+            at_start[picking, index] = at_start[picking, start_count[picking]]
+            crossing_dwarfs[picking, seat] = crossing_dwarf
+            crossings[picking, crossing_dwarf] += 1
+            time_at_start[picking] -= crossing_times[crossing_dwarf]
+            not_done = crossings[picking, crossing_dwarf] < max_crossings
+            picking, crossing_dwarf = picking[not_done], crossing_dwarf[not_done]
+            at_finish[picking, finish_count[picking]] = crossing_dwarf
+            finish_count[picking] += 1
+        totals += crossing_times[crossing_dwarfs].max(axis=1)
+        moves_made[crossing_dwarfs[:, 0] > 0] += 1
+        returning_dwarfs = np.zeros(size, dtype=np.int32)
+        returning = rows[(finish_count > 0) & (start_count > 0)]
+        index = (rng.random(len(returning)) * finish_count[returning]).astype(np.int64)
+        returning_dwarf = at_finish[returning, index]
+        finish_count[returning] -= 1
+        at_finish[returning, index] = at_finish[returning, finish_count[returning]]
+        crossings[returning, returning_dwarf] += 1
+        at_start[returning, start_count[returning]] = returning_dwarf
+        start_count[returning] += 1
+        totals[returning] += crossing_times[returning_dwarf]
+        time_at_start[returning] += crossing_times[returning_dwarf]
+        moves_made[returning] += 1
+        returning_dwarfs[returning] = returning_dwarf
+        if record_moves:
+            moves.append((crossing_dwarfs, returning_dwarfs))
+    totals[depths >= 0] = np.iinfo(totals.dtype).max
+    return totals, moves, depths
+
+
+def batch_scheme(moves, row):
+    """Returns the scheme of one try in a batch, in the same format as the schemes from random_crossing."""
+    scheme = []
+    for crossing_dwarfs, returning_dwarfs in moves:
+        crossing = [int(dwarf_nr) for dwarf_nr in crossing_dwarfs[row] if dwarf_nr]
+        if crossing:
+            crossing.append("cross")
+            scheme.append(crossing)
+        if returning_dwarfs[row]:
+            scheme.append([int(returning_dwarfs[row]), "go back"])
+    return scheme
+
+
+def random_crossing_batch(tries, num_of_dwarfs, max_crossings, start_pos, max_together, batch_size=BATCH_SIZE,
+                          prune=False, record_seeds=False, seed=None, pruned=None):
+    """Does the same random search as random_crossing, but simulates batch_size tries at a time as NumPy arrays
+       instead of moving Dwarf objects around. Returns the improvements and the best scheme found, in the same
+       format as random_crossing. With prune set, the tries given up are summarized in pruned, just as
+       random_crossing does. The tries of a batch are given up against the best time from the earlier batches.
+       Every batch is made from a seed of its own, derived from the root seed. In place of the seed of a try, an
+       improvement has [batch seed, batch size, best time, row] for the try, which replay_batch_try replays.
+       With record_seeds set no moves are kept, and the best scheme is rebuilt at the end by replaying the batch
+       it came from."""
+    import numpy as np
+    if start_pos != dwarf.START:
+        reason = f"the batch engine only moves dwarfs that start at {dwarf.START}"
+        raise DwarfStartingPositionError(1, start_pos, reason)
+    root = root_seed(seed)
+    crossing_times = np.arange(num_of_dwarfs + 1)  # Index 0 is the crossing time of an empty seat
+    best_times = []
+    best_scheme = []
+    best_batch = None
+    pruned = {} if pruned is None else pruned
+    pruned.update(no_pruned())
+    for batch_nr, first_try in enumerate(range(0, tries, batch_size)):
+        size = min(batch_size, tries - first_try)
+        best_time = best_times[-1][1] if prune and best_times else None
+        batch_seed = child_seed(root, batch_nr)
+        totals, moves, depths = run_batch(np.random.default_rng(batch_seed), size, crossing_times, max_crossings,
+                                          max_together, best_time, record_moves=not record_seeds)
+        for bucket, given_up in enumerate(np.bincount(depths[depths >= 0] // PRUNE_BUCKET)):
+            if given_up:
+                add_pruned(pruned, bucket * PRUNE_BUCKET, int(given_up))
+        improved = np.flatnonzero(improvements(totals, best_times[-1][1] if best_times else None))
+        for row in improved:
+            best_times.append([first_try + int(row) + 1, int(totals[row]), [batch_seed, size, best_time, int(row)]])
+        if len(improved) and record_seeds:
+            best_batch = best_times[-1][2]
+        elif len(improved):
+            best_scheme = batch_scheme(moves, improved[-1])
+    if best_batch:
+        best_scheme = replay_batch_try(best_batch, num_of_dwarfs, max_crossings, start_pos, max_together)[1]
+    return best_times, best_scheme
+
+
+def replay_batch_try(batch_try, num_of_dwarfs, max_crossings, start_pos, max_together):
+    """Replays the try recorded as [batch seed, batch size, best time, row] by random_crossing_batch, and returns
+       its total time and scheme. The whole batch is made again, since the random numbers a try gets depend on how
+       many tries in the batch have not been given up."""
+    import numpy as np
+    if start_pos != dwarf.START:
+        reason = f"the batch engine only moves dwarfs that start at {dwarf.START}"
+        raise DwarfStartingPositionError(1, start_pos, reason)
+    batch_seed, size, best_time, row = batch_try
+    totals, moves, _ = run_batch(np.random.default_rng(batch_seed), size, np.arange(num_of_dwarfs + 1),
+                                 max_crossings, max_together, best_time)
+    return int(totals[row]), batch_scheme(moves, row)
+
+
+def search_chunk(first_try, tries, num_of_dwarfs, max_crossings, start_pos, max_together, seed):
+    """Runs one chunk of a random search, and returns its improvements numbered after the tries of the whole search
+       together with the best scheme found in the chunk. The tries keep their places in the batches of the chunk,
+       for replay_batch_try."""
+    times, scheme = random_crossing_batch(tries, num_of_dwarfs, max_crossings, start_pos, max_together, seed=seed)
+    return [[first_try + try_nr, total_time, batch_try] for try_nr, total_time, batch_try in times], scheme
+
+
+def merge_chunks(chunks):
+    """Merges the results from the chunks of one search, given in the order of their tries, into the improvements
+       and the best scheme of the whole search."""
+    best_times = []
+    best_scheme = []
+    for times, scheme in chunks:
+        improved = False
+        for improvement in times:
+            if best_times == [] or improvement[1] < best_times[-1][1]:
+                best_times.append(improvement)
+                improved = True
+        if improved:
+            best_scheme = scheme
     return best_times, best_scheme
 
 
-def main():
+def parallel_random_crossing(repetitions, tries, num_of_dwarfs, max_crossings, start_pos, max_together,
+                             workers=None, chunk_size=BATCH_SIZE, seed=None):
+    """Runs independent random searches, each of the given number of tries, spread over a pool of processes.
+       Every search is split in chunks of tries so that also a few long searches keep all the workers busy.
+       Every chunk is made from a child of the root seed, spawned from the repetition and the chunk, so the same
+       root seed gives the same results no matter how many workers there are.
+       Returns a list with the improvements and the best scheme of every search, as random_crossing_batch does,
+       so the try of every improvement can be made again with replay_batch_try."""
+    import numpy as np
+    workers = workers or os.cpu_count()
+    entropy, spawn_key = root_seed(seed)
+    chunks = [{} for _ in range(repetitions)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(search_chunk, first_try, min(chunk_size, tries - first_try), num_of_dwarfs,
+                                   max_crossings, start_pos, max_together,
+                                   np.random.SeedSequence(entropy, spawn_key=spawn_key + (repetition, chunk_nr))):
+                   (repetition, first_try)
+                   for repetition in range(repetitions)
+                   for chunk_nr, first_try in enumerate(range(0, tries, chunk_size))}
+        for future in as_completed(futures):
+            repetition, first_try = futures[future]
+            chunks[repetition][first_try] = future.result()
+    return [merge_chunks(search[first_try] for first_try in sorted(search)) for search in chunks]
+
+
+def save_curves(curves, path):
+    """Saves the improvement curves of the searches to a NumPy .npz file, with one array of [try_nr, total_time]
+       rows for each search, named arr_0, arr_1 and so on."""
+    import numpy as np
+    np.savez_compressed(path, *[np.array([improvement[:2] for improvement in times], dtype=np.int64).reshape(-1, 2)
+                                for times in curves])
+
+
+def plot_curves(curves, image_path=None):
+    """Plots the improvement curves of the searches. With an image path the plot is rendered straight to the image
+       file without any window or GUI backend, otherwise it is shown on the screen."""
+    if image_path:
+        from matplotlib.figure import Figure
+        figure = Figure()
+        axes = figure.add_subplot()
+    else:
+        import matplotlib.pyplot as plt
+        axes = plt.gca()
+    for times in curves:
+        axes.plot([improvement[0] for improvement in times], [improvement[1] for improvement in times])
+    if image_path:
+        figure.savefig(image_path)
+    else:
+        plt.show()
+
+
+def main(output=None):
+    """Runs the random searches and presents the results. The improvement curves are plotted on the screen, or
+       without a screen they are saved to the output file: a .npz file gets the curves, any other file an image."""
     t1 = time.time()
-    for _ in range(25):
-        times, scheme = random_crossing(NUMBER_OF_TRIES, NUMBER_OF_DWARFS, MAX_CROSSINGS, dwarf.START, MAX_TOGETHER)
+    curves = []
+    for times, scheme in parallel_random_crossing(REPETITIONS, NUMBER_OF_TRIES, NUMBER_OF_DWARFS, MAX_CROSSINGS,
+                                                  dwarf.START, MAX_TOGETHER):
         print(times)
         print("=============================================\n")
         print(scheme)
         print()
-        t = np.array(times)
-        plt.plot(t[:, 0], t[:, 1])
+        curves.append(times)
     print(f"Time used for the program: {time.time() - t1:.3f} seconds\n")
-    plt.show()
+    if output and output.endswith(".npz"):
+        save_curves(curves, output)
+    else:
+        plot_curves(curves, output)
 
 
 if __name__ == '__main__':
-    main()
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,256 @@
+import unittest
+import dwarf
+import numpy as np
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import random_dwarf
+from verify_dwarf import verify_scheme
+
+
+NUMBER_OF_TRIES = 200
+NUMBER_OF_DWARFS = 30
+MAX_CROSSINGS = 3
+MAX_TOGETHER = 2
+
+
+def check_result(test, times, scheme, tries, max_together=MAX_TOGETHER):
+    """Checks that the improvements only get better and that the best scheme takes all dwarfs over in the best time."""
+    test.assertGreater(len(times), 0)
+    test.assertEqual(times[0][0], 1)
+    for previous, current in zip(times, times[1:]):
+        test.assertLess(previous[0], current[0])
+        test.assertGreater(previous[1], current[1])
+    test.assertLessEqual(times[-1][0], tries)
+    test.assertEqual((times[-1][1], []), verify_scheme(scheme, NUMBER_OF_DWARFS, MAX_CROSSINGS, max_together))
+
+
+class RandomCrossingBatchTests(unittest.TestCase):
+
+    def test_same_format_as_random_crossing(self):
+        times, scheme = random_dwarf.random_crossing(NUMBER_OF_TRIES, NUMBER_OF_DWARFS, MAX_CROSSINGS, dwarf.START,
+                                                     MAX_TOGETHER)
+        check_result(self, times, scheme, NUMBER_OF_TRIES)
+
+    def test_batch(self):
+        times, scheme = random_dwarf.random_crossing_batch(NUMBER_OF_TRIES, NUMBER_OF_DWARFS, MAX_CROSSINGS,
+                                                           dwarf.START, MAX_TOGETHER, batch_size=64)
+        check_result(self, times, scheme, NUMBER_OF_TRIES)
+
+    def test_batch_three_together(self):
+        times, scheme = random_dwarf.random_crossing_batch(NUMBER_OF_TRIES, NUMBER_OF_DWARFS, MAX_CROSSINGS,
+                                                           dwarf.START, 3)
+        check_result(self, times, scheme, NUMBER_OF_TRIES, 3)
+
+    def test_prune(self):
+        pruned = {}
+        times, scheme = random_dwarf.random_crossing(NUMBER_OF_TRIES, NUMBER_OF_DWARFS, MAX_CROSSINGS, dwarf.START,
+                                                     MAX_TOGETHER, prune=True, pruned=pruned)
+        check_result(self, times, scheme, NUMBER_OF_TRIES)
+        self.check_pruned(times, pruned)
+
+    def test_batch_prune(self):
+        pruned = {}
+        times, scheme = random_dwarf.random_crossing_batch(NUMBER_OF_TRIES, NUMBER_OF_DWARFS, MAX_CROSSINGS,
+                                                           dwarf.START, MAX_TOGETHER, batch_size=20, prune=True,
+                                                           pruned=pruned)
+        check_result(self, times, scheme, NUMBER_OF_TRIES)
+        self.check_pruned(times, pruned)
+
+    def check_pruned(self, times, pruned):
+        self.assertGreater(pruned["count"], 0)
+        self.assertLessEqual(pruned["count"], NUMBER_OF_TRIES - len(times))
+        self.assertEqual(pruned["count"], sum(pruned["depths"]))
+        self.assertLessEqual(len(pruned["depths"]), 4 * NUMBER_OF_DWARFS // random_dwarf.PRUNE_BUCKET + 1)
+        self.assertGreater(pruned["depths"][-1], 0)
+
+    def test_add_pruned(self):
+        pruned = random_dwarf.no_pruned()
+        random_dwarf.add_pruned(pruned, 250)
+        random_dwarf.add_pruned(pruned, 20, 3)
+        random_dwarf.add_pruned(pruned, 299)
+        self.assertEqual({"count": 5, "depths": [3, 0, 2]}, pruned)
+
+    def test_hopeless(self):
+        self.assertTrue(random_dwarf.hopeless(90, 20, 100, 2))
+        self.assertFalse(random_dwarf.hopeless(89, 20, 100, 2))
+
+    def test_record_seeds(self):
+        times, scheme = random_dwarf.random_crossing(NUMBER_OF_TRIES, NUMBER_OF_DWARFS, MAX_CROSSINGS, dwarf.START,
+                                                     MAX_TOGETHER, record_seeds=True)
+        check_result(self, times, scheme, NUMBER_OF_TRIES)
+        for try_nr, total_time, seed in times:
+            self.assertEqual(random_dwarf.replay_random_try(seed, NUMBER_OF_DWARFS, MAX_CROSSINGS, dwarf.START,
+                                                            MAX_TOGETHER)[0], total_time)
+
+    def test_batch_record_seeds(self):
+        times, scheme = random_dwarf.random_crossing_batch(NUMBER_OF_TRIES, NUMBER_OF_DWARFS, MAX_CROSSINGS,
+                                                           dwarf.START, MAX_TOGETHER, batch_size=20, prune=True,
+                                                           record_seeds=True)
+        check_result(self, times, scheme, NUMBER_OF_TRIES)
+        for try_nr, total_time, batch_try in times:
+            self.assertEqual(20, batch_try[1])
+            self.assertEqual((try_nr - 1) % 20, batch_try[3])
+            self.assertEqual(total_time, random_dwarf.replay_batch_try(batch_try, NUMBER_OF_DWARFS, MAX_CROSSINGS,
+                                                                       dwarf.START, MAX_TOGETHER)[0])
+        self.assertEqual((times[-1][1], scheme), random_dwarf.replay_batch_try(times[-1][2], NUMBER_OF_DWARFS,
+                                                                              MAX_CROSSINGS, dwarf.START,
+                                                                              MAX_TOGETHER))
+
+
+class SeedTests(unittest.TestCase):
+
+    def test_same_seed(self):
+        first = random_dwarf.random_crossing(50, NUMBER_OF_DWARFS, MAX_CROSSINGS, dwarf.START, MAX_TOGETHER, seed=7)
+        second = random_dwarf.random_crossing(50, NUMBER_OF_DWARFS, MAX_CROSSINGS, dwarf.START, MAX_TOGETHER, seed=7)
+        self.assertEqual(first, second)
+
+    def test_different_seeds(self):
+        first = random_dwarf.random_crossing(50, NUMBER_OF_DWARFS, MAX_CROSSINGS, dwarf.START, MAX_TOGETHER, seed=7)
+        second = random_dwarf.random_crossing(50, NUMBER_OF_DWARFS, MAX_CROSSINGS, dwarf.START, MAX_TOGETHER, seed=8)
+        self.assertNotEqual(first, second)
+
+    def test_seed_sequence(self):
+        seed = np.random.SeedSequence(1234, spawn_key=(3,))
+        first = random_dwarf.random_crossing_batch(NUMBER_OF_TRIES, NUMBER_OF_DWARFS, MAX_CROSSINGS, dwarf.START,
+                                                   MAX_TOGETHER, batch_size=32, seed=seed)
+        second = random_dwarf.random_crossing_batch(NUMBER_OF_TRIES, NUMBER_OF_DWARFS, MAX_CROSSINGS, dwarf.START,
+                                                    MAX_TOGETHER, batch_size=32, record_seeds=True, seed=seed)
+        self.assertEqual(first, second)
+
+    def test_child_seed(self):
+        root = random_dwarf.root_seed(42)
+        self.assertEqual(random_dwarf.child_seed(root, 1), random_dwarf.child_seed((42, ()), 1))
+        self.assertEqual(root, random_dwarf.root_seed(np.int64(42)))
+        self.assertNotEqual(random_dwarf.child_seed(root, 1), random_dwarf.child_seed(root, 2))
+        self.assertNotEqual(random_dwarf.child_seed(root, 1), random_dwarf.child_seed(random_dwarf.root_seed(43), 1))
+
+
+class RandomSearchTests(unittest.TestCase):
+
+    def test_same_as_random_crossing(self):
+        search = random_dwarf.RandomSearch(NUMBER_OF_DWARFS, MAX_CROSSINGS, dwarf.START, MAX_TOGETHER, seed=3)
+        search.run(30)
+        search.run(20)
+        self.assertEqual(search.tries, 50)
+        self.assertEqual(search.best(), random_dwarf.random_crossing(50, NUMBER_OF_DWARFS, MAX_CROSSINGS,
+                                                                     dwarf.START, MAX_TOGETHER, seed=3))
+
+    def test_time_budget(self):
+        search = random_dwarf.RandomSearch(NUMBER_OF_DWARFS, MAX_CROSSINGS, dwarf.START, MAX_TOGETHER,
+                                           record_seeds=True)
+        t_start = time.monotonic()
+        times, scheme = search.run(time_budget=0.2)
+        self.assertLess(time.monotonic() - t_start, 1)
+        self.assertGreater(search.tries, 0)
+        check_result(self, times, scheme, search.tries)
+
+    def test_target_time(self):
+        times, scheme = random_dwarf.random_crossing(None, NUMBER_OF_DWARFS, MAX_CROSSINGS, dwarf.START,
+                                                     MAX_TOGETHER, seed=11, target_time=1200)
+        self.assertLessEqual(times[-1][1], 1200)
+        check_result(self, times, scheme, times[-1][0])
+
+    def test_best_while_running(self):
+        search = random_dwarf.RandomSearch(NUMBER_OF_DWARFS, MAX_CROSSINGS, dwarf.START, MAX_TOGETHER,
+                                           record_seeds=True)
+        runner = threading.Thread(target=search.run)
+        runner.start()
+        while search.tries < 20:
+            time.sleep(0.01)
+        times, scheme = search.best()
+        search.stop()
+        runner.join()
+        check_result(self, times, scheme, search.tries)
+
+
+class CheckpointTests(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "search.json")
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_resume(self):
+        search = random_dwarf.RandomSearch(NUMBER_OF_DWARFS, MAX_CROSSINGS, dwarf.START, MAX_TOGETHER, prune=True,
+                                           seed=21)
+        search.run(40, checkpoint_path=self.path)
+        self.assertTrue(os.path.exists(self.path))
+        self.assertFalse(os.path.exists(self.path + ".tmp"))
+        resumed_pruned, pruned = {}, {}
+        resumed = random_dwarf.resume_random_crossing(self.path, NUMBER_OF_TRIES, pruned=resumed_pruned)
+        self.assertEqual(resumed, random_dwarf.random_crossing(NUMBER_OF_TRIES, NUMBER_OF_DWARFS, MAX_CROSSINGS,
+                                                               dwarf.START, MAX_TOGETHER, prune=True, seed=21,
+                                                               pruned=pruned))
+        self.assertEqual(pruned, resumed_pruned)
+        self.assertEqual(random_dwarf.RandomSearch.resume(self.path).tries, NUMBER_OF_TRIES)
+
+    def test_periodic_checkpoints(self):
+        search = random_dwarf.RandomSearch(NUMBER_OF_DWARFS, MAX_CROSSINGS, dwarf.START, MAX_TOGETHER, seed=2)
+        search.run(10, checkpoint_path=self.path, checkpoint_every=0)
+        resumed = random_dwarf.RandomSearch.resume(self.path)
+        self.assertEqual(resumed.tries, 10)
+        self.assertEqual(resumed.root, search.root)
+        self.assertEqual(resumed.best(), search.best())
+
+
+class HeadlessTests(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.curves = [[[1, 900, 5], [4, 850, 5]], [[1, 870, 6]]]
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_lazy_imports(self):
+        code = "import sys, random_dwarf; print('matplotlib' in sys.modules, 'numpy' in sys.modules)"
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(random_dwarf.__file__)))
+        self.assertEqual(result.stdout.split(), ["False", "False"])
+
+    def test_save_curves(self):
+        path = os.path.join(self.directory.name, "curves.npz")
+        random_dwarf.save_curves(self.curves, path)
+        with np.load(path) as saved:
+            self.assertEqual(saved["arr_0"].tolist(), [[1, 900], [4, 850]])
+            self.assertEqual(saved["arr_1"].tolist(), [[1, 870]])
+
+    def test_plot_to_image(self):
+        path = os.path.join(self.directory.name, "curves.png")
+        random_dwarf.plot_curves(self.curves, path)
+        self.assertGreater(os.path.getsize(path), 0)
+
+
+class ParallelRandomCrossingTests(unittest.TestCase):
+
+    def test_merge_chunks(self):
+        chunks = [([[1, 50, 8], [3, 40, 8]], ["a"]), ([[4, 45, 9], [6, 30, 9]], ["b"]), ([[7, 35, 5]], ["c"])]
+        self.assertEqual(random_dwarf.merge_chunks(chunks), ([[1, 50, 8], [3, 40, 8], [6, 30, 9]], ["b"]))
+
+    def test_parallel(self):
+        results = random_dwarf.parallel_random_crossing(3, NUMBER_OF_TRIES, NUMBER_OF_DWARFS, MAX_CROSSINGS,
+                                                        dwarf.START, MAX_TOGETHER, workers=2, chunk_size=64)
+        self.assertEqual(len(results), 3)
+        for times, scheme in results:
+            check_result(self, times, scheme, NUMBER_OF_TRIES)
+            self.assertEqual((times[-1][1], scheme), random_dwarf.replay_batch_try(times[-1][2], NUMBER_OF_DWARFS,
+                                                                                  MAX_CROSSINGS, dwarf.START,
+                                                                                  MAX_TOGETHER))
+
+    def test_parallel_same_seed(self):
+        first = random_dwarf.parallel_random_crossing(2, NUMBER_OF_TRIES, NUMBER_OF_DWARFS, MAX_CROSSINGS,
+                                                      dwarf.START, MAX_TOGETHER, workers=1, chunk_size=64, seed=5)
+        second = random_dwarf.parallel_random_crossing(2, NUMBER_OF_TRIES, NUMBER_OF_DWARFS, MAX_CROSSINGS,
+                                                       dwarf.START, MAX_TOGETHER, workers=2, chunk_size=64, seed=5)
+        self.assertEqual(first, second)
+        self.assertNotEqual(first[0], first[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,191 @@
+"""
+Verification of Schemes for the Dwarf Bridge Crossing Problem.
+
+A scheme can be checked by letting Dwarf objects make the moves, but that stops at the first move that can't be
+made. This program checks a whole scheme, from a list, a compact scheme or a file written by a scheme writer, and
+reports every move that breaks a rule, together with the total time of the scheme. A move that can't be read as
+a move at all, e.g. an empty line in a JSON Lines file or a dwarf that is not a number, is reported the same way,
+so one bad move doesn't stop the check of the rest.
+
+The moves are checked a chunk at a time, with all the moves of a chunk in NumPy arrays. Only the last move of
+every dwarf and how many times it has crossed are carried from one chunk to the next, so a scheme on file never
+has to be in memory all at once. The rules are:
+  * The lantern has to be carried back and forth, so the moves have to be crossings and walks back every other
+    time, starting with a crossing.
+  * Every move has at least one dwarf, and at most max_together, each of them only once.
+  * A dwarf can only cross from where it is, and at most max_crossings times.
+  * All dwarfs have to be at finish in the end.
+The time of a move is the crossing time of its slowest dwarf, and the time given for a move in a compact scheme
+has to be the same.
+"""
+from dwarf_scheme import BUFFER_MOVES, CROSS, GO_BACK, KINDS, MAGIC, CompactScheme, read_scheme, time_typecode
+from itertools import islice
+import dwarf
+import greedy_min_dwarf
+import json
+import sys
+
+
+NUMBER_OF_DWARFS = 300
+MAX_CROSSINGS = 3
+MAX_TOGETHER = 2
+
+
+def scheme_chunks(scheme, crossing_times=None, chunk_moves=BUFFER_MOVES):
+    """Yields the moves of the scheme as (kinds, dwarf numbers, times) arrays, a chunk at a time, together with a
+       list of (move index in the chunk, entry) for the entries of a move that aren't dwarf numbers, which are
+       left as empty places. The scheme is a list, a compact scheme, the path to a scheme file, or an iterable of
+       compact schemes. The times are None for a list or a JSON Lines file, which have no times of their own, and
+       only they can have entries that aren't dwarf numbers."""
+    import numpy as np
+    if isinstance(scheme, str):
+        with open(scheme, "rb") as file:
+            binary = file.read(len(MAGIC)) == MAGIC
+        if not binary:
+            yield from list_chunks(json_line_moves(scheme), chunk_moves)
+            return
+        scheme = read_scheme(scheme, crossing_times, chunk_moves)
+    elif isinstance(scheme, CompactScheme):
+        scheme = [scheme]
+    elif isinstance(scheme, list):
+        yield from list_chunks(scheme, chunk_moves)
+        return
+    for chunk in scheme:
+        dwarf_nrs = np.frombuffer(chunk.dwarf_nrs, dtype=np.int32).reshape(len(chunk), chunk.max_together)
+        yield np.frombuffer(chunk.kinds, dtype=np.int8), dwarf_nrs.astype(np.int64), \
+            np.frombuffer(chunk.durations, dtype=chunk.durations.typecode), []
+
+
+def list_chunks(moves, chunk_moves):
+    """Yields the moves in the list form as the chunks of scheme_chunks, also moves that break the rules. Anything
+       that is not a list is taken as an empty move, which is neither a crossing nor a walk back."""
+    import numpy as np
+    moves = iter(moves)
+    while chunk := [move if isinstance(move, list) else [] for move in islice(moves, chunk_moves)]:
+        kinds = np.array([KINDS.index(move[-1]) if move and move[-1] in KINDS else -1 for move in chunk],
+                         dtype=np.int8)
+        dwarf_nrs = np.zeros((len(chunk), max([len(move) - 1 for move in chunk] + [1])), dtype=np.int64)
+        not_numbers = []
+        for move_nr, move in enumerate(chunk):
+            for place, nr in enumerate(move[:-1]):
+                if isinstance(nr, (int, np.integer)) and -2 ** 63 <= nr < 2 ** 63:
+                    dwarf_nrs[move_nr, place] = nr
+                else:
+                    not_numbers.append((move_nr, nr))
+        yield kinds, dwarf_nrs, None, not_numbers
+
+
+def json_line_moves(path):
+    """Yields the moves on the lines of a JSON Lines scheme file as they are, without checking them. A line that
+       is not JSON at all is yielded as its text."""
+    with open(path) as file:
+        for line in file:
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    yield line.strip()
+
+
+def verify_scheme(scheme, num_of_dwarfs, max_crossings=MAX_CROSSINGS, max_together=MAX_TOGETHER,
+                  crossing_times=None, chunk_moves=BUFFER_MOVES):
+    """Returns the total time of the scheme, and a list of [move_nr, reason] for every rule the scheme breaks,
+       where move_nr counts the moves from 0, and a dwarf that doesn't get to finish is reported at the number
+       of moves. The scheme is a list, a compact scheme, the path to a scheme file, or an iterable of compact
+       schemes, and dwarf number 0 is an empty place in a move, as in a compact scheme. crossing_times[nr - 1] is
+       the crossing time of dwarf number nr, 1, 2, 3, ... when no crossing times are given, and max_crossings is
+       either the same for all dwarfs or a list with the limit of each."""
+    import numpy as np
+    if crossing_times is None:
+        times = np.arange(num_of_dwarfs + 1, dtype=np.int64)
+    else:
+        times = np.concatenate([[0], np.asarray(crossing_times[:num_of_dwarfs],
+                                                dtype=np.dtype(time_typecode(crossing_times[:num_of_dwarfs])))])
+    limits = np.concatenate([[0], np.broadcast_to(np.asarray(max_crossings), (num_of_dwarfs,))])
+    last_kind = np.full(num_of_dwarfs + 1, GO_BACK, dtype=np.int8)  # Last move of every dwarf, all at start
+    crossings = np.zeros(num_of_dwarfs + 1, dtype=np.int64)
+    total_time = 0
+    violations = []
+    first_move = 0
+    for kinds, dwarf_nrs, durations, not_numbers in scheme_chunks(scheme, crossing_times, chunk_moves):
+        move_nrs = np.arange(first_move, first_move + len(kinds))
+        found = []  # Arrays of move numbers and the reasons for them, merged in the order of the moves below
+
+        def report(where, reasons):
+            found.append((move_nrs[where], np.asarray(reasons, dtype=object)))
+
+        expected = move_nrs % 2
+        wrong_kind = kinds != expected
+        report(wrong_kind, [f"the move is neither {KINDS[CROSS]} nor {KINDS[GO_BACK]}" if kind < 0 else
+                            f"the lantern is at {dwarf.START if kind == GO_BACK else dwarf.FINISH}, so the move has "
+                            f"to be {KINDS[1 - kind]}" for kind in kinds[wrong_kind]])
+        report(np.array([row for row, _ in not_numbers], dtype=np.int64),
+               [f"there is no dwarf number {nr}" if isinstance(nr, (int, np.integer)) else
+                f"{nr!r} is not a dwarf number" for _, nr in not_numbers])
+        unknown = dwarf_nrs > num_of_dwarfs
+        unknown |= dwarf_nrs < 0
+        rows, columns = np.nonzero(unknown)
+        report(rows, [f"there is no dwarf number {nr}" for nr in dwarf_nrs[rows, columns]])
+        dwarf_nrs = np.where(unknown, 0, dwarf_nrs)
+        ordered = np.sort(dwarf_nrs, axis=1)
+        repeated = (ordered[:, 1:] == ordered[:, :-1]) & (ordered[:, 1:] > 0)
+        rows, columns = np.nonzero(repeated)
+        report(rows, [f"dwarf number {nr} is in the move more than once" for nr in ordered[rows, columns + 1]])
+        dwarf_nrs = np.where(np.concatenate([np.zeros((len(kinds), 1), dtype=bool), repeated], axis=1), 0, ordered)
+        counts = (dwarf_nrs > 0).sum(axis=1)
+        report(counts == 0, ["no dwarf is on the move"] * int((counts == 0).sum()))
+        too_many = counts > max_together
+        report(too_many, [f"{count} dwarfs are on the bridge, but it only holds {max_together}"
+                          for count in counts[too_many]])
+        move_times = times[dwarf_nrs].max(axis=1)
+        total_time += move_times.sum().item()
+        if durations is not None:
+            wrong_time = durations != move_times
+            report(wrong_time, [f"the move takes {actual} minutes, not {given}"
+                                for actual, given in zip(move_times[wrong_time], durations[wrong_time])])
+        # Every dwarf on the move, in the order of the moves, and for each dwarf its moves next to each other
+        rows, columns = np.nonzero(dwarf_nrs)
+        nrs = dwarf_nrs[rows, columns]
+        by_dwarf = np.argsort(nrs, kind="stable")
+        rows, nrs = rows[by_dwarf], nrs[by_dwarf]
+        first = np.ones(len(nrs), dtype=bool)
+        first[1:] = nrs[1:] != nrs[:-1]
+        moved_kinds = kinds[rows]
+        previous_kinds = np.where(first, last_kind[nrs], np.roll(moved_kinds, 1))
+        same_side = (previous_kinds == moved_kinds) & (moved_kinds >= 0)
+        report(rows[same_side], [f"dwarf number {nr} is already at {dwarf.FINISH if kind == CROSS else dwarf.START}"
+                                 for nr, kind in zip(nrs[same_side], moved_kinds[same_side])])
+        starts = np.flatnonzero(first)
+        group_sizes = np.diff(np.append(starts, len(nrs)))
+        crossed = crossings[nrs] + np.arange(len(nrs)) - np.repeat(starts, group_sizes) + 1
+        over = crossed > limits[nrs]
+        report(rows[over], [f"dwarf number {nr} crosses the bridge {count} times, but only wants to cross {limit}"
+                            for nr, count, limit in zip(nrs[over], crossed[over], limits[nrs[over]])])
+        last = np.append(starts, len(nrs))[1:] - 1  # Empty when no dwarf is on any move of the chunk
+        last_kind[nrs[last]] = moved_kinds[last]
+        crossings[nrs[last]] = crossed[last]
+        if found:
+            where = np.concatenate([found_nrs for found_nrs, _ in found])
+            reasons = np.concatenate([reasons for _, reasons in found])
+            for index in np.argsort(where, kind="stable"):
+                violations.append([int(where[index]), reasons[index]])
+        first_move += len(kinds)
+    left = np.flatnonzero(last_kind[1:] != CROSS) + 1
+    violations += [[first_move, f"dwarf number {nr} is left at {dwarf.START}"] for nr in left]
+    return total_time, violations
+
+
+def main(path=None):
+    """Verifies the scheme in the file, or else the scheme from the greedy algorithm, and presents the result."""
+    if path is None:
+        _, path = greedy_min_dwarf.GreedySolver(NUMBER_OF_DWARFS, MAX_CROSSINGS, dwarf.START, MAX_TOGETHER).solve()
+    total_time, violations = verify_scheme(path, NUMBER_OF_DWARFS, MAX_CROSSINGS, MAX_TOGETHER)
+    print(f"Total time for all dwarfs crossing the bridge: {total_time}")
+    for move_nr, reason in violations:
+        print(f"Move {move_nr}: {reason}")
+    if not violations:
+        print("The scheme follows all the rules")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
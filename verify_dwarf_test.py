@@ -0,0 +1,128 @@
+import unittest
+import dwarf
+from dwarf_scheme import CompactScheme, scheme_writer
+from greedy_min_dwarf import GreedySolver
+from verify_dwarf import verify_scheme
+import json
+import os
+import random
+import tempfile
+
+
+def check(scheme, num_of_dwarfs, max_crossings, max_together):
+    """Returns the move numbers of the moves that break a rule, found by going through the moves one by one."""
+    kinds = ["cross", "go back"]
+    last_kind = [1] * (num_of_dwarfs + 1)
+    crossings = [0] * (num_of_dwarfs + 1)
+    broken = []
+    for move_nr, move in enumerate(scheme):
+        kind = kinds.index(move[-1]) if move and move[-1] in kinds else -1
+        if kind != move_nr % 2:
+            broken.append(move_nr)
+        dwarf_nrs = []
+        for dwarf_nr in move[:-1]:
+            if dwarf_nr == 0:
+                continue  # An empty place, as in a compact scheme
+            if not isinstance(dwarf_nr, int) or not 0 < dwarf_nr <= num_of_dwarfs or dwarf_nr in dwarf_nrs:
+                broken.append(move_nr)
+            else:
+                dwarf_nrs.append(dwarf_nr)
+        if not 0 < len(dwarf_nrs) <= max_together:
+            broken.append(move_nr)
+        for dwarf_nr in dwarf_nrs:
+            if kind >= 0 and last_kind[dwarf_nr] == kind:
+                broken.append(move_nr)
+            crossings[dwarf_nr] += 1
+            if crossings[dwarf_nr] > max_crossings:
+                broken.append(move_nr)
+            last_kind[dwarf_nr] = kind
+    broken += [len(scheme)] * sum(kind != 0 for kind in last_kind[1:])
+    return broken
+
+
+class VerifySchemeTests(unittest.TestCase):
+
+    def setUp(self):
+        self.total_time, self.scheme = GreedySolver(300, 3, dwarf.START, 2).solve()
+
+    def test_greedy(self):
+        self.assertEqual((89551, []), verify_scheme(self.scheme, 300, 3, 2, chunk_moves=50))
+        self.assertEqual((89551, []), verify_scheme(CompactScheme.from_list(self.scheme, 2), 300, 3, 2))
+
+    def test_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for name in ["scheme.jsonl", "scheme.dws"]:
+                path = os.path.join(directory, name)
+                with scheme_writer(path, 2, buffer_moves=64) as writer:
+                    writer.extend(self.scheme)
+                self.assertEqual((89551, []), verify_scheme(path, 300, 3, 2, chunk_moves=64))
+
+    def test_violations(self):
+        scheme = [[1, 2, "cross"], [1, 2, "go back"], [3, 3, "cross"], [9, "go back"], [1, 2, 3, "cross"],
+                  [1, "go back"], [1, "cross"], [4, "jump"]]
+        total_time, violations = verify_scheme(scheme, 4, 3, 2)
+        self.assertEqual(16, total_time)
+        self.assertEqual([[2, "dwarf number 3 is in the move more than once"],
+                          [3, "there is no dwarf number 9"],
+                          [3, "no dwarf is on the move"],
+                          [4, "3 dwarfs are on the bridge, but it only holds 2"],
+                          [4, "dwarf number 3 is already at finish"],
+                          [5, "dwarf number 1 crosses the bridge 4 times, but only wants to cross 3"],
+                          [6, "dwarf number 1 crosses the bridge 5 times, but only wants to cross 3"],
+                          [7, "the move is neither cross nor go back"],
+                          [8, "dwarf number 4 is left at start"]], violations)
+
+    def test_wrong_times(self):
+        compact = CompactScheme.from_list(self.scheme, 2)
+        compact.durations[10] += 1
+        self.assertEqual((89551, [[10, "the move takes 8 minutes, not 9"]]), verify_scheme(compact, 300, 3, 2))
+        crossing_times = [t * 2 for t in range(1, 301)]
+        self.assertEqual(2 * 89551, verify_scheme(self.scheme, 300, 3, 2, crossing_times)[0])
+
+    def test_broken_schemes(self):
+        self.assertEqual((5, [[2, "the move is neither cross nor go back"], [2, "no dwarf is on the move"],
+                              [3, "'x' is not a dwarf number"], [4, "dwarf number 1 is left at start"],
+                              [4, "dwarf number 2 is left at start"]]),
+                         verify_scheme([[1, 2, "cross"], [2, "go back"], [], [1, "x", "go back"]], 2, 3, 2))
+        rng = random.Random(7)
+        for _ in range(100):
+            scheme = [list(move) for move in self.scheme[:rng.randint(0, 80)]]
+            for _ in range(rng.randint(0, 5)):
+                move = rng.choice(scheme) if scheme else None
+                change = rng.randint(0, 5)
+                if move is None:
+                    break
+                elif change == 0 and move:
+                    move[-1] = "cross" if move[-1] == "go back" else "go back"
+                elif change == 1:
+                    move.insert(0, rng.randint(1, 45))
+                elif change == 2 and len(move) > 1:
+                    move[rng.randrange(len(move) - 1)] = rng.randint(-1, 45)
+                elif change == 3:
+                    scheme.insert(rng.randrange(len(scheme) + 1), [])
+                elif change == 4 and len(move) > 1:
+                    move[rng.randrange(len(move) - 1)] = rng.choice(["x", 2.5, None, 2 ** 70])
+                else:
+                    scheme.insert(rng.randrange(len(scheme) + 1), [rng.randint(1, 40), rng.choice(["cross", "jump"])])
+            _, violations = verify_scheme(scheme, 40, 3, 2, chunk_moves=rng.randint(1, 20))
+            self.assertEqual(sorted(check(scheme, 40, 3, 2)), [move_nr for move_nr, _ in violations])
+
+    def test_broken_files(self):
+        moves = [[1, 2, "cross"], [1, "jump"], ["x", 3, "cross"], [], ["go back"], [2 ** 40, "go back"],
+                 [9, "cross"], [1, 2, "go back"], [3, 4, "cross"]]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "broken.jsonl")
+            with open(path, "w") as file:
+                file.write("".join(json.dumps(move) + "\n" for move in moves))
+            for crossing_times in [None, [1, 2, 5, 10]]:
+                total_time, violations = verify_scheme(path, 4, 3, 2, crossing_times, chunk_moves=4)
+                self.assertEqual(verify_scheme(moves, 4, 3, 2, crossing_times), (total_time, violations))
+                self.assertEqual(sorted(check(moves, 4, 3, 2)), [move_nr for move_nr, _ in violations])
+                self.assertEqual(set(range(1, 7)), {move_nr for move_nr, _ in violations} & set(range(1, 7)))
+            with open(path, "a") as file:
+                file.write("[3, \"go back\"\n")
+            self.assertIn([9, "the move is neither cross nor go back"], verify_scheme(path, 4, 3, 2)[1])
+
+
+if __name__ == '__main__':
+    unittest.main()